@@ -1,29 +1,103 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, g, stream_with_context
 from flask_cors import CORS
 import pandas as pd
+import numpy as np
 import os
+import sys
 import json
+import time
+import gzip
+import zlib
+import hashlib
+import importlib.util
+from functools import lru_cache
 
 app = Flask(__name__)
 CORS(app)
 
 # Helper to find data relative to the project root
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT_DIR)
+
+from src.analysis.jobs import JobManager, JobQueueFull
+from src.analysis.downsample import lttb_indices, nearest_indices
+from src.analysis.events import load_event_index
+from src.analysis.rolling import get_rolling_engine
+from src.data.price_store import PriceStore
+from src.data.shared_prices import SharedPriceStore
+from src.models.change_point_model import ChangePointModel
+from src.models.inference_cache import InferenceCache
+from src.models.multi_change_point import MultiChangePointDetector
+from src.models.online_detector import OnlineChangePointDetector
+from src.models.window_scan import ChangeProbabilityScan
+from src.utils.metrics import metrics
+
+job_manager = JobManager(max_workers=int(os.environ.get('ANALYSIS_WORKERS', 0)) or None)
+PRICES_PATH = os.path.join(ROOT_DIR, 'data', 'raw', 'BrentOilPrices.csv')
+# Parsed once per process and reloaded only when the CSV changes on disk; under
+# backend/wsgi.py the workers instead map one shared copy published to PRICE_SHARED_DIR
+SHARED_DIR = os.environ.get('PRICE_SHARED_DIR')
+price_store = SharedPriceStore(PRICES_PATH, SHARED_DIR) if SHARED_DIR else PriceStore(PRICES_PATH)
+EVENTS_PATH = os.path.join(ROOT_DIR, 'data', 'raw', 'geopolitical_events.csv')
+# Created on first use, so importing the app writes nothing
+INFERENCE_CACHE_DIR = (os.environ.get('INFERENCE_CACHE_DIR')
+                       or os.path.join(ROOT_DIR, 'data', 'processed', 'inference_cache'))
+_inference_cache = None
+
+PRICE_FORMATS = ("records", "columns", "ndjson")
+# Brotli is used when the optional `brotli` package is installed, gzip otherwise
+ENCODINGS = ("br", "gzip") if importlib.util.find_spec("brotli") else ("gzip",)
+MIN_COMPRESS_BYTES = 1024
+NDJSON_CHUNK_ROWS = 10_000
+# (width, stride) change probability scans shared across workers
+DEFAULT_SCAN = (250, 1)
+SHARED_SCANS = {DEFAULT_SCAN}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Per-route latency histogram, keyed on the route pattern rather than the raw URL
+    started = getattr(g, 'request_started', None)
+    if started is not None and request.url_rule is not None:
+        metrics.observe(f"http {request.method} {request.url_rule.rule}", (time.perf_counter() - started) * 1000)
+    return response
+
+def preferred_encoding():
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    # Compresses sizeable JSON bodies for clients that accept it (streams and
+    # pre-encoded responses are left alone)
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+        return response
+    encoding = preferred_encoding()
+    data = response.get_data()
+    if encoding and len(data) >= MIN_COMPRESS_BYTES:
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
 
 def load_prices():
-    path = os.path.join(ROOT_DIR, 'data', 'raw', 'BrentOilPrices.csv')
-    df = pd.read_csv(path)
-    # The dataset contains mixed formats: '20-May-87' and 'Nov 14, 2022'
-    # pd.to_datetime with format='mixed' or no format handles this reliably
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df = df.dropna().sort_values('Date')
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-    return df
+    return price_store.to_frame()
 
 def load_events():
-    path = os.path.join(ROOT_DIR, 'data', 'raw', 'geopolitical_events.csv')
-    if os.path.exists(path):
-        df = pd.read_csv(path)
+    if os.path.exists(EVENTS_PATH):
+        df = pd.read_csv(EVENTS_PATH)
         return df.to_dict(orient='records')
     return []
 
@@ -34,19 +108,200 @@ def load_analysis_results():
         return df.to_dict(orient='records')
     return {}
 
+def detect_change_points(prices):
+    # PELT change points on log returns of the full history
+    returns = pd.Series(np.diff(np.log(prices)))
+    if returns.empty:
+        return np.array([], dtype=np.int64)
+    change_points = MultiChangePointDetector(model="meanvar").fit(returns).change_points_
+    # Return k is the move from price k to k + 1, so the new regime starts at price k + 1
+    return np.asarray(change_points, dtype=np.int64) + 1
+
+@lru_cache(maxsize=4)
+def detected_change_points(version):
+    # Once per data version (and, with a shared store, once across all workers)
+    return price_store.derived("change_points", lambda: detect_change_points(price_store.prices))
+
+@lru_cache(maxsize=128)
+def downsampled_range(version, start_date, end_date, max_points):
+    sl = price_store.range_slice(start_date, end_date)
+    dates, prices = price_store.dates[sl], price_store.prices[sl]
+
+    # Change points and event dates must survive downsampling
+    change_points = detected_change_points(version)
+    keep = change_points[(change_points >= sl.start) & (change_points < sl.stop)] - sl.start
+    events = load_event_index(EVENTS_PATH)
+    event_dates = events.dates if events is not None else np.array([], dtype='datetime64[D]')
+    if len(dates):
+        event_dates = event_dates[(event_dates >= dates[0]) & (event_dates <= dates[-1])]
+    keep = np.concatenate([keep, nearest_indices(dates, event_dates)])
+
+    idx = lttb_indices(dates.astype(np.int64), prices, max_points, keep=keep)
+    return dates[idx], prices[idx]
+
+def price_range(version, start_date, end_date, max_points):
+    if max_points:
+        return downsampled_range(version, start_date, end_date, max_points)
+    return price_store.range(start_date, end_date)
+
+@lru_cache(maxsize=64)
+def prices_payload(version, start_date, end_date, max_points, fmt):
+    # Serialized once per data version and query; "columns" sends each key once instead of per row
+    dates, prices = price_range(version, start_date, end_date, max_points)
+    dates, prices = np.datetime_as_string(dates, unit='D').tolist(), prices.tolist()
+    if fmt == "columns":
+        body = {"dates": dates, "prices": prices}
+    else:
+        body = [{"Date": d, "Price": p} for d, p in zip(dates, prices)]
+    return json.dumps(body, separators=(',', ':')).encode()
+
+@lru_cache(maxsize=64)
+def encoded_prices_payload(version, start_date, end_date, max_points, fmt, encoding):
+    return compress(prices_payload(version, start_date, end_date, max_points, fmt), encoding)
+
+def ndjson_stream(dates, prices, encoding=None):
+    # One {"Date", "Price"} object per line, serialized and compressed chunk by chunk
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if encoding == "gzip" else None
+    for lo in range(0, len(dates), NDJSON_CHUNK_ROWS):
+        chunk_dates = np.datetime_as_string(dates[lo:lo + NDJSON_CHUNK_ROWS], unit='D').tolist()
+        chunk = "".join(f'{{"Date":"{d}","Price":{json.dumps(p)}}}\n'
+                        for d, p in zip(chunk_dates, prices[lo:lo + NDJSON_CHUNK_ROWS].tolist())).encode()
+        yield compressor.compress(chunk) if compressor else chunk
+    if compressor:
+        yield compressor.flush()
+
 @app.route('/api/prices', methods=['GET'])
 def get_prices():
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    df = load_prices()
-    
-    if start_date:
-        df = df[df['Date'] >= start_date]
-    if end_date:
-        df = df[df['Date'] <= end_date]
-        
-    return jsonify(df.to_dict(orient='records'))
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    max_points = request.args.get('max_points', type=int)
+    width = request.args.get('width', type=int)
+    if width:
+        # Roughly one point per horizontal pixel is all a line chart can show
+        max_points = min(max_points, width) if max_points else width
+    fmt = request.args.get('format', default='records')
+    if fmt not in PRICE_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(PRICE_FORMATS)}."}), 400
+
+    # The ETag names the dataset version and the query, so unchanged data costs a 304
+    price_store.refresh()
+    etag = hashlib.sha1(repr((price_store.version, start_date, end_date, max_points, fmt)).encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    encoding = preferred_encoding()
+    try:
+        if fmt == "ndjson":
+            dates, prices = price_range(price_store.version, start_date, end_date, max_points)
+            stream_encoding = "gzip" if request.accept_encodings['gzip'] else None
+            response = Response(stream_with_context(ndjson_stream(dates, prices, stream_encoding)),
+                                mimetype='application/x-ndjson')
+            if stream_encoding:
+                response.headers['Content-Encoding'] = stream_encoding
+        else:
+            args = (price_store.version, start_date, end_date, max_points, fmt)
+            payload = prices_payload(*args)
+            response = Response(payload, mimetype='application/json')
+            if encoding and len(payload) >= MIN_COMPRESS_BYTES:
+                response.set_data(encoded_prices_payload(*args, encoding))
+                response.headers['Content-Encoding'] = encoding
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD."}), 400
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/rolling', methods=['GET'])
+def get_rolling():
+    # Rolling mean / std / annualized volatility for any window size
+    window = request.args.get('window', default=21, type=int)
+    metric = request.args.get('metric', default='volatility')
+    series = request.args.get('series', default='returns' if metric != 'mean' else 'price')
+    if metric not in ('mean', 'std', 'volatility') or window < 1:
+        return jsonify({"error": "metric must be mean, std or volatility and window positive."}), 400
+    try:
+        sl = price_store.range_slice(request.args.get('start_date') or None, request.args.get('end_date') or None)
+        engine = get_rolling_engine(price_store.prices, version=price_store.version,
+                                    base_version=price_store.previous_version, changed_from=price_store.changed_from)
+        values = engine.compute([window], series, metrics=(metric,)).iloc[:, 0].values[sl]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    dates = np.datetime_as_string(price_store.dates[sl], unit='D').tolist()
+    return jsonify([{"Date": d, "Value": None if np.isnan(v) else v} for d, v in zip(dates, values.tolist())])
+
+@lru_cache(maxsize=16)
+def change_probability_scan(version, width, stride):
+    # Full-history scan, once per data version and window configuration
+    columns = ["change_probability", "max_probability", "windows"]
+
+    def compute():
+        return ChangeProbabilityScan(width, stride).run(
+            price_store.prices, sums=price_store.prefix_sums())[columns].to_numpy(dtype=float).T
+    # Only the dashboard's configurations are published for all workers: arbitrary client
+    # parameters would each leave files in the shared directory
+    if (width, stride) in SHARED_SCANS:
+        table = price_store.derived(f"change_probability_{width}_{stride}", compute)
+    else:
+        table = compute()
+    return pd.DataFrame({"change_probability": table[0], "max_probability": table[1],
+                         "windows": table[2].astype(np.int64)})
+
+@lru_cache(maxsize=32)
+def change_probability_payload(version, width, stride, start_date, end_date, max_points, fmt):
+    sl = price_store.range_slice(start_date, end_date)
+    scan = change_probability_scan(version, width, stride).iloc[sl]
+    dates, probability, windows = price_store.dates[sl], scan['change_probability'].to_numpy(), scan['windows'].to_numpy()
+    if max_points:
+        # Dates no window can place a break at (NaN) sit at the ends and count as 0 for the
+        # triangle areas; the most likely break always survives
+        values = np.nan_to_num(probability)
+        keep = [int(np.argmax(values))] if len(values) else []
+        idx = lttb_indices(dates.astype(np.int64), values, max_points, keep=keep)
+        dates, probability, windows = dates[idx], probability[idx], windows[idx]
+    dates = np.datetime_as_string(dates, unit='D').tolist()
+    probability = [None if np.isnan(p) else p for p in probability.tolist()]
+    if fmt == "columns":
+        body = {"dates": dates, "probabilities": probability, "windows": windows.tolist()}
+    else:
+        body = [{"Date": d, "Probability": p, "Windows": w} for d, p, w in zip(dates, probability, windows.tolist())]
+    return json.dumps(body, separators=(',', ':')).encode()
+
+@app.route('/api/change_probability', methods=['GET'])
+def get_change_probability():
+    # Per-date probability of a regime break from a sliding-window exact scan
+    width = request.args.get('width', default=DEFAULT_SCAN[0], type=int)
+    stride = request.args.get('stride', default=DEFAULT_SCAN[1], type=int)
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    # `width` is the scan window here, so the chart's pixel width is `chart_width`
+    max_points = request.args.get('max_points', type=int)
+    chart_width = request.args.get('chart_width', type=int)
+    if chart_width:
+        max_points = min(max_points, chart_width) if max_points else chart_width
+    fmt = request.args.get('format', default='records')
+    if fmt not in ("records", "columns"):
+        return jsonify({"error": "format must be one of records, columns."}), 400
+    try:
+        scan_engine = ChangeProbabilityScan(width, stride)
+        price_store.refresh()
+        if len(price_store.prices) < width:
+            raise ValueError(f"width must not exceed the {len(price_store.prices)} available observations.")
+        price_store.range_slice(start_date, end_date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = (scan_engine.width, scan_engine.stride, start_date, end_date, max_points, fmt)
+    etag = hashlib.sha1(repr((price_store.version, *query)).encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    response = Response(change_probability_payload(price_store.version, *query), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/events', methods=['GET'])
 def get_events():
@@ -54,6 +309,15 @@ def get_events():
 
 @app.route('/api/analysis', methods=['GET'])
 def get_analysis():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    if start_date or end_date:
+        try:
+            sl = price_store.range_slice(start_date, end_date)
+        except ValueError:
+            return jsonify({"error": "Dates must be formatted as YYYY-MM-DD."}), 400
+        return jsonify(analyse_window(sl))
+
     # Return impact report data
     report_path = os.path.join(ROOT_DIR, 'data', 'task_2_results', 'impact_report_2008.txt')
     if os.path.exists(report_path):
@@ -62,16 +326,98 @@ def get_analysis():
         return jsonify({"report": content})
     return jsonify({"report": "No analysis report found."})
 
+def get_inference_cache() -> InferenceCache:
+    global _inference_cache
+    if _inference_cache is None or _inference_cache.cache_dir != INFERENCE_CACHE_DIR:
+        _inference_cache = InferenceCache(INFERENCE_CACHE_DIR)
+    return _inference_cache
+
+def analyse_window(sl: slice):
+    # Exact single change point analysis of a window, served through the inference cache
+    dates, prices = price_store.dates[sl], price_store.prices[sl]
+    if len(prices) < 2:
+        return {"error": "Not enough data in the requested window."}
+
+    model = ChangePointModel(pd.Series(prices), engine="exact")
+    trace = model.run_inference(draws=1000, random_seed=42, cache=get_inference_cache())
+    tau = int(np.median(trace.posterior['tau'].values))
+    summary = model.summary
+    mu_1, mu_2 = summary.loc['mu_1', 'mean'], summary.loc['mu_2', 'mean']
+    return {
+        "change_point_date": str(np.datetime_as_string(dates[tau], unit='D')),
+        "tau": tau,
+        "mu_1": float(mu_1),
+        "mu_2": float(mu_2),
+        "pct_change": float((mu_2 - mu_1) / mu_1 * 100),
+        "summary": summary.reset_index(names='parameter').to_dict(orient='records'),
+    }
+
+@app.route('/api/analysis/jobs', methods=['POST'])
+def submit_analysis_job():
+    body = request.get_json(silent=True) or {}
+    spec = {
+        "start_date": body.get('start_date') or None,
+        "end_date": body.get('end_date') or None,
+        "series": body.get('series', 'price'),
+        "engine": body.get('engine', 'mcmc'),
+        "draws": body.get('draws', 1000),
+        "tune": body.get('tune', 1000),
+        "chains": body.get('chains', 2),
+    }
+    if spec['series'] not in ('price', 'log_return') or spec['engine'] not in ('mcmc', 'exact'):
+        return jsonify({"error": "series must be price or log_return, engine mcmc or exact."}), 400
+    if not all(isinstance(spec[k], int) and 1 <= spec[k] <= limit
+               for k, limit in (('draws', 10000), ('tune', 10000), ('chains', 8))):
+        return jsonify({"error": "draws and tune must be in 1..10000, chains in 1..8."}), 400
+
+    try:
+        sl = price_store.range_slice(spec['start_date'], spec['end_date'])
+    except ValueError:
+        return jsonify({"error": "Dates must be formatted as YYYY-MM-DD."}), 400
+    dates, prices = price_store.dates[sl], price_store.prices[sl]
+    if spec['series'] == 'log_return':
+        dates, values = dates[1:], np.diff(np.log(prices))
+    else:
+        values = prices
+    if len(values) < 2:
+        return jsonify({"error": "Not enough data in the requested window."}), 400
+
+    task = {
+        "window": f"{spec['start_date'] or 'start'}..{spec['end_date'] or 'end'}",
+        "start": spec['start_date'], "end": spec['end_date'],
+        "dates": dates, "values": values, "engine": spec['engine'],
+        "sample_kwargs": {"draws": spec['draws'], "tune": spec['tune'], "chains": spec['chains'], "random_seed": 42},
+        "cache_dir": INFERENCE_CACHE_DIR,
+    }
+    try:
+        job = job_manager.submit({**spec, "data_version": price_store.version}, task)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify(job), 200 if job['deduplicated'] else 202
+
+@app.route('/api/analysis/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    job = job_manager.status(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job {job_id}."}), 404
+    return jsonify(job)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    # Stage timings, sampling throughput and per-route latency histograms of this process
+    return jsonify(metrics.snapshot())
+
+@app.route('/api/regime', methods=['GET'])
+def get_regime():
+    # Latest state of the online detector (updated by scripts/update_online_detector.py)
+    path = os.path.join(ROOT_DIR, 'data', 'processed', 'online_detector.npz')
+    if os.path.exists(path):
+        return jsonify(OnlineChangePointDetector.load(path).status())
+    return jsonify({"status": "No online detector checkpoint found."})
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    df = load_prices()
-    stats = {
-        "avg_price": round(df['Price'].mean(), 2),
-        "max_price": round(df['Price'].max(), 2),
-        "min_price": round(df['Price'].min(), 2),
-        "total_days": len(df)
-    }
-    return jsonify(stats)
+    return jsonify(price_store.stats())
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,28 @@
+"""
+WSGI entry point for multi-worker serving, e.g. from this directory:
+
+    gunicorn --workers 4 --preload wsgi:app
+
+The price arrays, summary totals and shared analysis results are published
+once to memory-mapped files under PRICE_SHARED_DIR (default
+data/processed/shared_prices) and every worker maps the same pages, so
+adding workers does not add copies of the data. With --preload the master
+publishes before forking; without it the first worker publishes and the
+others wait for it and attach.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.extend([BACKEND_DIR, os.path.dirname(BACKEND_DIR)])
+
+from src.data.shared_prices import DEFAULT_SHARED_DIR
+
+os.environ.setdefault('PRICE_SHARED_DIR', DEFAULT_SHARED_DIR)
+
+from app import app, price_store
+
+if os.path.exists(price_store.file_path):
+    price_store.refresh()
+
+application = app
@@ -0,0 +1,46 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+@pytest.fixture(scope="module")
+def client(csv_factory, tmp_path_factory):
+    import app as backend
+    backend.price_store = backend.PriceStore(
+        csv_factory(9_000), snapshot_dir=str(tmp_path_factory.mktemp("api_snapshots")))
+    backend.price_store.refresh()
+    return backend.app.test_client()
+
+@pytest.mark.parametrize("query", ["", "?start_date=2008-01-01&end_date=2008-12-31", "?max_points=1000"])
+def bench_prices_endpoint(benchmark, client, query):
+    response = benchmark(lambda: client.get("/api/prices" + query))
+    assert response.status_code == 200
+    benchmark.extra_info["payload_bytes"] = len(response.data)
+
+def bench_stats_endpoint(benchmark, client):
+    response = benchmark(lambda: client.get("/api/stats"))
+    assert response.status_code == 200
+
+@pytest.mark.parametrize("fmt", ["records", "columns", "ndjson"])
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def bench_prices_serialization(benchmark, client, fmt, encoding):
+    # Full history with cold payload caches: serialization (and compression) cost per format
+    import app as backend
+
+    def setup():
+        backend.prices_payload.cache_clear()
+        backend.encoded_prices_payload.cache_clear()
+        return (), {}
+
+    def run():
+        response = client.get(f"/api/prices?format={fmt}", headers={"Accept-Encoding": encoding})
+        return response, response.get_data()
+    response, data = benchmark.pedantic(run, setup=setup, rounds=5, iterations=1)
+    assert response.status_code == 200
+    benchmark.extra_info.update({"format": fmt, "encoding": encoding, "payload_bytes": len(data)})
+
+def bench_prices_not_modified(benchmark, client):
+    etag = client.get("/api/prices?format=columns").headers["ETag"]
+    response = benchmark(lambda: client.get("/api/prices?format=columns", headers={"If-None-Match": etag}))
+    assert response.status_code == 304
@@ -0,0 +1,17 @@
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def _cold_import(statement: str, cwd: str = ROOT_DIR):
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR}
+    subprocess.run([sys.executable, "-c", statement], cwd=cwd, env=env, check=True, capture_output=True)
+
+@pytest.mark.parametrize("module", ["src.data.loader", "src.models.change_point_model", "src.visualization.plot_utils"])
+def bench_module_import(benchmark, module):
+    benchmark.pedantic(_cold_import, args=(f"import {module}",), rounds=5, iterations=1)
+
+def bench_backend_import(benchmark):
+    benchmark.pedantic(_cold_import, args=("import app", os.path.join(ROOT_DIR, "backend")), rounds=5, iterations=1)
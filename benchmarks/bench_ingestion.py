@@ -0,0 +1,42 @@
+import pytest
+from conftest import CSV_SIZES
+from src.data.loader import DataLoader
+
+# Files of a million rows or more are marked `large` (deselect with -m "not large")
+SIZES = [pytest.param(n, marks=pytest.mark.large) if n >= 1_000_000 else n for n in CSV_SIZES]
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_load_csv(benchmark, csv_factory, n):
+    path = csv_factory(n)
+    benchmark.extra_info["rows"] = n
+    data = benchmark.pedantic(lambda: DataLoader(path, snapshot_dir=None).load_data(), rounds=3, iterations=1)
+    assert len(data) == n
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_load_snapshot(benchmark, csv_factory, tmp_path, n):
+    path = csv_factory(n)
+    DataLoader(path, snapshot_dir=str(tmp_path)).load_data()  # Warm the snapshot
+    benchmark.extra_info["rows"] = n
+    data = benchmark(lambda: DataLoader(path, snapshot_dir=str(tmp_path)).load_data())
+    assert len(data) == n
+
+@pytest.mark.parametrize("n", SIZES)
+def bench_load_append(benchmark, tmp_path, n):
+    # One new daily quote on top of a snapshotted history
+    from conftest import write_brent_csv
+
+    path = str(write_brent_csv(tmp_path / "BrentOilPrices.csv", n))
+    snapshots = str(tmp_path / "snapshots")
+    with open(path) as f:
+        original = f.read()
+
+    def setup():
+        # Restore the snapshot of the original file, then append
+        with open(path, "w") as f:
+            f.write(original)
+        DataLoader(path, snapshot_dir=snapshots).load_data()
+        with open(path, "a") as f:
+            f.write("Nov 15, 2022,93.10\n")
+        return (), {}
+    benchmark.extra_info["rows"] = n
+    benchmark.pedantic(lambda: DataLoader(path, snapshot_dir=snapshots).load_data(), setup=setup, rounds=3, iterations=1)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import MODEL_SIZES, synthetic_prices
+from src.models.change_point_model import ChangePointModel, MarginalizedChangePointModel
+from src.models.multi_change_point import MultiChangePointDetector
+from src.models.window_scan import ChangeProbabilityScan
+
+def _series(n):
+    true_tau = int(n * 0.6)
+    return pd.Series(synthetic_prices(n, change_points=[true_tau])), true_tau - 1
+
+def _record_accuracy(benchmark, trace, true_tau, n):
+    tau = int(np.median(trace.posterior["tau"].values))
+    benchmark.extra_info.update({"n": n, "true_tau": true_tau, "tau": tau, "tau_abs_error": abs(tau - true_tau)})
+    return tau
+
+@pytest.mark.parametrize("n", MODEL_SIZES)
+def bench_build_model(benchmark, n):
+    data, _ = _series(n)
+    benchmark(lambda: ChangePointModel(data).build_model())
+
+@pytest.mark.parametrize("n", MODEL_SIZES)
+def bench_exact_inference(benchmark, n):
+    data, true_tau = _series(n)
+    trace = benchmark(lambda: ChangePointModel(data, engine="exact").run_inference(draws=1000, random_seed=0))
+    assert abs(_record_accuracy(benchmark, trace, true_tau, n) - true_tau) <= max(2, n // 100)
+
+@pytest.mark.mcmc
+@pytest.mark.parametrize("n", MODEL_SIZES)
+@pytest.mark.parametrize("model_cls", [ChangePointModel, MarginalizedChangePointModel])
+def bench_mcmc_inference(benchmark, n, model_cls):
+    data, true_tau = _series(n)
+
+    def run():
+        return model_cls(data).run_inference(draws=300, tune=300, chains=2, cores=1, random_seed=0)
+    trace = benchmark.pedantic(run, rounds=1, iterations=1)
+    benchmark.extra_info["model"] = model_cls.__name__
+    _record_accuracy(benchmark, trace, true_tau, n)
+
+@pytest.mark.parametrize("n", MODEL_SIZES)
+def bench_pelt(benchmark, n):
+    change_points = [n // 3, 2 * n // 3]
+    data = pd.Series(synthetic_prices(n, change_points=change_points))
+    detector = benchmark(lambda: MultiChangePointDetector(model="meanvar", min_size=20).fit(data))
+    found = detector.change_points_
+    benchmark.extra_info.update({"n": n, "true": change_points, "found": found})
+    assert len(found) == 2
+
+@pytest.mark.parametrize("stride", [1, 5])
+def bench_window_scan(benchmark, stride):
+    n = 9_000
+    true_break = n // 2
+    data = synthetic_prices(n, change_points=[true_break])
+    scan = ChangeProbabilityScan(width=250, stride=stride)
+    result = benchmark(lambda: scan.run(data))
+    found = int(result["change_probability"].idxmax())
+    benchmark.extra_info.update({"windows": len(scan.window_starts(n)), "true": true_break, "found": found})
+    assert abs(found - true_break) <= 2
@@ -0,0 +1,47 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Benchmarks run with benchmarks/ as rootdir, so put the project root on the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CSV_SIZES = [10_000, 100_000, 1_000_000]
+if os.environ.get("BENCH_LARGE"):
+    CSV_SIZES.append(10_000_000)
+
+MODEL_SIZES = [250, 1_000, 9_000]
+
+def synthetic_prices(n: int, change_points=(), seed: int = 0) -> np.ndarray:
+    """
+    Piecewise-stationary price series with known mean shifts at `change_points`.
+    """
+    rng = np.random.default_rng(seed)
+    bounds = [0, *change_points, n]
+    levels = 50 + 20 * np.arange(len(bounds) - 1)
+    return np.concatenate([rng.normal(level, 2.0, end - start)
+                           for level, start, end in zip(levels, bounds[:-1], bounds[1:])])
+
+def write_brent_csv(path, n: int, seed: int = 0):
+    """
+    Writes a BrentOilPrices-style CSV with the dataset's two date formats:
+    '20-May-87' for the first half and 'Nov 14, 2022' for the second. Rows
+    are spread over 1987-2022, so large files repeat dates.
+    """
+    span = (pd.Timestamp("2022-11-14") - pd.Timestamp("1987-05-20")).days
+    dates = pd.Timestamp("1987-05-20") + pd.to_timedelta(np.arange(n) * span // max(n - 1, 1), unit="D")
+    half = n // 2
+    labels = np.concatenate([dates[:half].strftime("%d-%b-%y"), dates[half:].strftime("%b %d, %Y")])
+    pd.DataFrame({"Date": labels, "Price": synthetic_prices(n, seed=seed).round(2)}).to_csv(path, index=False)
+    return path
+
+@pytest.fixture(scope="session")
+def csv_factory(tmp_path_factory):
+    cache = {}
+
+    def make(n: int):
+        if n not in cache:
+            cache[n] = write_brent_csv(tmp_path_factory.mktemp(f"csv_{n}") / "BrentOilPrices.csv", n)
+        return str(cache[n])
+    return make
@@ -8,10 +8,17 @@ import {
 } from 'lucide-react';
 
 const api = {
-    fetchPrices: (start, end) => fetch(`http://localhost:5000/api/prices?start_date=${start || ''}&end_date=${end || ''}`).then(res => res.json()),
+    // Columnar payload (gzip-compressed, revalidated by ETag), expanded to chart rows here
+    fetchPrices: (start, end, width = window.innerWidth) => fetch(`http://localhost:5000/api/prices?start_date=${start || ''}&end_date=${end || ''}&width=${width}&format=columns`)
+        .then(res => res.json())
+        .then(({ dates, prices }) => dates.map((Date, i) => ({ Date, Price: prices[i] }))),
     fetchEvents: () => fetch('http://localhost:5000/api/events').then(res => res.json()),
     fetchStats: () => fetch('http://localhost:5000/api/stats').then(res => res.json()),
     fetchAnalysis: () => fetch('http://localhost:5000/api/analysis').then(res => res.json()),
+    // `width` is the scan window here; the chart's pixel width goes in `chart_width`
+    fetchChangeProbability: (start, end, chartWidth = window.innerWidth) => fetch(`http://localhost:5000/api/change_probability?start_date=${start || ''}&end_date=${end || ''}&width=250&stride=1&chart_width=${chartWidth}&format=columns`)
+        .then(res => res.json())
+        .then(({ dates = [], probabilities, windows }) => dates.map((Date, i) => ({ Date, Probability: probabilities[i], Windows: windows[i] }))),
 };
 
 const StatCard = ({ title, value, icon: Icon, colorClass = "" }) => (
@@ -33,6 +40,7 @@ function App() {
     const [events, setEvents] = useState([]);
     const [stats, setStats] = useState({});
     const [analysis, setAnalysis] = useState("");
+    const [changeProbability, setChangeProbability] = useState([]);
     const [selectedEvent, setSelectedEvent] = useState(null);
     const [loading, setLoading] = useState(true);
 
@@ -43,16 +51,18 @@ function App() {
 
     const loadData = async (start = startDate, end = endDate) => {
         try {
-            const [p, e, s, a] = await Promise.all([
+            const [p, e, s, a, c] = await Promise.all([
                 api.fetchPrices(start, end),
                 api.fetchEvents(),
                 api.fetchStats(),
-                api.fetchAnalysis()
+                api.fetchAnalysis(),
+                api.fetchChangeProbability(start, end)
             ]);
             setPrices(p);
             setEvents(e);
             setStats(s);
             setAnalysis(a.report);
+            setChangeProbability(Array.isArray(c) ? c : []);
         } catch (err) {
             console.error("Data error:", err);
         } finally {
@@ -63,10 +73,8 @@ function App() {
     useEffect(() => { loadData(); }, []);
 
     const chartData = useMemo(() => {
-        if (!prices.length) return [];
-        // Dynamic downsampling: If range is large, downsample. If small (zoomed), show all.
-        const step = prices.length > 2000 ? 5 : 1;
-        return prices.filter((_, i) => i % step === 0);
+        // Already downsampled server-side (LTTB, keeping change points and event dates)
+        return prices;
     }, [prices]);
 
     const handleApplyFilter = () => {
@@ -256,6 +264,32 @@ function App() {
                             </AreaChart>
                         </ResponsiveContainer>
                     </div>
+
+                    <p style={{ fontSize: '0.7rem', color: '#71717a', textTransform: 'uppercase', fontWeight: '700', marginTop: '1rem' }}>
+                        Regime Break Probability (250-day sliding windows)
+                    </p>
+                    <div style={{ width: '100%', height: '120px' }}>
+                        <ResponsiveContainer width="100%" height="100%">
+                            <AreaChart data={changeProbability} margin={{ top: 5, right: 20, left: -10, bottom: 5 }}>
+                                <XAxis dataKey="Date" hide />
+                                <YAxis stroke="#52525b" fontSize={10} tickLine={false} axisLine={false} domain={[0, 'auto']} />
+                                <Tooltip
+                                    contentStyle={{ backgroundColor: '#000', border: '1px solid #ef4444', borderRadius: '8px', fontSize: '12px' }}
+                                    formatter={v => (v === null ? '–' : v.toFixed(3))}
+                                />
+                                <Area
+                                    type="step"
+                                    dataKey="Probability"
+                                    stroke="#ef4444"
+                                    fill="rgba(239, 68, 68, 0.3)"
+                                    isAnimationActive={false}
+                                />
+                                {selectedEvent && (
+                                    <ReferenceLine x={selectedEvent.Date} stroke="#ef4444" strokeDasharray="3 3" />
+                                )}
+                            </AreaChart>
+                        </ResponsiveContainer>
+                    </div>
                 </div>
 
                 <aside className="catalyst-panel">
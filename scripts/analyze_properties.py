@@ -1,17 +1,19 @@
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.stattools import adfuller
-from src.data.loader import DataLoader
+from src.analysis.rolling import get_rolling_engine
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 def analyze_properties():
-    loader = DataLoader("data/raw/BrentOilPrices.csv")
+    loader = DataLoader("data/raw/BrentOilPrices.csv", snapshot_dir=DEFAULT_SNAPSHOT_DIR)
     df = loader.load_data()
+    rolling = get_rolling_engine(df['Price'].values)
     
     # 1. Trend Analysis
-    df['Rolling_Mean'] = df['Price'].rolling(window=252).mean() # 1 year rolling mean
+    df['Rolling_Mean'] = rolling.rolling_mean(252) # 1 year rolling mean
     
     # 2. Stationarity Testing (ADF)
     result = adfuller(df['Price'].dropna())
@@ -24,7 +26,7 @@ def analyze_properties():
     logger.info(f"Returns ADF p-value: {res_returns[1]}")
     
     # 3. Volatility Patterns
-    df['Volatility'] = df['Returns'].rolling(window=21).std() * np.sqrt(252) # Annualized 1-month volatility
+    df['Volatility'] = rolling.volatility(21) # Annualized 1-month volatility
     
     print("--- Time Series Properties ---")
     print(f"ADF Statistic (Price): {result[0]:.4f}")
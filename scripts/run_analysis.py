@@ -5,7 +5,7 @@ import pandas as pd
 # Add src to path if running from root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.data.loader import DataLoader
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
 from src.models.change_point_model import ChangePointModel
 from src.utils.logger import setup_logger
 
@@ -20,7 +20,7 @@ def main():
         return
 
     # 1. Load Data
-    loader = DataLoader(data_path)
+    loader = DataLoader(data_path, snapshot_dir=DEFAULT_SNAPSHOT_DIR)
     df = loader.load_data()
     
     # 2. Prepare Data (Example: using a subset for quick testing)
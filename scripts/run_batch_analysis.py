@@ -0,0 +1,61 @@
+import os
+import sys
+import argparse
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
+
+from src.analysis.batch_runner import BatchRunner, yearly_windows, rolling_windows, event_windows
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
+from src.utils.logger import setup_logger
+
+logger = setup_logger("Batch_Change_Point_Analysis")
+
+def run_batch(windows: str = "yearly", series: str = "price", engine: str = "mcmc",
+              workers=None, draws: int = 1000, tune: int = 1000, chains: int = 2,
+              summarize: bool = True):
+    """
+    Runs the single change point model over many windows and saves one table.
+    With `summarize`, each window keeps compact streaming summaries instead of
+    its full trace, so memory stays flat however many windows run.
+    """
+    os.makedirs("data/task_2_results", exist_ok=True)
+    loader = DataLoader("data/raw/BrentOilPrices.csv", snapshot_dir=DEFAULT_SNAPSHOT_DIR)
+    df = loader.load_data()
+    df['Log_Return'] = np.log(df['Price'] / df['Price'].shift(1))
+
+    window_list = []
+    if windows in ("yearly", "all"):
+        window_list += yearly_windows(df['Date'])
+    if windows == "rolling":
+        window_list += rolling_windows(df['Date'])
+    if windows in ("events", "all"):
+        event_df = pd.read_csv("data/raw/geopolitical_events.csv")
+        window_list += event_windows(event_df)
+
+    runner = BatchRunner(df, column='Price' if series == "price" else 'Log_Return', engine=engine,
+                         max_workers=workers, draws=draws, tune=tune, chains=chains,
+                         summarize=summarize)
+    results = runner.run(window_list)
+    out_path = f"data/task_2_results/batch_{windows}_{series}_{engine}.csv"
+    results.to_csv(out_path, index=False)
+    logger.info(f"Saved {len(results)} window results to {out_path}")
+    print(results.to_string(index=False))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel multi-window change point analysis.")
+    parser.add_argument("--windows", choices=["yearly", "rolling", "events", "all"], default="all")
+    parser.add_argument("--series", choices=["price", "log_return"], default="price")
+    parser.add_argument("--engine", choices=["mcmc", "exact", "batched"], default="mcmc")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--draws", type=int, default=1000)
+    parser.add_argument("--tune", type=int, default=1000)
+    parser.add_argument("--chains", type=int, default=2)
+    parser.add_argument("--keep-traces", action="store_true",
+                        help="Keep full traces per window (enables the inference cache).")
+    args = parser.parse_args()
+    run_batch(args.windows, args.series, args.engine, args.workers, args.draws, args.tune, args.chains,
+              summarize=not args.keep_traces)
@@ -0,0 +1,67 @@
+import os
+import sys
+import argparse
+import pandas as pd
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
+
+from src.analysis.events import EventIndex, load_event_index
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
+from src.models.multi_change_point import MultiChangePointDetector
+from src.utils.logger import setup_logger
+
+logger = setup_logger("Multi_Change_Point_Detection")
+
+def run_detection(series: str = "log_return", model: str = "meanvar", penalty="bic", min_size: int = 20,
+                  window_days: int = 30):
+    """
+    Segments the full Brent history and associates each break with events.
+
+    Args:
+        series (str): "price" or "log_return".
+        model (str): Cost model passed to MultiChangePointDetector.
+        penalty: "bic", "aic" or a number.
+        min_size (int): Minimum segment length in trading days.
+        window_days (int): Events within ±window_days of a break are associated with it.
+    """
+    os.makedirs("data/task_2_results", exist_ok=True)
+
+    loader = DataLoader("data/raw/BrentOilPrices.csv", snapshot_dir=DEFAULT_SNAPSHOT_DIR)
+    df = loader.load_data()
+    df['Log_Return'] = np.log(df['Price'] / df['Price'].shift(1))
+    df = df.dropna(subset=['Log_Return']) if series == "log_return" else df
+
+    values = pd.Series(df['Log_Return' if series == "log_return" else 'Price'].values, index=df['Date'])
+    detector = MultiChangePointDetector(model=model, penalty=penalty, min_size=min_size).fit(values)
+    change_dates = detector.change_dates()
+
+    segments = detector.segments()
+    segments.to_csv("data/task_2_results/multi_change_point_segments.csv", index=False)
+
+    events_path = "data/raw/geopolitical_events.csv"
+    event_index = load_event_index(events_path)
+    if event_index is None:
+        logger.warning(f"No events file at {events_path}; skipping event association.")
+        event_index = EventIndex([], [])
+    matches = event_index.match(change_dates, days_before=window_days, days_after=window_days)
+    nearest = event_index.nearest(change_dates)
+    nearest.to_csv("data/task_2_results/multi_change_point_nearest_events.csv", index=False)
+    matches.to_csv("data/task_2_results/multi_change_point_events.csv", index=False)
+
+    print(f"Detected {len(change_dates)} change points ({series}, {model} cost):")
+    print(segments.to_string(index=False))
+    print(matches.to_string(index=False) if not matches.empty else f"No events within ±{window_days} days of any change point.")
+    return change_dates, segments, matches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiple change point detection over the full Brent history.")
+    parser.add_argument("--series", choices=["price", "log_return"], default="log_return")
+    parser.add_argument("--model", choices=["mean", "var", "meanvar"], default="meanvar")
+    parser.add_argument("--penalty", default="bic", help="'bic', 'aic' or a number.")
+    parser.add_argument("--min-size", type=int, default=20)
+    parser.add_argument("--window-days", type=int, default=30)
+    args = parser.parse_args()
+    penalty = args.penalty if args.penalty in ("bic", "aic") else float(args.penalty)
+    run_detection(args.series, args.model, penalty, args.min_size, args.window_days)
@@ -1,97 +1,143 @@
 import os
 import sys
+import json
+import argparse
 import pandas as pd
 import numpy as np
-import pymc as pm
 import arviz as az
-import matplotlib.pyplot as plt
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
 
-from src.data.loader import DataLoader
+from src.analysis.events import load_event_index, tau_probabilities
+from src.analysis.significance import BreakSignificanceTest
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
+from src.models.change_point_model import ChangePointModel
+from src.models.inference_cache import InferenceCache
 from src.utils.logger import setup_logger
+from src.utils.metrics import metrics
+from src.visualization.plot_build import FigureSpec, PlotBuilder
+from src.visualization.report_figures import change_point_figure, log_returns_figure, trace_figure
 
 logger = setup_logger("Exemplary_Bayesian_Modeling")
 
-def run_modeling():
+def run_modeling(engine: str = "mcmc", start_date: str = "2008-01-01", end_date: str = "2008-12-31",
+                 use_cache: bool = True, backend: str = "pymc", summarize: bool = False,
+                 save_trace: bool = False, resamples: int = 2000):
+    """
+    Runs the single change point analysis on a date window of Brent prices.
+
+    Args:
+        engine (str): "mcmc" for PyMC sampling, "exact" for the conjugate
+            posterior (fast enough for the full 1987-2022 history).
+        start_date, end_date (str): Inclusive window bounds; None for open ends.
+        use_cache (bool): Reuse cached inference results for unchanged inputs.
+        backend (str): MCMC sampler backend ("pymc", "numba" or "nutpie").
+        summarize (bool): Stream draws into compact posterior summaries instead
+            of keeping the full trace in memory (bypasses the cache; not
+            available with the nutpie backend).
+        save_trace (bool): Write the full trace to data/task_2_results/trace.nc.
+        resamples (int): Block-bootstrap resamples for the significance test of the break.
+    """
     os.makedirs("data/task_2_results", exist_ok=True)
     
     # 1. Load data
-    loader = DataLoader("data/raw/BrentOilPrices.csv")
+    loader = DataLoader("data/raw/BrentOilPrices.csv", snapshot_dir=DEFAULT_SNAPSHOT_DIR)
     df = loader.load_data()
     
     # --- TASK 2 FEEDBACK: LOG RETURNS ---
     logger.info("Computing Log Returns...")
     df['Log_Return'] = np.log(df['Price'] / df['Price'].shift(1))
     
-    plt.figure(figsize=(12, 5))
-    plt.plot(df['Date'], df['Log_Return'], color='skyblue', alpha=0.6)
-    plt.title("Brent Oil Daily Log Returns (1987-2022)")
-    plt.ylabel("Log Change")
-    plt.savefig("data/task_2_results/log_returns_full.png")
-    plt.close()
-
-    # 2. Focus on 2008 Financial Crisis
-    mask = (df['Date'] >= '2008-01-01') & (df['Date'] <= '2008-12-31')
+    figures = [FigureSpec("log_returns_full", "data/task_2_results/log_returns_full.png", log_returns_figure,
+                          {"dates": df['Date'].values, "log_returns": df['Log_Return'].values},
+                          figsize=(12, 5), dpi=100)]
+
+    # 2. Focus on the requested window (default: 2008 Financial Crisis)
+    mask = pd.Series(True, index=df.index)
+    if start_date:
+        mask &= df['Date'] >= start_date
+    if end_date:
+        mask &= df['Date'] <= end_date
     subset = df[mask].copy().reset_index(drop=True)
     prices = subset['Price'].values
     dates = subset['Date'].values
     n = len(prices)
+    period = f"{pd.to_datetime(dates[0]):%Y-%m-%d} to {pd.to_datetime(dates[-1]):%Y-%m-%d}"
     
-    logger.info(f"Running Bayesian Model on 2008 period ({n} data points)...")
+    logger.info(f"Running Bayesian Model ({engine}) on {period} ({n} data points)...")
     
-    with pm.Model() as model:
-        tau = pm.DiscreteUniform("tau", lower=0, upper=n - 1)
-        mu_1 = pm.Normal("mu_1", mu=prices.mean(), sigma=prices.std())
-        mu_2 = pm.Normal("mu_2", mu=prices.mean(), sigma=prices.std())
-        idx = np.arange(n)
-        mu = pm.math.switch(tau >= idx, mu_1, mu_2)
-        sigma = pm.HalfNormal("sigma", sigma=prices.std())
-        pm.Normal("obs", mu=mu, sigma=sigma, observed=prices)
-        
-        # REDUCE SAMPLES FOR SESSION SPEED
-        trace = pm.sample(draws=500, tune=500, chains=1, return_inferencedata=True, progressbar=False)
+    model = ChangePointModel(subset['Price'], engine=engine)
+    # Four parallel chains, stopped as soon as R-hat and ESS targets are met
+    cache = InferenceCache() if use_cache and not summarize else None
+    trace_path = "data/task_2_results/trace.nc" if save_trace else None
+    result = model.run_inference(draws=2000, tune=500, chains=4, backend=backend, target_rhat=1.01,
+                                 target_ess=400, random_seed=42, cache=cache, summarize=summarize,
+                                 trace_path=trace_path)
 
     # 3. CONVERGENCE DIAGNOSTICS
-    summary = az.summary(trace)
+    summary = model.summary if model.summary is not None else az.summary(result)
     logger.info(f"Convergence Check (R_hat):\n{summary[['mean', 'sd', 'r_hat']]}")
     summary.to_csv("data/task_2_results/convergence_summary.csv")
 
     # 4. PROGRAMMATIC CHANGE POINT MAPPING
-    tau_samples = trace.posterior['tau'].values.flatten()
-    most_likely_tau = int(np.median(tau_samples))
+    if summarize:
+        most_likely_tau = result.tau_median
+        tau_probs = result.tau_probabilities()
+        n_chains = result.chains
+    else:
+        tau_samples = result.posterior['tau'].values.flatten()
+        most_likely_tau = int(np.median(tau_samples))
+        if model.exact_posterior is not None:
+            tau_probs = model.exact_posterior.tau_probs
+        else:
+            tau_probs = tau_probabilities(tau_samples, n)
+        n_chains = result.posterior.sizes['chain']
     detected_date = pd.to_datetime(dates[most_likely_tau]).strftime('%Y-%m-%d')
     
+    # Frequentist check of the detected break: block-bootstrap p-value and intervals
+    # tau = n - 1 is the model's "no change in the window"; the test then locates its own break
+    tested_tau = most_likely_tau if most_likely_tau < len(prices) - 1 else None
+    if tested_tau is None:
+        logger.info("Posterior median places no change in the window; testing the statistic's own break.")
+    significance = BreakSignificanceTest("lr", "block_bootstrap", n_resamples=resamples,
+                                         seed=42).run(prices, tau=tested_tau)
+    tau_lo, tau_hi = significance.tau_ci
+    tested_date = pd.to_datetime(dates[significance.tau]).strftime('%Y-%m-%d')
+    date_ci = tuple(pd.to_datetime(dates[i]).strftime('%Y-%m-%d') for i in (tau_lo, tau_hi))
+    with open("data/task_2_results/significance.json", "w") as f:
+        json.dump({**significance.to_dict(), "change_date": tested_date, "change_date_ci": date_ci}, f, indent=2)
+
     # 5. AUTOMATED EVENT ASSOCIATION
-    event_df = pd.read_csv("data/raw/geopolitical_events.csv")
-    event_df['Date'] = pd.to_datetime(event_df['Date'])
-    
-    # Find events within 30 days of detected change point
-    detected_dt = pd.to_datetime(detected_date)
-    associated_events = event_df[
-        (event_df['Date'] >= detected_dt - pd.Timedelta(days=30)) & 
-        (event_df['Date'] <= detected_dt + pd.Timedelta(days=30))
-    ]
-    
+    # Weight each event by the posterior mass of tau within ±30 days of it
+    event_index = load_event_index("data/raw/geopolitical_events.csv")
+    if event_index is not None:
+        associated_events = event_index.event_probabilities(dates, tau_probs, days_before=30, days_after=30)
+        associated_events = associated_events[associated_events['Probability'] >= 0.01].assign(
+            Date=lambda d: d['Event_Date'].dt.strftime('%Y-%m-%d'))
+    else:
+        logger.warning("No events file found; skipping event association.")
+        associated_events = pd.DataFrame(columns=['Date', 'Event', 'Probability'])
+
     # 6. QUANTITATIVE IMPACT FROM POSTERIOR
-    mu1_samples = trace.posterior['mu_1'].values.flatten()
-    mu2_samples = trace.posterior['mu_2'].values.flatten()
-    mu1_mean, mu2_mean = np.mean(mu1_samples), np.mean(mu2_samples)
+    mu1_mean, mu2_mean = summary.loc['mu_1', 'mean'], summary.loc['mu_2', 'mean']
     pct_change = ((mu2_mean - mu1_mean) / mu1_mean) * 100
     
-    # Save visualizations
-    az.plot_trace(trace)
-    plt.savefig("data/task_2_results/exemplary_trace.png")
-    
-    plt.figure(figsize=(10, 6))
-    plt.plot(dates, prices, label='Oil Price', color='black', alpha=0.3)
-    plt.axvline(x=dates[most_likely_tau], color='red', linestyle='--', label=f'Change Point: {detected_date}')
-    plt.title("Detected Regime Shift Over Price Data")
-    plt.legend()
-    plt.savefig("data/task_2_results/change_point_overlay.png")
-
-    events_str = associated_events[['Date', 'Event']].to_string(index=False) if not associated_events.empty else "No direct matches found in current window."
+    # Save visualizations (unchanged figures are skipped, the rest render in parallel)
+    # Summarized runs only have a trace to plot when it was written to disk
+    trace = result if not summarize else (az.from_netcdf(trace_path) if trace_path else None)
+    if trace is not None:
+        posterior = {v: trace.posterior[v].values for v in trace.posterior.data_vars}
+        figures.append(FigureSpec("exemplary_trace", "data/task_2_results/exemplary_trace.png", trace_figure,
+                                  {"posterior": posterior}, figsize=(12, 2 * len(posterior)), dpi=100))
+    figures += [
+        FigureSpec("change_point_overlay", "data/task_2_results/change_point_overlay.png", change_point_figure,
+                   {"dates": dates, "prices": prices, "change_date": detected_date,
+                    "label": f'Change Point: {detected_date}'}, figsize=(10, 6), dpi=100),
+    ]
+    PlotBuilder().build(figures)
+
+    events_str = associated_events[['Date', 'Event', 'Probability']].to_string(index=False) if not associated_events.empty else "No direct matches found in current window."
     
     # 7. FINAL REPORT
     report = f"""
@@ -99,6 +145,7 @@ def run_modeling():
 EXEMPLARY BAYESIAN ANALYSIS REPORT
 ============================================================
 1. DETECTED REGIME SHIFT
+   - Period Analysed: {period} ({n} observations, {engine} engine)
    - Change Point Date: {detected_date}
    - Posterior Certainty (Median Tau): Index {most_likely_tau}
 
@@ -107,15 +154,21 @@ EXEMPLARY BAYESIAN ANALYSIS REPORT
    - Expected Mean (After):  ${mu2_mean:.2f}
    - Magnitude of Shift:     {pct_change:+.2f}%
 
-3. AUTOMATED EVENT ASSOCIATION
-   Matched the following researched events within ±30 days:
+3. STATISTICAL SIGNIFICANCE ({significance.n_resamples} block-bootstrap resamples)
+   - Tested Break: {tested_date}{'' if tested_tau is not None else " (the statistic's own; the posterior median places no change)"}
+   - Likelihood Ratio Statistic: {significance.observed:.2f} (p = {significance.p_value:.4f})
+   - {significance.ci_level:.0%} Interval for the Change Date: {date_ci[0]} to {date_ci[1]}
+   - {significance.ci_level:.0%} Interval for the Shift: ${significance.shift_ci[0]:+.2f} to ${significance.shift_ci[1]:+.2f}
+
+4. AUTOMATED EVENT ASSOCIATION
+   Researched events with the posterior probability of the change falling within ±30 days:
 {events_str}
 
-4. CONVERGENCE DIAGNOSTICS
+5. CONVERGENCE DIAGNOSTICS
    - Max R_hat: {summary['r_hat'].max():.4f} (Ideally < 1.05)
-   - Sampling completed successfully across {trace.posterior.dims['chain']} chains.
+   - Sampling completed successfully across {n_chains} chains.
 
-5. LOG RETURN ANALYSIS
+6. LOG RETURN ANALYSIS
    - Workflow included log-return computation for stationarity.
    - Plot saved to data/task_2_results/log_returns_full.png
 ============================================================
@@ -124,5 +177,35 @@ EXEMPLARY BAYESIAN ANALYSIS REPORT
         f.write(report)
     print(report)
 
+    # 8. STAGE TIMINGS
+    stage_metrics = metrics.snapshot()
+    for name, hist in stage_metrics['histograms'].items():
+        logger.info(f"Stage {name}: {hist['sum_ms'] / 1000:.2f}s over {hist['count']} call(s)")
+    with open("data/task_2_results/run_metrics.json", "w") as f:
+        json.dump(stage_metrics, f, indent=2)
+
 if __name__ == "__main__":
-    run_modeling()
+    parser = argparse.ArgumentParser(description="Single change point analysis of Brent oil prices.")
+    parser.add_argument("--engine", choices=["mcmc", "exact"], default="mcmc")
+    parser.add_argument("--start", default="2008-01-01", help="Window start date (use 'all' for full history).")
+    parser.add_argument("--end", default="2008-12-31", help="Window end date (use 'all' for full history).")
+    parser.add_argument("--backend", choices=["pymc", "numba", "nutpie"], default="pymc",
+                        help="Sampler backend for the mcmc engine.")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-run inference.")
+    parser.add_argument("--summarize", action="store_true",
+                        help="Keep streaming posterior summaries instead of the full trace in memory "
+                             "(not with --backend nutpie).")
+    parser.add_argument("--save-trace", action="store_true", help="Write the full trace to trace.nc.")
+    parser.add_argument("--resamples", type=int, default=2000,
+                        help="Block-bootstrap resamples for the significance test of the break.")
+    args = parser.parse_args()
+    run_modeling(
+        engine=args.engine,
+        start_date=None if args.start == "all" else args.start,
+        end_date=None if args.end == "all" else args.end,
+        use_cache=not args.no_cache,
+        backend=args.backend,
+        summarize=args.summarize,
+        save_trace=args.save_trace,
+        resamples=args.resamples,
+    )
@@ -0,0 +1,58 @@
+import os
+import sys
+import argparse
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.getcwd(), '.')))
+
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
+from src.models.online_detector import OnlineChangePointDetector
+from src.utils.logger import setup_logger
+
+logger = setup_logger("Online_Change_Point_Update")
+
+CHECKPOINT_PATH = "data/processed/online_detector.npz"
+
+def update_detector(checkpoint_path: str = CHECKPOINT_PATH, warmup: int = 250, alert_threshold: float = 0.5):
+    """
+    Feeds prices newer than the checkpoint into the online detector and saves it.
+    Without a checkpoint (or with one that doesn't record its last timestamp)
+    the detector is warmed up on the first `warmup` prices and then streams
+    the rest of the history.
+    """
+    loader = DataLoader("data/raw/BrentOilPrices.csv", snapshot_dir=DEFAULT_SNAPSHOT_DIR)
+    df = loader.load_data()
+
+    detector = OnlineChangePointDetector.load(checkpoint_path) if os.path.exists(checkpoint_path) else None
+    if detector is not None and not detector.last_timestamp:
+        # Without the last timestamp we can't tell which prices it has seen; re-feeding
+        # the history would count every observation twice
+        logger.warning(f"Checkpoint {checkpoint_path} has no last timestamp; starting fresh.")
+        detector = None
+    if detector is not None:
+        new_rows = df[df['Date'] > pd.Timestamp(detector.last_timestamp)]
+    else:
+        logger.info(f"No usable checkpoint at {checkpoint_path}; warming up on {warmup} prices.")
+        detector = OnlineChangePointDetector.from_warmup(df['Price'].values[:warmup], series="log_return")
+        new_rows = df.iloc[warmup:]
+
+    status = detector.status()
+    for date, price in zip(new_rows['Date'], new_rows['Price']):
+        status = detector.update(price, timestamp=date.strftime('%Y-%m-%d')) or status
+        if status['change_probability'] >= alert_threshold:
+            logger.warning(f"Possible regime shift on {status['timestamp']}: "
+                           f"P(change) = {status['change_probability']:.2f}")
+
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+    detector.save(checkpoint_path)
+    logger.info(f"Processed {len(new_rows)} new prices. Current status: {status}")
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally update the online change point detector.")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--warmup", type=int, default=250)
+    parser.add_argument("--alert-threshold", type=float, default=0.5)
+    args = parser.parse_args()
+    update_detector(args.checkpoint, args.warmup, args.alert_threshold)
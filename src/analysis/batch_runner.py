@@ -0,0 +1,208 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+RESULT_COLUMNS = [
+    "window", "start", "end", "n", "engine", "change_date", "tau",
+    "mu_1", "mu_2", "pct_change", "r_hat", "runtime_s", "error",
+]
+
+# Per-process model cache: each worker keeps one model graph and its compiled
+# NUTS step, and swaps windows in with set_data instead of rebuilding them.
+_WARM_MODELS = {}
+
+def yearly_windows(dates: pd.Series) -> List[dict]:
+    """
+    One window per calendar year present in the dates.
+    """
+    years = pd.DatetimeIndex(dates).year.unique()
+    return [{"window": str(y), "start": f"{y}-01-01", "end": f"{y}-12-31"} for y in sorted(years)]
+
+def rolling_windows(dates: pd.Series, width_days: int = 365, step_days: int = 90) -> List[dict]:
+    """
+    Overlapping calendar windows of `width_days`, advanced by `step_days`.
+    """
+    dates = pd.DatetimeIndex(dates)
+    windows = []
+    start = dates.min()
+    while start + pd.Timedelta(days=width_days) <= dates.max() + pd.Timedelta(days=1):
+        end = start + pd.Timedelta(days=width_days - 1)
+        windows.append({"window": f"{start:%Y-%m-%d}", "start": f"{start:%Y-%m-%d}", "end": f"{end:%Y-%m-%d}"})
+        start += pd.Timedelta(days=step_days)
+    return windows
+
+def event_windows(event_df: pd.DataFrame, days_before: int = 90, days_after: int = 90) -> List[dict]:
+    """
+    One window around each row of the events table (needs 'Date' and 'Event').
+    """
+    windows = []
+    for _, row in event_df.iterrows():
+        date = pd.to_datetime(row['Date'])
+        windows.append({
+            "window": f"{date:%Y-%m-%d} {row['Event']}",
+            "start": f"{date - pd.Timedelta(days=days_before):%Y-%m-%d}",
+            "end": f"{date + pd.Timedelta(days=days_after):%Y-%m-%d}",
+        })
+    return windows
+
+def _get_model(engine: str, values: pd.Series):
+    from src.models.change_point_model import ChangePointModel, MarginalizedChangePointModel
+
+    if engine == "exact":
+        return ChangePointModel(values, engine="exact")
+    model = _WARM_MODELS.get(engine)
+    if model is None:
+        model = MarginalizedChangePointModel(values)
+        _WARM_MODELS[engine] = model
+    else:
+        model.set_data(values)
+    return model
+
+def analyse_window(task: dict) -> dict:
+    """
+    Fits one window and returns a flat result row. Errors are captured in the
+    row instead of raised, so one bad window doesn't abort the batch. With a
+    "cache_dir" in the task, results go through an InferenceCache; with
+    `summarize` in the sample kwargs, draws are streamed into compact
+    summaries and no trace is kept (nor cached).
+    """
+    import arviz as az
+
+    started = time.perf_counter()
+    dates = pd.DatetimeIndex(task["dates"])
+    row = {"window": task["window"], "start": task["start"], "end": task["end"],
+           "n": len(task["values"]), "engine": task["engine"]}
+    try:
+        values = pd.Series(task["values"], dtype=float)
+        model = _get_model(task["engine"], values)
+        sample_kwargs = dict(task.get("sample_kwargs") or {})
+        sample_kwargs["cores"] = 1  # Parallelism comes from the process pool
+        summarize = sample_kwargs.get("summarize", False)
+        if task.get("cache_dir") and not summarize:
+            from src.models.inference_cache import InferenceCache
+            sample_kwargs["cache"] = InferenceCache(task["cache_dir"])
+        result = model.run_inference(**sample_kwargs)
+
+        if summarize:
+            tau, mu_1, mu_2 = result.tau_median, result.mean("mu_1"), result.mean("mu_2")
+            max_rhat = float(np.nanmax(model.summary.loc[["mu_1", "mu_2", "sigma"], "r_hat"]))
+        else:
+            tau = int(np.median(result.posterior["tau"].values))
+            mu_1 = float(result.posterior["mu_1"].mean())
+            mu_2 = float(result.posterior["mu_2"].mean())
+            r_hat = az.rhat(result, var_names=["mu_1", "mu_2", "sigma"])
+            max_rhat = float(max(r_hat[v].max() for v in r_hat.data_vars))
+        row.update({
+            "change_date": dates[tau].strftime('%Y-%m-%d'),
+            "tau": tau,
+            "mu_1": mu_1,
+            "mu_2": mu_2,
+            "pct_change": (mu_2 - mu_1) / mu_1 * 100 if mu_1 != 0 else np.nan,
+            "r_hat": max_rhat,
+        })
+    except Exception as e:
+        row["error"] = str(e)
+    row["runtime_s"] = time.perf_counter() - started
+    return row
+
+class BatchRunner:
+    """
+    Fans change point analyses of many windows out over a process pool and
+    collects them into one tidy table.
+    """
+    def __init__(self, df: pd.DataFrame, column: str = "Price", engine: str = "mcmc",
+                 max_workers: Optional[int] = None, min_points: int = 20, **sample_kwargs):
+        """
+        Args:
+            df (pd.DataFrame): Data with a 'Date' column and the modeled column.
+            column (str): Column to analyse (e.g. 'Price' or 'Log_Return').
+            engine (str): "mcmc" (marginalized PyMC model per window), "exact",
+                or "batched" (every window in one vectorized PyMC model,
+                compiled and sampled once).
+            max_workers (int, optional): Pool size, defaults to the CPU count.
+                With one worker the windows run in-process.
+            min_points (int): Windows with fewer observations are skipped.
+            **sample_kwargs: Passed to `run_inference` (draws, tune, chains, ...).
+        """
+        if engine not in ("mcmc", "exact", "batched"):
+            raise ValueError(f"Unknown engine '{engine}'. Expected 'mcmc', 'exact' or 'batched'.")
+        if not {'Date', column}.issubset(df.columns):
+            raise ValueError(f"DataFrame must contain 'Date' and '{column}' columns.")
+        self.df = df.dropna(subset=[column]).sort_values('Date').reset_index(drop=True)
+        self.column = column
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_points = min_points
+        self.sample_kwargs = sample_kwargs
+
+    def _tasks(self, windows: List[dict]) -> List[dict]:
+        tasks = []
+        for window in windows:
+            mask = (self.df['Date'] >= window['start']) & (self.df['Date'] <= window['end'])
+            subset = self.df[mask]
+            if len(subset) < self.min_points:
+                logger.warning(f"Skipping window {window['window']}: only {len(subset)} observations.")
+                continue
+            tasks.append({
+                **window,
+                "dates": subset['Date'].values,
+                "values": subset[self.column].values,
+                "engine": self.engine,
+                "sample_kwargs": self.sample_kwargs,
+            })
+        return tasks
+
+    def _run_batched(self, tasks: List[dict]) -> List[dict]:
+        from src.models.batched_change_point import BatchedChangePointModel
+
+        if not tasks:
+            return []
+        started = time.perf_counter()
+        base = [{"window": t["window"], "start": t["start"], "end": t["end"], "n": len(t["values"]),
+                 "engine": self.engine} for t in tasks]
+        try:
+            sample_kwargs = {k: v for k, v in self.sample_kwargs.items() if k != "summarize"}
+            model = BatchedChangePointModel([t["values"] for t in tasks], names=[t["window"] for t in tasks])
+            model.run_inference(**sample_kwargs)
+            per_series = model.per_series()
+        except Exception as e:
+            return [{**row, "error": str(e), "runtime_s": time.perf_counter() - started} for row in base]
+
+        # One run covers every window, so each row reports the shared runtime
+        runtime = time.perf_counter() - started
+        rows = []
+        for row, task, fit in zip(base, tasks, per_series.itertuples()):
+            rows.append({**row, "change_date": pd.DatetimeIndex(task["dates"])[fit.tau].strftime('%Y-%m-%d'),
+                         "tau": fit.tau, "mu_1": fit.mu_1, "mu_2": fit.mu_2, "pct_change": fit.pct_change,
+                         "r_hat": fit.r_hat, "runtime_s": runtime})
+        return rows
+
+    def run(self, windows: List[dict]) -> pd.DataFrame:
+        """
+        Analyses every window and returns one row per window, in input order.
+        """
+        tasks = self._tasks(windows)
+        logger.info(f"Analysing {len(tasks)} windows with {self.max_workers} worker(s) ({self.engine} engine)...")
+        started = time.perf_counter()
+
+        if self.engine == "batched":
+            rows = self._run_batched(tasks)
+        elif self.max_workers == 1:
+            rows = [analyse_window(task) for task in tasks]
+        else:
+            rows = [None] * len(tasks)
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(analyse_window, task): i for i, task in enumerate(tasks)}
+                for future in as_completed(futures):
+                    rows[futures[future]] = future.result()
+
+        results = pd.DataFrame(rows).reindex(columns=RESULT_COLUMNS)
+        failed = results['error'].notna().sum()
+        logger.info(f"Batch finished in {time.perf_counter() - started:.1f}s ({failed} failed windows).")
+        return results
@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Optional
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int, keep: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013).
+
+    Splits the interior points into equal buckets and, walking left to right,
+    keeps the point of each bucket that forms the largest triangle with the
+    previously kept point and the mean of the next bucket. The first and last
+    points are always kept. Triangle areas are computed for a whole bucket at
+    once, so the Python loop runs once per output point, not per input point.
+
+    Args:
+        x, y (np.ndarray): Coordinates, x sorted ascending.
+        max_points (int): Size of the output (including `keep`).
+        keep (np.ndarray, optional): Indices that must appear in the output,
+            e.g. change points and event dates. They take from the budget.
+
+    Returns:
+        np.ndarray: Sorted indices into x / y.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    keep = np.unique(np.asarray(keep if keep is not None else [], dtype=np.int64))
+    keep = keep[(keep >= 0) & (keep < n)]
+
+    budget = max_points - len(keep)
+    if n <= max_points or budget < 3:
+        return np.arange(n) if n <= max_points else np.union1d(keep, [0, n - 1])
+
+    # Bucket edges over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    selected = np.empty(budget, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    # Means of every bucket up front (for the "next bucket" vertex)
+    cx, cy = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.maximum(np.diff(edges), 1)
+    mean_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    mean_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - mean_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return np.union1d(selected, keep)
+
+def nearest_indices(sorted_values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Index of the nearest element of a sorted array for each target.
+    """
+    sorted_values = np.asarray(sorted_values)
+    targets = np.asarray(targets)
+    if len(sorted_values) == 0 or len(targets) == 0:
+        return np.array([], dtype=np.int64)
+    if len(sorted_values) == 1:
+        return np.zeros(len(targets), dtype=np.int64)
+    right = np.clip(np.searchsorted(sorted_values, targets), 1, len(sorted_values) - 1)
+    left = right - 1
+    closer_left = (targets - sorted_values[left]) <= (sorted_values[right] - targets)
+    return np.where(closer_left, left, right)
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional
+
+def _to_days(dates) -> np.ndarray:
+    return np.asarray(pd.to_datetime(np.atleast_1d(np.asarray(dates))).values.astype('datetime64[D]'))
+
+def tau_probabilities(tau_samples, n: int) -> np.ndarray:
+    """
+    Posterior probability of each change point index 0..n-1 from tau draws.
+    """
+    counts = np.bincount(np.asarray(tau_samples, dtype=np.int64).ravel(), minlength=n)[:n]
+    return counts / max(counts.sum(), 1)
+
+class EventIndex:
+    """
+    Researched events held as sorted day-resolution date arrays, for bulk
+    association with detected change points.
+
+    Every query locates its windows with `np.searchsorted`, so matching m
+    change dates against k events costs O((m + k) log k) plus the size of the
+    output, instead of one pandas scan over the events per change date.
+    Windows are asymmetric: an event matches a change date d when it falls in
+    [d - days_before, d + days_after].
+    """
+    def __init__(self, dates, labels):
+        """
+        Args:
+            dates (array-like): Event dates (anything pd.to_datetime accepts).
+            labels (array-like): Event descriptions, aligned with dates.
+
+        Raises:
+            ValueError: If dates and labels differ in length.
+        """
+        labels = np.asarray(labels, dtype=object)
+        if len(labels) != len(dates):
+            raise ValueError("Event dates and labels must have the same length.")
+        days = pd.to_datetime(pd.Series(dates), errors='coerce')
+        valid = days.notna().values
+        days = days.values[valid].astype('datetime64[D]')
+        order = np.argsort(days, kind='stable')
+        self.dates = days[order]
+        self.labels = labels[valid][order]
+
+    @classmethod
+    def from_frame(cls, event_df: pd.DataFrame, date_column: str = 'Date', label_column: str = 'Event'):
+        if not {date_column, label_column}.issubset(event_df.columns):
+            raise ValueError(f"Events table must contain '{date_column}' and '{label_column}' columns.")
+        return cls(event_df[date_column].values, event_df[label_column].values)
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs):
+        return cls.from_frame(pd.read_csv(path), **kwargs)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def window_bounds(self, change_dates, days_before: int = 30, days_after: int = 30):
+        """
+        Half-open index ranges [lo, hi) of the events inside each change date's window.
+        """
+        days = _to_days(change_dates)
+        lo = np.searchsorted(self.dates, days - np.timedelta64(days_before, 'D'), side='left')
+        hi = np.searchsorted(self.dates, days + np.timedelta64(days_after, 'D'), side='right')
+        return lo, hi
+
+    def counts(self, change_dates, days_before: int = 30, days_after: int = 30) -> np.ndarray:
+        """
+        Number of events in each change date's window.
+        """
+        lo, hi = self.window_bounds(change_dates, days_before, days_after)
+        return hi - lo
+
+    def match(self, change_dates, days_before: int = 30, days_after: int = 30) -> pd.DataFrame:
+        """
+        Every (change date, event) pair within the windows, with the signed
+        offset in days from the change date to the event.
+        """
+        days = _to_days(change_dates)
+        lo, hi = self.window_bounds(days, days_before, days_after)
+        counts = hi - lo
+        change_idx = np.repeat(np.arange(len(days)), counts)
+        # Positions lo[i], lo[i] + 1, ..., hi[i] - 1 for every change date, without a loop
+        starts = np.cumsum(counts) - counts
+        event_idx = np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(starts, counts)
+        return pd.DataFrame({
+            "Change_Date": pd.to_datetime(days[change_idx]),
+            "Event_Date": pd.to_datetime(self.dates[event_idx]),
+            "Event": self.labels[event_idx],
+            "Offset_Days": (self.dates[event_idx] - days[change_idx]).astype(np.int64),
+        })
+
+    def nearest(self, change_dates) -> pd.DataFrame:
+        """
+        The closest event to each change date (earlier event on ties) and the
+        signed distance in days. Empty indexes give missing values.
+        """
+        days = _to_days(change_dates)
+        result = pd.DataFrame({"Change_Date": pd.to_datetime(days)})
+        if len(self.dates) == 0:
+            result["Event_Date"], result["Event"], result["Offset_Days"] = pd.NaT, None, np.nan
+            return result
+        right = np.clip(np.searchsorted(self.dates, days), 0, len(self.dates) - 1)
+        left = np.clip(right - 1, 0, len(self.dates) - 1)
+        dist_left = np.abs((days - self.dates[left]).astype(np.int64))
+        dist_right = np.abs((self.dates[right] - days).astype(np.int64))
+        idx = np.where(dist_left <= dist_right, left, right)
+        result["Event_Date"] = pd.to_datetime(self.dates[idx])
+        result["Event"] = self.labels[idx]
+        result["Offset_Days"] = (self.dates[idx] - days).astype(np.int64)
+        return result
+
+    def event_probabilities(self, dates, tau_probs, days_before: int = 30, days_after: int = 30) -> pd.DataFrame:
+        """
+        Posterior probability that the change point falls within each event's
+        window, using the full tau distribution rather than a point estimate.
+
+        Args:
+            dates (array-like): Date of each position of the modeled series.
+            tau_probs (array-like): Probability of each position being the
+                change point (e.g. `ExactPosterior.tau_probs` or `tau_probabilities`).
+            days_before, days_after (int): Window around the change date, as in `match`.
+
+        Returns:
+            pd.DataFrame: Event_Date, Event and Probability, most probable first.
+        """
+        days = _to_days(dates)
+        tau_probs = np.asarray(tau_probs, dtype=float)
+        if len(days) != len(tau_probs):
+            raise ValueError("dates and tau_probs must have the same length.")
+        order = np.argsort(days, kind='stable')
+        days, cdf = days[order], np.concatenate(([0.0], np.cumsum(tau_probs[order])))
+        # An event at e matches change dates d with e - days_after <= d <= e + days_before
+        lo = np.searchsorted(days, self.dates - np.timedelta64(days_after, 'D'), side='left')
+        hi = np.searchsorted(days, self.dates + np.timedelta64(days_before, 'D'), side='right')
+        result = pd.DataFrame({
+            "Event_Date": pd.to_datetime(self.dates),
+            "Event": self.labels,
+            "Probability": np.clip(cdf[hi] - cdf[lo], 0.0, 1.0),
+        })
+        return result.sort_values("Probability", ascending=False, kind='stable').reset_index(drop=True)
+
+_INDEXES: "OrderedDict[tuple, EventIndex]" = OrderedDict()
+
+def load_event_index(path: str, max_versions: int = 4) -> Optional[EventIndex]:
+    """
+    Returns the index for an events CSV, parsing it again only when the file
+    changes on disk. Returns None if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key in _INDEXES:
+        _INDEXES.move_to_end(key)
+        return _INDEXES[key]
+    index = EventIndex.from_csv(path)
+    _INDEXES[key] = index
+    while len(_INDEXES) > max_versions:
+        _INDEXES.popitem(last=False)
+    return index
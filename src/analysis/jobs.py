@@ -0,0 +1,154 @@
+import json
+import time
+import uuid
+import hashlib
+import threading
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from src.analysis.batch_runner import analyse_window
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class JobQueueFull(Exception):
+    """Raised when the number of unfinished jobs reaches the queue limit."""
+
+def _progress_callback(job_id: str, progress, total: int, every: int = 50):
+    # Reports sampled iterations back to the parent every `every` draws
+    state = {"done": 0}
+
+    def callback(trace, draw):
+        state["done"] += 1
+        if state["done"] % every == 0 or state["done"] >= total:
+            progress[job_id] = {"stage": "sampling", "fraction": min(state["done"] / total, 1.0)}
+    return callback
+
+def _run_job(job_id: str, task: dict, progress) -> dict:
+    progress[job_id] = {"stage": "running", "fraction": 0.0}
+    if task["engine"] == "mcmc":
+        kwargs = task.get("sample_kwargs") or {}
+        total = (kwargs.get("draws", 2000) + kwargs.get("tune", 1000)) * (kwargs.get("chains") or 4)
+        task = {**task, "sample_kwargs": {**kwargs, "callback": _progress_callback(job_id, progress, total)}}
+    result = analyse_window(task)
+    progress[job_id] = {"stage": "finished", "fraction": 1.0}
+    return result
+
+class JobManager:
+    """
+    Runs change point analyses in a bounded process pool so MCMC never blocks
+    web request threads.
+
+    Identical requests that are still queued or running share one job, the
+    number of unfinished jobs is capped at `max_pending`, and at most
+    `max_finished` completed jobs are remembered for status queries. The pool
+    and the progress channel are started on the first submission.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 32, max_finished: int = 256):
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight = {}  # request key -> job id
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def request_key(spec: dict) -> str:
+        """
+        Hash of a normalized job specification, used for deduplication.
+        """
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submit(self, spec: dict, task: dict) -> dict:
+        """
+        Queues a job unless an identical one is already queued or running.
+
+        Args:
+            spec (dict): JSON-serializable request (window, series, engine, sampler settings).
+            task (dict): Task for `analyse_window` (dates, values, engine, sample_kwargs).
+
+        Returns:
+            dict: The job's public status, with "deduplicated" set if it already existed.
+
+        Raises:
+            JobQueueFull: If `max_pending` jobs are already unfinished.
+        """
+        key = self.request_key(spec)
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return {**self._status(existing), "deduplicated": True}
+            if len(self._inflight) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} jobs are already queued or running.")
+
+            self._ensure_pool()
+            job_id = uuid.uuid4().hex
+            self._progress[job_id] = {"stage": "queued", "fraction": 0.0}
+            future = self._pool.submit(_run_job, job_id, task, self._progress)
+            self._jobs[job_id] = {"id": job_id, "key": key, "spec": spec, "future": future,
+                                  "submitted_at": time.time(), "finished_at": None}
+            self._inflight[key] = job_id
+            future.add_done_callback(lambda _f, job_id=job_id: self._on_done(job_id))
+            logger.info(f"Queued analysis job {job_id} for {spec}")
+            return {**self._status(job_id), "deduplicated": False}
+
+    def _on_done(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["finished_at"] = time.time()
+            if self._inflight.get(job["key"]) == job_id:
+                del self._inflight[job["key"]]
+            finished = [j for j, v in self._jobs.items() if v["finished_at"] is not None]
+            for old in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[old]
+                if self._progress is not None:
+                    self._progress.pop(old, None)
+
+    def _status(self, job_id: str) -> dict:
+        job = self._jobs[job_id]
+        future = job["future"]
+        progress = dict(self._progress.get(job_id, {})) if self._progress is not None else {}
+        status = {"job_id": job_id, "spec": job["spec"], "submitted_at": job["submitted_at"],
+                  "finished_at": job["finished_at"], "progress": progress.get("fraction", 0.0)}
+
+        if not future.done():
+            status["status"] = "running" if progress.get("stage", "queued") != "queued" else "queued"
+            return status
+        error = future.exception()
+        if error is not None:
+            status.update({"status": "failed", "error": str(error)})
+            return status
+        result = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in future.result().items()}
+        if result.get("error"):
+            status.update({"status": "failed", "error": result["error"], "result": result})
+        else:
+            status.update({"status": "done", "progress": 1.0, "result": result})
+        return status
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """
+        Public status of a job, or None if the id is unknown (or expired).
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                return None
+            return self._status(job_id)
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._manager.shutdown()
+            self._pool = self._manager = self._progress = None
@@ -0,0 +1,163 @@
+import copy
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Iterable, Optional
+from src.models.exact_change_point import masked_prefix_sums
+
+TRADING_DAYS = 252
+
+class RollingStatsEngine:
+    """
+    Rolling means, standard deviations and volatilities for any number of
+    window sizes from one set of prefix sums.
+
+    Each window then costs a few vectorized subtractions instead of a separate
+    pandas rolling pass. A window is NaN until it holds `window` valid values,
+    matching `pd.Series.rolling(window)`; standard deviations use ddof=1.
+    When rows are appended, `extend` reuses the sums of the unchanged prefix.
+    The last MAX_RESULTS (series, window) results are kept.
+    """
+    MAX_RESULTS = 32
+
+    def __init__(self, prices, version=None):
+        """
+        Args:
+            prices (array-like): Price history in date order.
+            version: Identifier of the dataset version the engine was built from.
+        """
+        self.prices = np.asarray(prices, dtype=float)
+        self.version = version
+        self.series = self._derive(self.prices)
+        self._sums = {}
+        self._results = OrderedDict()
+
+    @classmethod
+    def _derive(cls, prices: np.ndarray, start: int = 0) -> dict:
+        # Derived series from position `start` on (returns need the previous price)
+        lo = max(start - 1, 0)
+        window = prices[lo:]
+        derived = {"price": window, "returns": cls._pct_change(window), "log_returns": cls._log_returns(window)}
+        return {name: values[start - lo:] for name, values in derived.items()}
+
+    def extend(self, prices, version=None, changed_from: Optional[int] = None) -> "RollingStatsEngine":
+        """
+        Engine for a new version of the prices that matches this one on its
+        first `changed_from` values (default: all of them, i.e. rows were
+        appended). Derived series and prefix sums are recomputed from there
+        on only; rolling results are rebuilt on demand.
+        """
+        prices = np.asarray(prices, dtype=float)
+        start = min(len(self.prices) if changed_from is None else changed_from, len(self.prices), len(prices))
+        engine = copy.copy(self)
+        engine.prices = prices
+        engine.version = version
+        tail = self._derive(prices, start)
+        engine.series = {name: np.concatenate((values[:start], tail[name])) for name, values in self.series.items()}
+        engine._sums = {name: (*masked_prefix_sums(engine.series[name], shift, (count, s, q), start), shift)
+                        for name, (count, s, q, shift) in self._sums.items()}
+        engine._results = OrderedDict()
+        return engine
+
+    @staticmethod
+    def _pct_change(prices: np.ndarray) -> np.ndarray:
+        out = np.full(len(prices), np.nan)
+        out[1:] = prices[1:] / prices[:-1] - 1
+        return out
+
+    @staticmethod
+    def _log_returns(prices: np.ndarray) -> np.ndarray:
+        out = np.full(len(prices), np.nan)
+        out[1:] = np.log(prices[1:] / prices[:-1])
+        return out
+
+    def _get_sums(self, series: str):
+        if series not in self.series:
+            raise ValueError(f"Unknown series '{series}'. Expected one of {tuple(self.series)}.")
+        if series not in self._sums:
+            # Shifting by the mean keeps the E[x^2] - E[x]^2 difference well conditioned
+            values = self.series[series]
+            valid = values[~np.isnan(values)]
+            shift = float(valid.mean()) if valid.size else 0.0
+            self._sums[series] = (*masked_prefix_sums(values, shift), shift)
+        return self._sums[series]
+
+    def _moments(self, series: str, window: int):
+        if window < 1:
+            raise ValueError("Window must be a positive integer.")
+        key = (series, window)
+        if key in self._results:
+            self._results.move_to_end(key)
+        else:
+            count, s, q, shift = self._get_sums(series)
+            n = len(count) - 1
+            mean = np.full(n, np.nan)
+            std = np.full(n, np.nan)
+            if window <= n:
+                hi = np.arange(window, n + 1)
+                lo = hi - window
+                full = (count[hi] - count[lo]) == window
+                total, total_sq = s[hi] - s[lo], q[hi] - q[lo]
+                m = total / window
+                mean[hi - 1] = np.where(full, m + shift, np.nan)
+                if window > 1:
+                    var = np.maximum((total_sq - total * m) / (window - 1), 0.0)
+                    std[hi - 1] = np.where(full, np.sqrt(var), np.nan)
+            self._results[key] = (mean, std)
+            while len(self._results) > self.MAX_RESULTS:
+                self._results.popitem(last=False)
+        return self._results[key]
+
+    def rolling_mean(self, window: int, series: str = "price") -> np.ndarray:
+        return self._moments(series, window)[0]
+
+    def rolling_std(self, window: int, series: str = "returns") -> np.ndarray:
+        return self._moments(series, window)[1]
+
+    def volatility(self, window: int = 21, series: str = "returns", periods: int = TRADING_DAYS) -> np.ndarray:
+        """
+        Annualized rolling volatility: rolling std of returns times sqrt(periods).
+        """
+        return self.rolling_std(window, series) * np.sqrt(periods)
+
+    def compute(self, windows: Iterable[int], series: str = "price", metrics=("mean", "std")) -> pd.DataFrame:
+        """
+        Table of the requested metrics ("mean", "std", "volatility") for several
+        window sizes, one column per (metric, window).
+        """
+        columns = {}
+        for window in windows:
+            for metric in metrics:
+                if metric == "mean":
+                    columns[f"mean_{window}"] = self.rolling_mean(window, series)
+                elif metric == "std":
+                    columns[f"std_{window}"] = self.rolling_std(window, series)
+                elif metric == "volatility":
+                    columns[f"volatility_{window}"] = self.volatility(window, series)
+                else:
+                    raise ValueError(f"Unknown metric '{metric}'.")
+        return pd.DataFrame(columns)
+
+_ENGINES: "OrderedDict[object, RollingStatsEngine]" = OrderedDict()
+
+def get_rolling_engine(prices, version: Optional[object] = None, max_versions: int = 4,
+                       base_version: Optional[object] = None, changed_from: Optional[int] = None) -> RollingStatsEngine:
+    """
+    Returns the engine for a dataset version, building it on first use. Without
+    a version the engine is keyed on the content of the prices. If the cached
+    `base_version` agrees with the new prices on the first `changed_from`
+    values (e.g. PriceStore after an append), the new engine extends it.
+    """
+    prices = np.asarray(prices, dtype=float)
+    key = version if version is not None else hash(prices.tobytes())
+    if key in _ENGINES:
+        _ENGINES.move_to_end(key)
+        return _ENGINES[key]
+    if base_version is not None and base_version in _ENGINES:
+        engine = _ENGINES[base_version].extend(prices, version=key, changed_from=changed_from)
+    else:
+        engine = RollingStatsEngine(prices, version=key)
+    _ENGINES[key] = engine
+    while len(_ENGINES) > max_versions:
+        _ENGINES.popitem(last=False)
+    return engine
@@ -0,0 +1,206 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+from src.utils.logger import setup_logger
+from src.utils.metrics import span
+
+logger = setup_logger(__name__)
+
+STATISTICS = ("cusum", "lr")
+METHODS = ("permutation", "block_bootstrap")
+
+def break_statistics(X: np.ndarray, statistic: str = "lr"):
+    """
+    Max-type single mean-shift statistic of every row of a (resamples x time)
+    array, from cumulative sums along the time axis.
+
+    "cusum" is max_k |S_k - k/n S_n| / (sd * sqrt(n)); "lr" is the Gaussian
+    likelihood ratio n * log(RSS_0 / min_k RSS_k) for one shift in the mean.
+
+    Returns:
+        tuple: (statistic per row, size of the first segment k per row, mean
+            shift after - before at that k per row).
+    """
+    X = np.asarray(X, dtype=float)
+    X = X - X.mean(axis=1, keepdims=True)  # Conditions the sums; the statistics are shift-invariant
+    n = X.shape[1]
+    k = np.arange(1, n)
+    s = np.cumsum(X, axis=1)
+    s_1, s_n = s[:, :-1], s[:, -1:]
+    if statistic == "cusum":
+        dev = np.abs(s_1 - k / n * s_n)
+        best = np.argmax(dev, axis=1)
+        sd = np.maximum(X.std(axis=1, ddof=1), 1e-300)
+        stat = dev[np.arange(len(X)), best] / (sd * np.sqrt(n))
+    elif statistic == "lr":
+        q_n = np.einsum('ij,ij->i', X, X)[:, None]
+        rss = q_n - s_1 ** 2 / k - (s_n - s_1) ** 2 / (n - k)
+        best = np.argmin(rss, axis=1)
+        rss_0 = q_n[:, 0] - s_n[:, 0] ** 2 / n
+        rss_min = np.maximum(rss[np.arange(len(X)), best], 1e-300)
+        stat = n * np.log(np.maximum(rss_0, 1e-300) / rss_min)
+    else:
+        raise ValueError(f"Unknown statistic '{statistic}'. Expected one of {STATISTICS}.")
+    k_hat = best + 1
+    before = s_1[np.arange(len(X)), best] / k_hat
+    after = (s_n[:, 0] - s_1[np.arange(len(X)), best]) / (n - k_hat)
+    return stat, k_hat, after - before
+
+def block_indices(rng: np.random.Generator, rows: int, n: int, block_size: int) -> np.ndarray:
+    """
+    (rows x n) moving-block bootstrap indices: blocks of `block_size`
+    consecutive positions with uniformly drawn starts, concatenated and cut to n.
+    """
+    blocks = -(-n // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=(rows, blocks))
+    return (starts[:, :, None] + np.arange(block_size)).reshape(rows, -1)[:, :n]
+
+def _resample_chunk(task):
+    # Module-level so worker processes can import it; one seeded chunk of resamples
+    kind, base, residuals, rows, block_size, statistic, seed = task
+    rng = np.random.default_rng(seed)
+    if kind == "permutation":
+        X = rng.permuted(np.broadcast_to(base, (rows, len(base))), axis=1)
+    else:
+        X = base + residuals[block_indices(rng, rows, len(residuals), block_size)]
+    return break_statistics(X, statistic)
+
+@dataclass
+class SignificanceResult:
+    """
+    Outcome of a BreakSignificanceTest. Break positions follow the model
+    convention: tau is the last index of the first regime.
+    """
+    statistic: str
+    method: str
+    observed: float
+    p_value: float
+    n_resamples: int
+    tau: int
+    tau_ci: Tuple[int, int]
+    shift: float
+    shift_ci: Tuple[float, float]
+    ci_level: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class BreakSignificanceTest:
+    """
+    Frequentist check of a single mean shift by resampling.
+
+    The p-value compares the observed max-type statistic with its
+    distribution under "no break": random permutations of the series, or a
+    moving-block bootstrap of the residuals around the fitted segments,
+    which keeps short-range autocorrelation. The confidence intervals for
+    the break position and the shift come from a bootstrap of the fitted
+    two-segment model (segment means plus resampled residuals),
+    re-estimating the break in every resample.
+
+    Resamples are drawn as 2-D (resamples x time) arrays and reduced with
+    cumulative sums, `chunk_size` rows at a time to bound memory. The
+    chunks are independently seeded, so results do not depend on how they
+    are spread across the process pool.
+    """
+    def __init__(self, statistic: str = "lr", method: str = "block_bootstrap", n_resamples: int = 2000,
+                 block_size: Optional[int] = None, chunk_size: int = 250, max_workers: Optional[int] = None,
+                 ci_level: float = 0.95, seed: Optional[int] = None):
+        """
+        Args:
+            statistic (str): "lr" (likelihood ratio) or "cusum".
+            method (str): "permutation" or "block_bootstrap" for the null distribution.
+            n_resamples (int): Resamples for the p-value and for the intervals.
+            block_size (int, optional): Bootstrap block length, default n^(1/3).
+                Permutation tests bootstrap the intervals with single observations.
+            chunk_size (int): Resamples per vectorized chunk (and per pool task).
+            max_workers (int, optional): Process pool size; None uses every CPU,
+                1 runs in-process.
+            ci_level (float): Coverage of the confidence intervals.
+            seed (int, optional): Seed for reproducible resampling.
+        """
+        if statistic not in STATISTICS:
+            raise ValueError(f"Unknown statistic '{statistic}'. Expected one of {STATISTICS}.")
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'. Expected one of {METHODS}.")
+        if n_resamples < 1 or chunk_size < 1 or (block_size is not None and block_size < 1):
+            raise ValueError("n_resamples, chunk_size and block_size must be positive.")
+        if not 0 < ci_level < 1:
+            raise ValueError("ci_level must be between 0 and 1.")
+        self.statistic = statistic
+        self.method = method
+        self.n_resamples = n_resamples
+        self.block_size = block_size
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ci_level = ci_level
+        self.seed = seed
+
+    def _run_tasks(self, tasks):
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+                results = list(pool.map(_resample_chunk, tasks))
+        else:
+            results = [_resample_chunk(task) for task in tasks]
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def run(self, values, tau: Optional[int] = None) -> SignificanceResult:
+        """
+        Tests the series for a single mean shift.
+
+        Args:
+            values (array-like): The modeled series (e.g. the prices passed to ChangePointModel).
+            tau (int, optional): Break to build the fitted segments from, e.g. the
+                ChangePointModel posterior median; defaults to the statistic's own estimate.
+
+        Returns:
+            SignificanceResult: p-value and confidence intervals.
+        """
+        x = np.asarray(values, dtype=float)
+        n = len(x)
+        if n < 4:
+            raise ValueError("At least 4 observations are needed to test for a break.")
+        if np.isnan(x).any():
+            raise ValueError("Input data contains NaNs. Please clean the data first.")
+        if tau is not None and not 0 <= tau < n - 1:
+            raise ValueError(f"tau must be in [0, {n - 2}] for a series of length {n}.")
+        if self.block_size is not None and self.block_size >= n:
+            raise ValueError(f"block_size must be less than the series length {n}, got {self.block_size}.")
+
+        with span("analysis.significance", n=n, resamples=self.n_resamples, statistic=self.statistic) as attrs:
+            observed, k_obs, _ = (v[0] for v in break_statistics(x[None, :], self.statistic))
+            k_fit = int(k_obs) if tau is None else tau + 1
+            fitted = np.where(np.arange(n) < k_fit, x[:k_fit].mean(), x[k_fit:].mean())
+            residuals = x - fitted
+            block = self.block_size or max(1, int(round(n ** (1 / 3))))
+
+            sizes = [min(self.chunk_size, self.n_resamples - lo) for lo in range(0, self.n_resamples, self.chunk_size)]
+            seeds = np.random.SeedSequence(self.seed).spawn(2 * len(sizes))
+            if self.method == "permutation":
+                null_tasks = [("permutation", x, None, rows, 1, self.statistic, s) for rows, s in zip(sizes, seeds)]
+                ci_block = 1
+            else:
+                null_tasks = [("bootstrap", np.zeros(n), residuals, rows, block, self.statistic, s)
+                              for rows, s in zip(sizes, seeds)]
+                ci_block = block
+            ci_tasks = [("bootstrap", fitted, residuals, rows, ci_block, self.statistic, s)
+                        for rows, s in zip(sizes, seeds[len(sizes):])]
+
+            null_stats, _, _ = self._run_tasks(null_tasks)
+            _, k_boot, shift_boot = self._run_tasks(ci_tasks)
+            p_value = (1 + np.sum(null_stats >= observed)) / (1 + len(null_stats))
+
+            tail = (1 - self.ci_level) / 2 * 100
+            tau_lo, tau_hi = np.percentile(k_boot - 1, [tail, 100 - tail], method='nearest')
+            shift_lo, shift_hi = np.percentile(shift_boot, [tail, 100 - tail])
+            attrs["p_value"] = float(p_value)
+
+        logger.info(f"{self.statistic.upper()} {self.method} test: statistic {observed:.3f}, "
+                    f"p = {p_value:.4f} over {len(null_stats)} resamples.")
+        return SignificanceResult(
+            statistic=self.statistic, method=self.method, observed=float(observed), p_value=float(p_value),
+            n_resamples=len(null_stats), tau=k_fit - 1, tau_ci=(int(tau_lo), int(tau_hi)),
+            shift=float(x[k_fit:].mean() - x[:k_fit].mean()), shift_ci=(float(shift_lo), float(shift_hi)),
+            ci_level=self.ci_level,
+        )
@@ -1,16 +1,88 @@
+import io
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
 import pandas as pd
 from typing import Optional
 from src.utils.logger import setup_logger
+from src.utils.metrics import span
 
 logger = setup_logger(__name__)
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_SNAPSHOT_DIR = os.path.join(PROJECT_ROOT, 'data', 'processed', 'columnar_cache')
+
+# Date layouts of the Brent dataset ('20-May-87', 'Nov 14, 2022') and of
+# appended rows ('2022-11-15'), each with the regex that identifies it
+DATE_FORMATS = (
+    (r"\d{1,2}-[A-Za-z]{3}-\d{2}", "%d-%b-%y"),
+    (r"[A-Za-z]{3} \d{1,2}, \d{4}", "%b %d, %Y"),
+    (r"\d{4}-\d{2}-\d{2}", "%Y-%m-%d"),
+)
+
+def parse_dates(values) -> np.ndarray:
+    """
+    Parses date strings into datetime64[s] (NaT where unparseable).
+
+    Each distinct string is parsed once: strings matching one of
+    DATE_FORMATS are parsed per format group with that explicit format,
+    and anything else falls back to per-element inference. Two-digit years
+    follow strptime (69-99 -> 1900s, 00-68 -> 2000s).
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    strings = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    parsed = np.full(len(strings), np.datetime64('NaT'), dtype='datetime64[s]')
+    todo = np.ones(len(strings), dtype=bool)
+    for pattern, fmt in DATE_FORMATS:
+        match = todo & strings.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+        if match.any():
+            parsed[match] = pd.to_datetime(strings[match], format=fmt, errors='coerce').to_numpy(dtype='datetime64[s]')
+            todo &= ~match
+    if todo.any():
+        parsed[todo] = pd.to_datetime(strings[todo], format='mixed', errors='coerce').to_numpy(dtype='datetime64[s]')
+    return np.where(codes >= 0, parsed[np.maximum(codes, 0)], np.datetime64('NaT'))
+
 class DataLoader:
     """
     Class to handle the ingestion and basic cleaning of Brent oil price data.
+
+    With a `snapshot_dir` (e.g. DEFAULT_SNAPSHOT_DIR), the validated data is
+    written after the first successful load as a columnar snapshot (one
+    .npy file per column) keyed by the SHA-256 of the source file. Later
+    loads of an unchanged file memory-map the snapshot instead of
+    re-parsing the CSV.
+
+    Dates are parsed per known format (see `parse_dates`) and stored at
+    second resolution, prices in `price_dtype`. Rows with an unparseable
+    date or price are dropped and listed in `rejected` with the reason.
+
+    When the file is the snapshotted file plus appended rows (the same bytes
+    up to the snapshot's length), only the appended rows are parsed and
+    validated and then merged into the snapshot, in place if they continue
+    the date order or by an O(n) merge otherwise. Any other change is a full
+    re-parse.
     """
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, snapshot_dir: Optional[str] = None,
+                 price_dtype: str = "float64"):
+        """
+        Args:
+            file_path (str): Path to the CSV file.
+            snapshot_dir (str, optional): Where snapshots are kept. None (the default) disables them.
+            price_dtype (str): Float dtype of the Price column (e.g. "float32" to halve it).
+        """
         self.file_path = file_path
+        self.snapshot_dir = snapshot_dir
+        self.price_dtype = np.dtype(price_dtype)
         self.data: Optional[pd.DataFrame] = None
+        # Rejected rows of the file: 1-based data row, raw Date and Price, reason
+        self.rejected: pd.DataFrame = self._report([])
+        self._rows_read = 0
+        # Set by an incremental load: the validated new rows and the first
+        # row index that differs from the previous snapshot
+        self.appended: Optional[pd.DataFrame] = None
+        self.changed_from: Optional[int] = None
 
     def load_data(self) -> pd.DataFrame:
         """
@@ -26,13 +98,36 @@ class DataLoader:
             FileNotFoundError: If the file is not found.
             ValueError: If required columns ('Date', 'Price') are missing.
         """
-        import os
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"The data file {self.file_path} does not exist.")
 
+        with span("data.load", path=self.file_path) as attrs:
+            self.data = self._load(attrs)
+            attrs["rows"] = len(self.data)
+        return self.data
+
+    def _load(self, attrs: dict) -> pd.DataFrame:
+        self.appended, self.changed_from = None, None
+        source_hash = None
+        if self.snapshot_dir:
+            base = self._previous_snapshot()
+            source_hash, prefix_hash = self._source_hash(base[1]['bytes'] if base else None)
+            snapshot = self._read_snapshot(source_hash)
+            if snapshot is not None:
+                attrs["source"] = "snapshot"
+                self.data = snapshot
+                logger.info(f"Loaded {len(self.data)} clean rows from columnar snapshot of {self.file_path}")
+                return self.data
+            if base is not None and prefix_hash == base[0] and self._append_to_snapshot(*base):
+                attrs.update(source="append", appended=len(self.appended))
+                self._write_snapshot(source_hash)
+                return self.data
+
+        attrs["source"] = "csv"
+
         try:
             logger.info(f"Loading data from {self.file_path}")
-            self.data = pd.read_csv(self.file_path)
+            self.data = pd.read_csv(self.file_path, dtype={'Date': object})
             
             # Schema Validation
             required_cols = {'Date', 'Price'}
@@ -40,25 +135,227 @@ class DataLoader:
                 missing = required_cols - set(self.data.columns)
                 raise ValueError(f"CSV is missing required columns: {missing}")
 
-            # Basic validation/cleaning
-            self.data['Date'] = pd.to_datetime(self.data['Date'], errors='coerce')
-            self.data['Price'] = pd.to_numeric(self.data['Price'], errors='coerce')
-            
-            # Remove invalid rows
-            initial_count = len(self.data)
-            self.data = self.data.dropna(subset=['Date', 'Price'])
-            
-            if len(self.data) < initial_count:
-                logger.warning(f"Dropped {initial_count - len(self.data)} invalid rows.")
-
-            self.data = self.data.sort_values('Date').reset_index(drop=True)
+            self.data, self.rejected = self._clean(self.data)
+            self.data = self.data.sort_values('Date', kind='stable').reset_index(drop=True)
+            self._rows_read = len(self.rejected) + len(self.data)
             
             logger.info(f"Successfully loaded {len(self.data)} clean rows.")
-            return self.data
         except Exception as e:
             logger.error(f"Error loading or validating data: {e}")
             raise
 
+        if source_hash:
+            self._write_snapshot(source_hash)
+        return self.data
+
+    @staticmethod
+    def _report(rows) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=['Row', 'Date', 'Price', 'Reason'])
+
+    def _clean(self, df: pd.DataFrame, first_row: int = 1):
+        """
+        Parses and validates Date and Price.
+
+        Returns:
+            tuple: (valid rows, rejected-rows report); report rows are numbered
+                from `first_row`.
+        """
+        raw_date, raw_price = df['Date'], df['Price']
+        if pd.api.types.is_datetime64_any_dtype(raw_date):
+            dates = raw_date.to_numpy(dtype='datetime64[s]')
+        else:
+            dates = parse_dates(raw_date.to_numpy())
+        prices = pd.to_numeric(raw_price, errors='coerce').to_numpy(dtype=float)
+
+        bad_date, bad_price = np.isnat(dates), np.isnan(prices)
+        invalid = bad_date | bad_price
+        df = df.assign(Date=dates, Price=prices.astype(self.price_dtype))
+        if not invalid.any():
+            return df, self._report([])
+
+        reasons = np.full(len(df), '', dtype=object)
+        reasons[bad_date] = np.where(raw_date.isna().to_numpy()[bad_date], 'missing date', 'unparseable date')
+        price_reason = np.where(raw_price.isna().to_numpy()[bad_price], 'missing price', 'invalid price')
+        reasons[bad_price] = np.where(bad_date[bad_price], reasons[bad_price] + '; ', '') + price_reason
+        rejected = self._report({
+            'Row': np.flatnonzero(invalid) + first_row,
+            'Date': raw_date.to_numpy(dtype=object)[invalid],
+            'Price': raw_price.to_numpy(dtype=object)[invalid],
+            'Reason': reasons[invalid],
+        })
+        logger.warning(f"Dropped {len(rejected)} invalid rows (see DataLoader.rejected).")
+        return df[~invalid], rejected
+
+    def _append_to_snapshot(self, base_hash: str, manifest: dict) -> bool:
+        """
+        Parses the bytes past the snapshot's length and merges the valid rows
+        into it. Returns False (full re-parse) if the tail can't be read on its own.
+        """
+        old = self._read_snapshot(base_hash)
+        if old is None:
+            return False
+        with open(self.file_path, 'rb') as f:
+            f.seek(manifest['bytes'] - 1)
+            tail = f.read()
+        # The snapshotted file must have ended on a complete line
+        if not tail.startswith((b'\n', b'\r')):
+            return False
+        if not tail[1:].strip():
+            return False
+        try:
+            new = pd.read_csv(io.BytesIO(tail[1:]), header=None, names=manifest['columns'], dtype={'Date': object})
+        except (ValueError, pd.errors.ParserError) as e:
+            logger.warning(f"Appended rows could not be parsed on their own ({e}); re-reading the file.")
+            return False
+        if new.shape[1] != len(manifest['columns']):
+            return False
+        new, rejected = self._clean(new, first_row=manifest.get('rows_read', len(old)) + 1)
+        new = new.sort_values('Date', kind='stable').reset_index(drop=True)
+        new['Date'] = new['Date'].astype(old['Date'].dtype)
+
+        old_dates, new_dates = old['Date'].to_numpy(), new['Date'].to_numpy()
+        if len(old) == 0 or len(new) == 0 or new_dates[0] >= old_dates[-1]:
+            self.changed_from = len(old)
+            self.data = pd.concat([old, new], ignore_index=True)
+        else:
+            # Out-of-order rows: a linear merge by final position (earlier rows first on ties)
+            pos = np.searchsorted(old_dates, new_dates, side='right')
+            take = np.empty(len(old) + len(new), dtype=np.int64)
+            take[pos + np.arange(len(new))] = len(old) + np.arange(len(new))
+            old_idx = np.arange(len(old))
+            take[old_idx + np.searchsorted(pos, old_idx, side='right')] = old_idx
+            self.changed_from = int(pos[0])
+            self.data = pd.concat([old, new], ignore_index=True).iloc[take].reset_index(drop=True)
+            logger.info(f"Merged out-of-order rows from {np.datetime_as_string(new_dates[0], unit='D')}.")
+        self.appended = new
+        self.rejected = pd.concat([self._report(manifest.get('rejected', [])), rejected], ignore_index=True)
+        self._rows_read = manifest.get('rows_read', len(old)) + len(new) + len(rejected)
+        logger.info(f"Appended {len(new)} rows to the snapshot of {self.file_path} ({len(self.data)} rows).")
+        return True
+
+    def append_rows(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validates new quotes, appends the valid ones to the CSV and loads the
+        result incrementally.
+
+        Args:
+            rows (pd.DataFrame): New rows with at least 'Date' and 'Price'.
+
+        Returns:
+            pd.DataFrame: The full, sorted data including the new rows.
+        """
+        if not {'Date', 'Price'}.issubset(rows.columns):
+            raise ValueError("Appended rows must contain 'Date' and 'Price' columns.")
+        header = pd.read_csv(self.file_path, nrows=0).columns
+        valid, rejected = self._clean(rows.copy())
+        if len(rejected):
+            logger.warning(f"Not appending {len(rejected)} invalid rows: {rejected['Reason'].tolist()}")
+        if len(valid):
+            out = valid.reindex(columns=header)
+            out['Date'] = out['Date'].dt.strftime('%Y-%m-%d')
+            with open(self.file_path, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) not in (b'\n', b'\r'):
+                        f.write(b'\n')
+                f.write(out.to_csv(index=False, header=False).encode())
+        return self.load_data()
+
+    def _source_hash(self, prefix_bytes: Optional[int] = None):
+        """
+        SHA-256 of the file and, in the same pass, of its first `prefix_bytes`
+        bytes (None if not requested or the file is shorter).
+        """
+        digest = hashlib.sha256()
+        prefix_hash = None
+        remaining = prefix_bytes
+        with open(self.file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                if remaining is not None and 0 < remaining <= len(chunk):
+                    digest.update(chunk[:remaining])
+                    prefix_hash = digest.copy().hexdigest()
+                    digest.update(chunk[remaining:])
+                else:
+                    digest.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+        return digest.hexdigest(), prefix_hash
+
+    def _previous_snapshot(self):
+        # The snapshot of an earlier, shorter version of this file, if any
+        source, size = os.path.abspath(self.file_path), os.path.getsize(self.file_path)
+        if not os.path.isdir(self.snapshot_dir):
+            return None
+        for name in os.listdir(self.snapshot_dir):
+            try:
+                with open(os.path.join(self.snapshot_dir, name, 'manifest.json')) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if manifest.get('source') == source and 0 < manifest.get('bytes', 0) < size:
+                return name, manifest
+        return None
+
+    def _read_snapshot(self, source_hash: str) -> Optional[pd.DataFrame]:
+        path = os.path.join(self.snapshot_dir, source_hash)
+        manifest_path = os.path.join(path, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            columns = {
+                col: np.load(os.path.join(path, f"{i}.npy"), mmap_mode='r')
+                for i, col in enumerate(manifest['columns'])
+            }
+            if columns['Price'].dtype != self.price_dtype:
+                columns['Price'] = columns['Price'].astype(self.price_dtype)
+            self.rejected = self._report(manifest.get('rejected', []))
+            return pd.DataFrame(columns, copy=False)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+
+    def _write_snapshot(self, source_hash: str):
+        # Only plain numeric/datetime columns can be memory-mapped
+        columns = list(self.data.columns)
+        if not all(pd.api.types.is_numeric_dtype(self.data[c]) or
+                   pd.api.types.is_datetime64_any_dtype(self.data[c]) for c in columns):
+            logger.info("Skipping columnar snapshot: data has non-numeric columns.")
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            path = os.path.join(self.snapshot_dir, source_hash)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            os.makedirs(tmp_path, exist_ok=True)
+            for i, col in enumerate(columns):
+                np.save(os.path.join(tmp_path, f"{i}.npy"), self.data[col].to_numpy())
+            with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+                json.dump({"source": os.path.abspath(self.file_path), "columns": columns, "rows": len(self.data),
+                           "bytes": os.path.getsize(self.file_path), "rows_read": self._rows_read,
+                           "rejected": json.loads(self.rejected.to_json(orient='records'))}, f)
+            if os.path.exists(path):
+                shutil.rmtree(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+            self._remove_stale_snapshots(source_hash)
+        except OSError as e:
+            logger.warning(f"Could not write columnar snapshot: {e}")
+
+    def _remove_stale_snapshots(self, current_hash: str):
+        source = os.path.abspath(self.file_path)
+        for name in os.listdir(self.snapshot_dir):
+            manifest_path = os.path.join(self.snapshot_dir, name, 'manifest.json')
+            if name == current_hash or not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path) as f:
+                    if json.load(f).get('source') == source:
+                        shutil.rmtree(os.path.join(self.snapshot_dir, name), ignore_errors=True)
+            except (OSError, ValueError):
+                continue
+
     def get_processed_data(self) -> pd.DataFrame:
         """
         Returns the data, performing any final transformations if needed.
@@ -0,0 +1,163 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.data.loader import DEFAULT_SNAPSHOT_DIR, DataLoader
+from src.models.exact_change_point import extend_prefix_sums, prefix_sums
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class PriceStore:
+    """
+    Process-wide, read-mostly store of the Brent price history.
+
+    The CSV is parsed once into sorted NumPy arrays (datetime64[D] dates and
+    float64 prices) and re-parsed only when the file's mtime or size changes.
+    Date ranges are answered by binary search on the sorted dates.
+
+    When the file only gained rows, DataLoader parses just those rows and the
+    store updates its summary statistics and change point prefix sums from
+    the new rows only. `previous_version` and `changed_from` then describe
+    the update, so derived caches (e.g. `get_rolling_engine`) can extend
+    their state instead of rebuilding it.
+    """
+    def __init__(self, file_path: str, snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR, **loader_kwargs):
+        """
+        Args:
+            file_path (str): Path to the price CSV.
+            snapshot_dir (str, optional): DataLoader snapshot directory; None disables snapshots.
+            **loader_kwargs: Passed to DataLoader (e.g. price_dtype).
+        """
+        self.file_path = file_path
+        self.loader_kwargs = {"snapshot_dir": snapshot_dir, **loader_kwargs}
+        self.dates = np.array([], dtype='datetime64[D]')
+        self.prices = np.array([], dtype=np.float64)
+        self.version: Optional[tuple] = None
+        self.previous_version: Optional[tuple] = None
+        self.changed_from: Optional[int] = None
+        self._stats: dict = {}
+        self._totals: dict = {}
+        self._sums = None
+        self._lock = threading.Lock()
+
+    def _file_version(self) -> tuple:
+        st = os.stat(self.file_path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, version: tuple):
+        # DataLoader validates, sorts and reuses its columnar snapshot when the file is unchanged
+        loader = DataLoader(self.file_path, **self.loader_kwargs)
+        df = loader.load_data()
+        dates = df['Date'].values.astype('datetime64[D]')
+        prices = df['Price'].values.astype(np.float64)
+
+        appended = loader.appended
+        incremental = (self.version is not None and appended is not None
+                       and len(prices) - len(appended) == len(self.prices))
+        if incremental:
+            new = appended['Price'].values.astype(np.float64)
+            self._totals = {
+                "sum": self._totals["sum"] + float(new.sum()),
+                "max": max(self._totals["max"], float(new.max(initial=-np.inf))),
+                "min": min(self._totals["min"], float(new.min(initial=np.inf))),
+            } if self._totals else {}
+            if self._sums is not None:
+                s, q, shift = self._sums
+                s, q = extend_prefix_sums(s, q, prices[loader.changed_from:] - shift, loader.changed_from)
+                self._sums = (s, q, shift)
+        else:
+            self._totals, self._sums = {}, None
+
+        self.previous_version = self.version if incremental else None
+        self.changed_from = loader.changed_from if incremental else None
+        self.dates, self.prices = dates, prices
+        self._stats = {}
+        self.version = version
+        logger.info(f"Price store loaded {len(self.prices)} rows from {self.file_path}"
+                    + (f" ({len(appended)} new)" if incremental else ""))
+
+    def refresh(self) -> "PriceStore":
+        """
+        Reloads the arrays if the source file changed since the last load.
+
+        Raises:
+            FileNotFoundError: If the source file does not exist.
+        """
+        if not os.path.exists(self.file_path):
+            raise FileNotFoundError(f"The data file {self.file_path} does not exist.")
+        version = self._file_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._load(version)
+        return self
+
+    def range_slice(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> slice:
+        """
+        Index slice of the rows with start_date <= Date <= end_date (inclusive).
+        """
+        self.refresh()
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, 'D'), side='left') if start_date else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') if end_date else len(self.dates)
+        return slice(lo, max(lo, hi))
+
+    def range(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+        """
+        Returns (dates, prices) array views for an inclusive date range.
+        """
+        sl = self.range_slice(start_date, end_date)
+        return self.dates[sl], self.prices[sl]
+
+    def records(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
+        """
+        The range as a list of {"Date": "YYYY-MM-DD", "Price": float} records.
+        """
+        dates, prices = self.range(start_date, end_date)
+        return [{"Date": d, "Price": p} for d, p in zip(np.datetime_as_string(dates, unit='D').tolist(), prices.tolist())]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The full history as a DataFrame with 'YYYY-MM-DD' string dates.
+        """
+        self.refresh()
+        return pd.DataFrame({"Date": np.datetime_as_string(self.dates, unit='D'), "Price": self.prices})
+
+    def stats(self) -> dict:
+        """
+        Summary statistics of the full history, computed once per file version.
+        """
+        self.refresh()
+        if not self._stats:
+            if not self._totals:
+                self._totals = {"sum": float(self.prices.sum()),
+                                "max": float(self.prices.max()), "min": float(self.prices.min())}
+            self._stats = {
+                "avg_price": round(self._totals["sum"] / len(self.prices), 2),
+                "max_price": round(self._totals["max"], 2),
+                "min_price": round(self._totals["min"], 2),
+                "total_days": int(len(self.prices)),
+            }
+        return self._stats
+
+    def prefix_sums(self):
+        """
+        Prefix sums of x and x^2 of the prices shifted by a constant (for the
+        exact change point models), extended in place when rows are appended.
+
+        Returns:
+            tuple: (s, q, shift) with s and q as from `prefix_sums(prices - shift)`.
+        """
+        self.refresh()
+        if self._sums is None:
+            shift = float(self.prices.mean()) if len(self.prices) else 0.0
+            self._sums = (*prefix_sums(self.prices - shift), shift)
+        return self._sums
+
+    def derived(self, name: str, compute):
+        """
+        An array computed from the current version. Plain stores just compute
+        it; SharedPriceStore computes it once for every worker process.
+        """
+        return compute()
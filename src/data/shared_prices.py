@@ -0,0 +1,188 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from contextlib import contextmanager, suppress
+from typing import Callable, Optional
+from src.data.loader import PROJECT_ROOT
+from src.data.price_store import PriceStore
+from src.utils.logger import setup_logger
+from src.utils.metrics import span
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishing is still atomic, concurrent workers may just parse twice
+    fcntl = None
+
+logger = setup_logger(__name__)
+
+DEFAULT_SHARED_DIR = os.path.join(PROJECT_ROOT, 'data', 'processed', 'shared_prices')
+# Published versions kept on disk, so workers that read an older pointer can still map it
+KEEP_VERSIONS = 3
+
+class SharedPriceStore(PriceStore):
+    """
+    PriceStore whose arrays are published once to memory-mapped files and
+    shared by every process that serves the same CSV.
+
+    The first process to see a new file version parses it (through
+    DataLoader, so appends stay incremental) and publishes the dates,
+    prices, change point prefix sums and summary totals as .npy files in a
+    versioned directory, then points `current-<source>.json` at it with an
+    atomic rename. The last KEEP_VERSIONS versions stay on disk, and a
+    worker whose version disappears before it maps it re-reads the pointer
+    and tries again. Every other process attaches to those files with
+    `np.load(mmap_mode='r')`: attaching reads no rows, and the pages live in
+    the OS page cache once, however many workers map them. An exclusive
+    file lock makes concurrent workers wait for one publisher instead of
+    parsing the same version in parallel.
+
+    Arrays computed from a version (e.g. detected change points) can be
+    shared the same way with `derived`.
+    """
+    def __init__(self, file_path: str, shared_dir: str = DEFAULT_SHARED_DIR, **loader_kwargs):
+        """
+        Args:
+            file_path (str): Path to the price CSV.
+            shared_dir (str): Where published versions are kept.
+            **loader_kwargs: Passed to PriceStore (e.g. snapshot_dir).
+        """
+        super().__init__(file_path, **loader_kwargs)
+        self.shared_dir = shared_dir
+        self.source = os.path.abspath(file_path)
+        self._key = hashlib.sha1(self.source.encode()).hexdigest()[:16]
+        self._pointer = os.path.join(shared_dir, f"current-{self._key}.json")
+        self._path: Optional[str] = None
+
+    @contextmanager
+    def _file_lock(self, name: Optional[str] = None):
+        # flock is per open file, so a process must not nest two locks with the same name
+        os.makedirs(self.shared_dir, exist_ok=True)
+        with open(os.path.join(self.shared_dir, name or f"{self._key}.lock"), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _published(self) -> Optional[dict]:
+        try:
+            with open(self._pointer) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.isdir(os.path.join(self.shared_dir, meta['name'])) else None
+
+    def _load(self, version: tuple):
+        held = self.version
+        for attempt in range(3):
+            meta = self._published()
+            if meta is None or tuple(meta['version']) != version:
+                with self._file_lock():
+                    meta = self._published()
+                    if meta is None or tuple(meta['version']) != version:
+                        meta = self._publish(version)
+            try:
+                self._attach(meta, held)
+                return
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+                # Removed between reading the pointer and mapping it: start over from the current file
+                logger.info(f"Published version {meta['name']} was removed, re-reading the pointer.")
+                version = self._file_version()
+
+    def _publish(self, version: tuple) -> dict:
+        # Parses (incrementally when this process holds the previous version) and writes the arrays
+        with span("data.shared_publish", source=self.source) as attrs:
+            super()._load(version)
+            self.stats()
+            s, q, shift = self.prefix_sums()
+            name = f"{self._key}-{version[0]}-{version[1]}"
+            path = os.path.join(self.shared_dir, name)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+            for field, values in (("dates", self.dates), ("prices", self.prices), ("sum", s), ("sum_sq", q)):
+                np.save(os.path.join(tmp_path, f"{field}.npy"), values)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp_path, path)
+
+            meta = {"name": name, "source": self.source, "version": list(version), "shift": shift,
+                    "totals": self._totals, "previous_version": self.previous_version,
+                    "changed_from": self.changed_from}
+            with open(self._pointer + ".tmp", 'w') as f:
+                json.dump(meta, f)
+            os.replace(self._pointer + ".tmp", self._pointer)
+            attrs["rows"] = len(self.prices)
+        self._remove_stale_versions(keep=name)
+        logger.info(f"Published {len(self.prices)} price rows to {path}")
+        return meta
+
+    def _attach(self, meta: dict, held: Optional[tuple]):
+        path = os.path.join(self.shared_dir, meta['name'])
+        arrays = {field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode='r')
+                  for field in ("dates", "prices", "sum", "sum_sq")}
+        previous = tuple(meta['previous_version']) if meta['previous_version'] else None
+        # Derived caches can extend their state only if this process held the version the update started from
+        incremental = previous is not None and previous == held
+        self.previous_version = previous if incremental else None
+        self.changed_from = meta['changed_from'] if incremental else None
+        self.dates, self.prices = arrays["dates"], arrays["prices"]
+        self._sums = (arrays["sum"], arrays["sum_sq"], meta['shift'])
+        self._totals = meta['totals']
+        self._stats = {}
+        self.version = tuple(meta['version'])
+        self._path = path
+
+    def _remove_stale_versions(self, keep: str):
+        # Keeps the newest KEEP_VERSIONS versions (by source mtime, from the name) with their derived
+        # locks (`<version>.<name>.lock`) and drops leftovers of interrupted publishes; processes
+        # still mapping a removed version keep its pages (POSIX)
+        names = [name for name in os.listdir(self.shared_dir) if name.startswith(self._key + "-")]
+        versions = sorted({name.split(".")[0] for name in names if ".tmp" not in name} - {keep},
+                          key=lambda name: int(name.split("-")[1]), reverse=True)
+        stale = set(versions[KEEP_VERSIONS - 1:])
+        for name in names:
+            if ".tmp" in name or name.split(".")[0] in stale:
+                path = os.path.join(self.shared_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    with suppress(FileNotFoundError):
+                        os.remove(path)
+
+    def derived(self, name: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        An array computed from the current version, computed by one process
+        and memory-mapped by the others.
+
+        Args:
+            name (str): File-safe name, unique per computation and parameters.
+                Every name adds a file per version, so callers should share a
+                small fixed set of names rather than arbitrary client input.
+            compute (callable): Builds the array from this store's arrays; it
+                must not call `derived` for the same name.
+        """
+        self.refresh()
+        path = os.path.join(self._path, f"{name}.npy")
+        if not os.path.exists(path):
+            # One lock per name: other results don't wait for this one, and `compute` may refresh the store
+            with self._file_lock(f"{os.path.basename(self._path)}.{name}.lock"):
+                if not os.path.exists(path):
+                    values = np.asarray(compute())
+                    try:
+                        np.save(path + ".tmp.npy", values)
+                        os.replace(path + ".tmp.npy", path)
+                    except OSError as e:
+                        # The version was superseded and removed meanwhile
+                        logger.warning(f"Could not share {name}: {e}")
+                        return values
+        try:
+            return np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            # The version was removed since the check; the arrays this process maps are still valid
+            return np.asarray(compute())
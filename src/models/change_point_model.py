@@ -1,28 +1,204 @@
-import pymc as pm
+import os
+import time
+import importlib.util
 import numpy as np
 import pandas as pd
+from dataclasses import asdict
+from typing import Optional
+from src.models.exact_change_point import ExactPosterior, NormalInverseGammaPrior
+from src.models.inference_cache import InferenceCache
+from src.models.posterior_summary import PosteriorAccumulator
 from src.utils.logger import setup_logger
+from src.utils.metrics import metrics, span, timed
 
 logger = setup_logger(__name__)
 
+ENGINES = ("mcmc", "exact")
+
+# Sampler backends: extra pm.sample arguments and the module each one needs
+BACKENDS = {
+    "pymc": ({}, None),
+    "numba": ({"compile_kwargs": {"mode": "NUMBA"}}, "numba"),
+    "nutpie": ({"nuts_sampler": "nutpie"}, "nutpie"),
+}
+
+def tau_log_weights(x, mu_1, mu_2, sigma):
+    """
+    Unnormalized log p(tau | mu_1, mu_2, sigma, x) of the marginalized
+    model, one row per draw (1-D parameter arrays) and one column per tau.
+    """
+    x = np.asarray(x, dtype=float)
+    s = sigma[:, None]
+    c_1 = np.cumsum(-0.5 * ((x - mu_1[:, None]) / s) ** 2, axis=1)
+    c_2 = np.cumsum(-0.5 * ((x - mu_2[:, None]) / s) ** 2, axis=1)
+    return c_1 + (c_2[:, -1:] - c_2)
+
+def draw_tau(x, mu_1, mu_2, sigma, rng: np.random.Generator, chunk_size: int = 256) -> np.ndarray:
+    """
+    Draws one tau per draw of (mu_1, mu_2, sigma) from tau_log_weights.
+    """
+    tau = np.empty(mu_1.size, dtype=np.int64)
+    # Chunk over draws to bound the (draws x n) working arrays
+    for start in range(0, mu_1.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        log_w = tau_log_weights(x, mu_1[sl], mu_2[sl], sigma[sl])
+        cdf = np.cumsum(np.exp(log_w - log_w.max(axis=1, keepdims=True)), axis=1)
+        u = rng.random(len(cdf)) * cdf[:, -1]
+        tau[sl] = (cdf < u[:, None]).sum(axis=1)
+    return tau
+
+class _SamplingTimer:
+    """
+    pm.sample callback that timestamps each chain's first draw, last tuning
+    draw and last draw, splitting time into compile/initialization (until
+    the first draw of any chain), tuning and sampling. Tuning and sampling
+    are summed over chains (chain-seconds), so the split holds whether the
+    chains run in parallel or one after another (cores < chains).
+    Records nothing if it saw no draws. Chains any user callback.
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.started = time.perf_counter()
+        self.first_draw = {}
+        self.last_tune = {}
+        self.last_draw = {}
+
+    def __call__(self, trace, draw):
+        now = time.perf_counter()
+        self.first_draw.setdefault(draw.chain, now)
+        if draw.tuning:
+            self.last_tune[draw.chain] = now
+        self.last_draw[draw.chain] = now
+        if self.callback is not None:
+            self.callback(trace, draw)
+
+    def record(self, trace, chains_draws: int):
+        if not self.first_draw:
+            # The sampler made no callbacks (nutpie): only the model.sample span is meaningful
+            return
+        import arviz as az
+
+        finished = time.perf_counter()
+        first = min(self.first_draw.values(), default=finished)
+        # A chain's sampling phase starts after its own last tuning draw (or its first draw without tuning)
+        ends = {c: self.last_tune.get(c, start) for c, start in self.first_draw.items()}
+        tune_s = sum(ends[c] - start for c, start in self.first_draw.items())
+        sampling_s = sum(self.last_draw[c] - end for c, end in ends.items())
+        metrics.observe("model.compile", (first - self.started) * 1000)
+        metrics.observe("model.tune", tune_s * 1000)
+        metrics.observe("model.sampling", sampling_s * 1000)
+
+        with span("model.diagnostics"):
+            names = [v for v in ("mu_1", "mu_2", "sigma") if v in trace.posterior]
+            ess = az.ess(trace, var_names=names)
+            min_ess = float(min(ess[v].min() for v in names)) if names else float("nan")
+        # Per chain-second of sampling, comparable between parallel and sequential chains
+        metrics.set_gauge("sampling.draws_per_sec", chains_draws / max(sampling_s, 1e-9))
+        metrics.set_gauge("sampling.ess_per_sec", min_ess / max(finished - first, 1e-9), min_ess=min_ess)
+
+class _ConvergenceMonitor:
+    """
+    pm.sample callback that collects the continuous draws of every chain and,
+    every `check_every` post-tuning draws, stops sampling once the largest
+    R-hat is at most `target_rhat` and the smallest bulk ESS is at least
+    `target_ess`. PyMC treats a KeyboardInterrupt raised from a callback as a
+    request to stop and returns the draws recorded so far, truncated to the
+    shortest chain. Chains any user callback.
+    """
+    def __init__(self, chains: int, target_rhat: Optional[float] = None,
+                 target_ess: Optional[float] = None, check_every: int = 100, callback=None):
+        self.target_rhat = target_rhat
+        self.target_ess = target_ess
+        self.check_every = check_every
+        self.callback = callback
+        self.stopped_at: Optional[int] = None
+        self._draws = [[] for _ in range(chains)]
+        self._next_check = check_every
+
+    def __call__(self, trace, draw):
+        if self.callback is not None:
+            self.callback(trace, draw)
+        if draw.tuning or self.stopped_at is not None:
+            return
+        self._draws[draw.chain].append(np.concatenate([
+            np.ravel(v) for _, v in sorted(draw.point.items())
+            if np.issubdtype(np.asarray(v).dtype, np.floating)
+        ]))
+        n = min(len(d) for d in self._draws)
+        if n >= self._next_check:
+            self._next_check += self.check_every
+            if self.converged(n):
+                self.stopped_at = n
+                logger.info(f"Convergence targets met after {n} draws per chain, stopping early.")
+                raise KeyboardInterrupt
+
+    def converged(self, n: int) -> bool:
+        import arviz as az
+
+        samples = np.stack([np.stack(d[:n]) for d in self._draws])  # (chain, draw, parameter)
+        for j in range(samples.shape[-1]):
+            if self.target_rhat is not None and not az.rhat(samples[..., j]) <= self.target_rhat:
+                return False
+            if self.target_ess is not None and not az.ess(samples[..., j]) >= self.target_ess:
+                return False
+        return True
+
+class _PosteriorStream:
+    """
+    pm.sample callback that feeds every post-tuning draw, mapped back to the
+    constrained parameter space, into a PosteriorAccumulator. Chains any user
+    callback.
+    """
+    def __init__(self, model: "ChangePointModel", accumulator: PosteriorAccumulator, callback=None):
+        self.model = model
+        self.accumulator = accumulator
+        self.callback = callback
+        self._point_fn = model._point_function(accumulator.names)
+
+    def __call__(self, trace, draw):
+        if self.callback is not None:
+            self.callback(trace, draw)
+        if draw.tuning:
+            return
+        values = [float(v) for v in self._point_fn(draw.point)]
+        self.accumulator.update(draw.chain, values)
+        self.model._accumulate_tau(self.accumulator, dict(zip(self.accumulator.names, values)))
+
 class ChangePointModel:
     """
     Bayesian Change Point Analysis model using PyMC.
     """
-    def __init__(self, data: pd.Series):
+    def __init__(self, data: pd.Series, engine: str = "mcmc",
+                 prior: Optional[NormalInverseGammaPrior] = None):
         """
         Initializes the model with a time series.
 
         Args:
             data (pd.Series): A numeric pandas Series (e.g., prices or returns).
+            engine (str): "mcmc" samples the PyMC model, "exact" computes the
+                conjugate posterior over every tau in O(n) from prefix sums.
+            prior (NormalInverseGammaPrior, optional): Prior for the exact engine.
+                Defaults to a weakly informative prior centred on the data.
         
         Raises:
-            ValueError: If data is empty, contains non-numeric values, or has NaNs.
+            ValueError: If data is empty, contains non-numeric values, or has NaNs,
+                or if the engine is unknown.
         """
         self._validate_input(data)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}.")
+        self._init_state(data, engine, prior)
+
+    def _init_state(self, data, engine: str = "mcmc", prior: Optional[NormalInverseGammaPrior] = None):
+        # Also used by subclasses whose data is not a single validated Series
         self.data = data
+        self.engine = engine
+        self.prior = prior
         self.model = None
         self.trace = None
+        self.summary: Optional[pd.DataFrame] = None
+        self.exact_posterior: Optional[ExactPosterior] = None
+        self.posterior_summary: Optional[PosteriorAccumulator] = None
 
     def _validate_input(self, data: pd.Series):
         if not isinstance(data, pd.Series):
@@ -34,6 +210,7 @@ class ChangePointModel:
         if data.isnull().any():
             raise ValueError("Input data contains NaN values. Please clean the data before modeling.")
 
+    @timed("model.build")
     def build_model(self):
         """
         Builds a basic change point model.
@@ -43,6 +220,8 @@ class ChangePointModel:
             - Numerical instability if data variance is zero.
             - Memory errors if data series is extremely large.
         """
+        import pymc as pm
+
         try:
             n = len(self.data)
             mean_val = self.data.mean()
@@ -72,22 +251,334 @@ class ChangePointModel:
             logger.error(f"Failed to build PyMC model: {e}")
             raise RuntimeError(f"Model construction failed: {e}")
 
-    def run_inference(self, draws=2000, tune=1000):
+    def run_inference(self, draws=2000, tune=1000, random_seed=None, chains: int = 4,
+                      cores: Optional[int] = None, backend: str = "pymc",
+                      target_rhat: Optional[float] = None, target_ess: Optional[float] = None,
+                      check_every: int = 100, cache: Optional[InferenceCache] = None,
+                      summarize: bool = False, trace_path: Optional[str] = None, **sample_kwargs):
         """
-        Runs MCMC sampling with error handling.
+        Runs MCMC sampling (or the exact conjugate computation) with error handling.
+
+        Args:
+            draws (int): Number of posterior draws per chain (the maximum when
+                early stopping is enabled).
+            tune (int): Number of tuning steps (ignored by the exact engine).
+            random_seed (int, optional): Seed for reproducible draws.
+            chains (int): Number of independent chains.
+            cores (int, optional): Chains sampled in parallel. Defaults to one
+                process per chain, capped at the CPU count.
+            backend (str): "pymc" (default C backend), "numba" (numba-compiled
+                log-density and gradient) or "nutpie" (Rust NUTS sampler),
+                where the package is installed.
+            target_rhat (float, optional): Stop once every parameter's R-hat is
+                at or below this value (e.g. 1.01).
+            target_ess (float, optional): Stop once every parameter's bulk ESS
+                is at least this value (e.g. 400).
+            check_every (int): Draws per chain between convergence checks.
+            cache (InferenceCache, optional): When given, results for the same data,
+                model and sampler configuration are loaded instead of recomputed,
+                and `self.summary` holds the cached `az.summary` table. Unseeded
+                MCMC runs (random_seed=None) bypass it, since each should be fresh.
+            summarize (bool): Stream draws into a PosteriorAccumulator (tau
+                histogram, running moments, quantile sketches, split-chain
+                R-hat/ESS) instead of keeping the InferenceData in memory.
+                `self.summary` then holds the accumulator's summary table.
+            trace_path (str, optional): Also write the full trace to this
+                NetCDF file.
+            **sample_kwargs: Extra arguments forwarded to `pm.sample`.
 
         Returns:
-            arviz.InferenceData: The sampling results.
+            arviz.InferenceData: The sampling results, or the
+            PosteriorAccumulator when `summarize` is set.
+
+        Raises:
+            ValueError: If chains is not positive, the backend is unknown or
+                not installed, or `summarize` is combined with a cache or
+                the nutpie backend.
         """
+        if chains < 1:
+            raise ValueError("chains must be a positive integer.")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {tuple(BACKENDS)}.")
+        if summarize and backend == "nutpie" and self.engine == "mcmc":
+            raise ValueError("summarize streams draws through sampler callbacks, which the nutpie backend "
+                             "doesn't support.")
+        required = BACKENDS[backend][1]
+        if self.engine == "mcmc" and required and importlib.util.find_spec(required) is None:
+            raise ValueError(f"The '{backend}' backend requires the '{required}' package.")
+
+        if summarize and cache is not None:
+            raise ValueError("summarize keeps no trace to cache; pass either summarize or cache.")
+
+        if cache is not None and random_seed is None and self.engine == "mcmc":
+            logger.info("No random_seed given: sampling a fresh run without the inference cache.")
+            cache = None
+
+        options = {"chains": chains, "backend": backend, "target_rhat": target_rhat,
+                   "target_ess": target_ess, "check_every": check_every}
+        if cache is None:
+            trace = self._sample(draws, tune, random_seed, cores=cores, summarize=summarize,
+                                 trace_path=trace_path, **options, **sample_kwargs)
+            if trace_path:
+                trace.to_netcdf(trace_path)
+            if summarize:
+                self.summary = self.posterior_summary.summary()
+                self.trace = None
+                return self.posterior_summary
+            return trace
+
+        # The number of cores doesn't change the draws for a given seed
+        key = cache.make_key(self.data.values, self.cache_config(draws, tune, random_seed, **options, **sample_kwargs))
+        hit = cache.get(key)
+        if hit is not None:
+            self.trace, self.summary = hit
+            return self.trace
+        trace = self._sample(draws, tune, random_seed, cores=cores, **options, **sample_kwargs)
+        if trace_path:
+            trace.to_netcdf(trace_path)
+        self.summary = cache.put(key, trace)
+        return trace
+
+    def cache_config(self, draws, tune, random_seed, **sample_kwargs) -> dict:
+        """
+        Everything besides the data that determines the inference result.
+        """
+        return {
+            "model": type(self).__name__,
+            "engine": self.engine,
+            "prior": asdict(self.prior) if self.prior is not None else None,
+            "draws": draws,
+            "tune": tune,
+            "random_seed": random_seed,
+            # Progress callbacks don't change the result
+            "sample_kwargs": {k: v for k, v in sample_kwargs.items() if k != "callback"},
+        }
+
+    def _sample(self, draws, tune, random_seed, chains=4, cores=None, backend="pymc",
+                target_rhat=None, target_ess=None, check_every=100, summarize=False,
+                trace_path=None, **sample_kwargs):
+        if self.engine == "exact":
+            trace = self._run_exact(draws, random_seed, chains)
+            if summarize:
+                self.posterior_summary = self._summarize_exact(trace, random_seed)
+            return trace
+
+        import pymc as pm
+
         if self.model is None:
             self.build_model()
-            
+
+        # PyMC's own default (half the logical CPUs) is 0 on single-CPU machines
+        cores = cores or max(1, min(chains, os.cpu_count() or 1))
+        sample_kwargs.update(BACKENDS[backend][0])
         try:
-            logger.info(f"Running inference with {draws} draws and {tune} tuning steps...")
-            with self.model:
-                self.trace = pm.sample(draws=draws, tune=tune, return_inferencedata=True, progressbar=False)
+            logger.info(f"Running inference with {chains} chains on {cores} core(s), "
+                        f"{draws} draws and {tune} tuning steps ({backend} backend)...")
+            callback = sample_kwargs.pop("callback", None)
+            if summarize:
+                names = [rv.name for rv in self.model.free_RVs]
+                self.posterior_summary = PosteriorAccumulator(names, chains, draws, tau_size=len(self.data),
+                                                              seed=random_seed)
+                callback = _PosteriorStream(self, self.posterior_summary, callback)
+                if not trace_path:
+                    # PyMC needs one variable to build its trace; keep the smallest footprint
+                    sample_kwargs.setdefault("var_names", names[-1:])
+            timer = _SamplingTimer(callback)
+            callback = timer
+            monitor = None
+            if target_rhat is not None or target_ess is not None:
+                if backend == "nutpie":
+                    logger.warning("The nutpie backend doesn't support callbacks; early stopping is disabled.")
+                elif cores < chains:
+                    # Sequential chains finish one at a time, so there is never
+                    # a moment when all of them can be compared.
+                    logger.warning("Early stopping needs all chains running in parallel "
+                                   f"(cores={cores} < chains={chains}); sampling all {draws} draws.")
+                else:
+                    monitor = callback = _ConvergenceMonitor(chains, target_rhat, target_ess, check_every, timer)
+            if backend == "nutpie":
+                if timer.callback is not None:
+                    logger.warning("The nutpie backend doesn't support callbacks; the progress callback is ignored.")
+                callback = None
+            with span("model.sample", model=type(self).__name__, n=len(self.data), draws=draws,
+                      tune=tune, chains=chains, cores=cores, backend=backend) as attrs:
+                with self.model:
+                    self.trace = pm.sample(draws=draws, tune=tune, chains=chains, cores=cores,
+                                           random_seed=random_seed, callback=callback,
+                                           return_inferencedata=True, progressbar=False, **sample_kwargs)
+                attrs["draws_kept"] = self.trace.posterior.sizes["draw"]
+                attrs["stopped_early"] = monitor is not None and monitor.stopped_at is not None
+            timer.record(self.trace, chains * self.trace.posterior.sizes["draw"])
             logger.info("Inference completed.")
             return self.trace
         except Exception as e:
             logger.error(f"Inference failed during sampling: {e}")
             raise RuntimeError(f"MCMC sampling failed: {e}")
+
+    def _point_function(self, names):
+        # Compiled once per model graph; set_data keeps the graph, so windows reuse it
+        key = (id(self.model), tuple(names))
+        if getattr(self, "_point_fn_key", None) != key:
+            outputs = {v.name: v for v in self.model.unobserved_value_vars}
+            self._point_fn = self.model.compile_fn([outputs[name] for name in names], inputs=self.model.value_vars,
+                                                   on_unused_input="ignore", point_fn=True)
+            self._point_fn_key = key
+        return self._point_fn
+
+    def _accumulate_tau(self, accumulator: PosteriorAccumulator, point: dict):
+        accumulator.update_tau(index=int(point["tau"]))
+
+    def _summarize_exact(self, trace, random_seed) -> PosteriorAccumulator:
+        # The exact tau distribution replaces the histogram of its draws
+        post = trace.posterior
+        names = ["mu_1", "mu_2", "sigma"]
+        chains, draws = post.sizes["chain"], post.sizes["draw"]
+        accumulator = PosteriorAccumulator(names, chains, draws, tau_size=len(self.data), seed=random_seed)
+        values = np.stack([post[name].values for name in names], axis=-1)
+        for chain in range(chains):
+            for draw in range(draws):
+                accumulator.update(chain, values[chain, draw])
+        accumulator.tau_counts = self.exact_posterior.tau_probs * chains * draws
+        return accumulator
+
+    def _run_exact(self, draws, random_seed, chains):
+        try:
+            logger.info(f"Computing exact change point posterior over {len(self.data)} positions...")
+            with span("model.exact", n=len(self.data)):
+                self.exact_posterior = ExactPosterior(self.data.values, self.prior)
+                self.trace = self.exact_posterior.to_inference_data(draws, chains, random_seed)
+            logger.info("Exact inference completed.")
+            return self.trace
+        except Exception as e:
+            logger.error(f"Exact inference failed: {e}")
+            raise RuntimeError(f"Exact inference failed: {e}")
+
+
+class MarginalizedChangePointModel(ChangePointModel):
+    """
+    Change point model with tau summed out of the likelihood.
+
+    The likelihood is log sum_tau p(x | tau, mu_1, mu_2, sigma) p(tau), computed
+    with cumulative sums of the pointwise log densities, so the model only has
+    continuous parameters and NUTS samples it directly. Observations and prior
+    hyperparameters live in `pm.Data` containers: after `build_model` the same
+    graph is reused for new windows through `set_data`, which saves building
+    the model again. The NUTS step (its compiled logp and gradient) is built
+    once per graph as well, so later windows sample without recompiling.
+    tau is drawn after sampling from its exact conditional given each draw.
+    """
+    @timed("model.build")
+    def build_model(self):
+        """
+        Builds the marginalized model on the current data.
+        """
+        import pymc as pm
+
+        try:
+            mean_val, std_val = self._prior_scale(self.data)
+
+            with pm.Model() as self.model:
+                obs_data = pm.Data("obs_data", self.data.values.astype(float))
+                prior_mu = pm.Data("prior_mu", mean_val)
+                prior_sigma = pm.Data("prior_sigma", std_val)
+
+                mu_1 = pm.Normal("mu_1", mu=prior_mu, sigma=prior_sigma)
+                mu_2 = pm.Normal("mu_2", mu=prior_mu, sigma=prior_sigma)
+                sigma = pm.HalfNormal("sigma", sigma=prior_sigma)
+
+                # tau is the last index of the first regime (uniform on 0..n-1)
+                logp_1 = pm.math.cumsum(pm.logp(pm.Normal.dist(mu_1, sigma), obs_data))
+                logp_2 = pm.math.cumsum(pm.logp(pm.Normal.dist(mu_2, sigma), obs_data))
+                n = obs_data.shape[0]
+                log_lik_tau = logp_1 + (logp_2[-1] - logp_2) - pm.math.log(n)
+                pm.Potential("marginal_likelihood", pm.math.logsumexp(log_lik_tau))
+
+            logger.info("Marginalized model built successfully.")
+        except Exception as e:
+            logger.error(f"Failed to build PyMC model: {e}")
+            raise RuntimeError(f"Model construction failed: {e}")
+
+    def set_data(self, data: pd.Series):
+        """
+        Swaps in a new window without rebuilding the model graph or
+        recompiling its NUTS step.
+
+        Args:
+            data (pd.Series): The new window, of any length.
+        """
+        self._validate_input(data)
+        self.data = data
+        self.trace = None
+        self.summary = None
+        self.posterior_summary = None
+        if self.model is None:
+            self.build_model()
+            return
+        import pymc as pm
+
+        mean_val, std_val = self._prior_scale(data)
+        with self.model:
+            pm.set_data({
+                "obs_data": data.values.astype(float),
+                "prior_mu": mean_val,
+                "prior_sigma": std_val,
+            })
+
+    def _sample(self, draws, tune, random_seed, **sample_kwargs):
+        # Samples the continuous parameters with NUTS, then draws tau from
+        # p(tau | mu_1, mu_2, sigma, x) for every posterior draw.
+        backend = sample_kwargs.get("backend", "pymc")
+        if self.engine == "mcmc" and backend != "nutpie" and not {"step", "init"} & set(sample_kwargs):
+            sample_kwargs["step"] = self._nuts_step(**BACKENDS[backend][0])
+        trace = super()._sample(draws, tune, random_seed, **sample_kwargs)
+        if self.engine == "exact" or "mu_1" not in trace.posterior:
+            # Summarized runs keep tau only as a histogram, see _accumulate_tau
+            return trace
+        post = trace.posterior
+        post["tau"] = (("chain", "draw"), self._draw_tau(
+            post["mu_1"].values, post["mu_2"].values, post["sigma"].values, random_seed))
+        return trace
+
+    def _nuts_step(self, compile_kwargs=None):
+        # Compiled once per model graph and compile mode: the logp and gradient read the pm.Data
+        # containers, so set_data windows reuse them
+        import pymc as pm
+        from pymc.blocking import DictToArrayBijection
+        from pymc.step_methods.hmc.integration import CpuLeapfrogIntegrator
+        from pymc.step_methods.hmc.quadpotential import QuadPotentialDiagAdapt
+
+        if self.model is None:
+            self.build_model()
+        key = (id(self.model), repr(compile_kwargs))
+        if getattr(self, "_nuts_key", None) != key:
+            with self.model:
+                self._nuts = pm.NUTS(compile_kwargs=compile_kwargs)
+            self._nuts_key = key
+        # A fresh mass matrix adapted from this window's initial point, as pm.sample's own init does
+        mean = DictToArrayBijection.map(self.model.initial_point()).data
+        potential = QuadPotentialDiagAdapt(mean.size, mean, np.ones_like(mean), 10)
+        self._nuts.potential = potential
+        self._nuts.integrator = CpuLeapfrogIntegrator(potential, self._nuts._logp_dlogp_func)
+        return self._nuts
+
+    def _accumulate_tau(self, accumulator: PosteriorAccumulator, point: dict):
+        # Adds the whole conditional p(tau | mu_1, mu_2, sigma, x) rather than one draw from it
+        log_w = self._tau_log_weights(np.array([point["mu_1"]]), np.array([point["mu_2"]]),
+                                      np.array([point["sigma"]]))[0]
+        w = np.exp(log_w - log_w.max())
+        accumulator.update_tau(probs=w / w.sum())
+
+    def _tau_log_weights(self, mu_1, mu_2, sigma):
+        return tau_log_weights(self.data.values, mu_1, mu_2, sigma)
+
+    @staticmethod
+    def _prior_scale(data: pd.Series):
+        std_val = data.std()
+        if std_val == 0 or np.isnan(std_val):
+            std_val = 1.0
+        return float(data.mean()), float(std_val)
+
+    def _draw_tau(self, mu_1, mu_2, sigma, random_seed=None, chunk_size=256):
+        tau = draw_tau(self.data.values, mu_1.ravel(), mu_2.ravel(), sigma.ravel(),
+                       np.random.default_rng(random_seed), chunk_size)
+        return tau.reshape(mu_1.shape)
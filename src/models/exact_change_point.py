@@ -0,0 +1,255 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+from scipy.special import gammaln, logsumexp
+
+
+@dataclass
+class NormalInverseGammaPrior:
+    """
+    Conjugate prior for a single mean shift with a shared noise level.
+
+    sigma^2 ~ InverseGamma(alpha0, beta0)
+    mu_k | sigma^2 ~ Normal(mu0, sigma^2 / kappa0)   for k = 1, 2
+
+    The parameters may also be arrays (e.g. one column per window) that
+    broadcast against the sufficient statistics.
+    """
+    mu0: float
+    kappa0: float = 1.0
+    alpha0: float = 1.0
+    beta0: float = 1.0
+
+    def __post_init__(self):
+        if np.any(np.asarray(self.kappa0) <= 0) or np.any(np.asarray(self.alpha0) <= 0) \
+                or np.any(np.asarray(self.beta0) <= 0):
+            raise ValueError("kappa0, alpha0 and beta0 must be strictly positive.")
+
+    @classmethod
+    def from_data(cls, values: np.ndarray) -> "NormalInverseGammaPrior":
+        """
+        Weakly informative prior centred on the data, mirroring the PyMC priors
+        of ChangePointModel (means around the sample mean, scale of one sample std).
+        """
+        values = np.asarray(values, dtype=float)
+        var = values.var(ddof=1) if len(values) > 1 else 0.0
+        if var == 0 or np.isnan(var):
+            var = 1.0  # Same fallback as ChangePointModel.build_model
+        return cls(mu0=float(values.mean()), kappa0=1.0, alpha0=1.0, beta0=float(var))
+
+
+def prefix_sums(values: np.ndarray):
+    """
+    Returns the cumulative sums of x and x^2 with a leading zero, so that the
+    sufficient statistics of x[i:j] are s[j] - s[i] and q[j] - q[i].
+    """
+    values = np.asarray(values, dtype=float)
+    s = np.concatenate(([0.0], np.cumsum(values)))
+    q = np.concatenate(([0.0], np.cumsum(values ** 2)))
+    return s, q
+
+
+def extend_prefix_sums(s, q, tail: np.ndarray, start: int):
+    """
+    Prefix sums of a series that agrees with the one behind (s, q) on its
+    first `start` values and continues with `tail`, recomputing only the tail.
+    """
+    tail = np.asarray(tail, dtype=float)
+    return (np.concatenate((s[:start + 1], s[start] + np.cumsum(tail))),
+            np.concatenate((q[:start + 1], q[start] + np.cumsum(tail ** 2))))
+
+
+def masked_prefix_sums(values: np.ndarray, shift: float = 0.0, sums=None, start: int = 0):
+    """
+    NaN-aware prefix sums of values - shift: NaNs add nothing to s and q, and
+    `count` counts the valid values. Given the (count, s, q) of a series that
+    agrees with `values` on its first `start` values, only the tail is
+    recomputed (see extend_prefix_sums).
+
+    Returns:
+        tuple: (count, s, q), each with a leading zero.
+    """
+    values = np.asarray(values, dtype=float)
+    if sums is None:
+        sums, start = (np.zeros(1), np.zeros(1), np.zeros(1)), 0
+    count, s, q = sums
+    tail = values[start:]
+    valid = ~np.isnan(tail)
+    s, q = extend_prefix_sums(s, q, np.where(valid, tail - shift, 0.0), start)
+    return np.concatenate((count[:start + 1], count[start] + np.cumsum(valid))), s, q
+
+
+def segment_posterior(count, total, total_sq, prior: NormalInverseGammaPrior):
+    """
+    Conjugate update of one segment from its sufficient statistics (vectorized).
+
+    Returns:
+        tuple: (kappa_n, m_n, ss) where ss is the segment's contribution to beta_n.
+               Empty segments return the prior values and ss = 0.
+    """
+    count = np.asarray(count, dtype=float)
+    kappa_n = prior.kappa0 + count
+    m_n = (prior.kappa0 * prior.mu0 + total) / kappa_n
+    safe = np.maximum(count, 1.0)
+    seg_mean = total / safe
+    within = np.maximum(total_sq - total * seg_mean, 0.0)
+    shrink = prior.kappa0 * count / kappa_n * (seg_mean - prior.mu0) ** 2
+    ss = np.where(count > 0, within + shrink, 0.0)
+    return kappa_n, m_n, ss
+
+
+def tau_log_marginal(s, q, prior: NormalInverseGammaPrior, start: int = 0, stop: Optional[int] = None):
+    """
+    Log marginal likelihood of x[start:stop] for every change index tau in
+    [0, n - 1], where tau is the last index of the first regime (the same
+    convention as the `tau >= idx` switch of the PyMC model).
+
+    Args:
+        s, q: Prefix sums from `prefix_sums`.
+        prior: The conjugate prior.
+        start, stop: Window bounds into the prefix sums.
+
+    Returns:
+        tuple: (log_marginal, kappa_1, m_1, kappa_2, m_2, alpha_n, beta_n), all
+               arrays of length n except alpha_n.
+    """
+    if stop is None:
+        stop = len(s) - 1
+    n = stop - start
+    split = np.arange(start + 1, stop + 1)
+    n_1 = split - start
+    s_1, q_1 = s[split] - s[start], q[split] - q[start]
+    s_2, q_2 = s[stop] - s[split], q[stop] - q[split]
+
+    kappa_1, m_1, ss_1 = segment_posterior(n_1, s_1, q_1, prior)
+    kappa_2, m_2, ss_2 = segment_posterior(n - n_1, s_2, q_2, prior)
+
+    alpha_n = prior.alpha0 + n / 2.0
+    beta_n = prior.beta0 + 0.5 * (ss_1 + ss_2)
+    log_marginal = _log_marginal(n, kappa_1, kappa_2, alpha_n, beta_n, prior)
+    return log_marginal, kappa_1, m_1, kappa_2, m_2, alpha_n, beta_n
+
+
+def window_log_marginals(s, q, starts, width: int, prior: NormalInverseGammaPrior) -> np.ndarray:
+    """
+    `tau_log_marginal` for many equal-width windows x[start:start + width] at
+    once, all read from the same prefix sums.
+
+    Args:
+        s, q: Prefix sums from `prefix_sums`.
+        starts (array-like): First index of each window.
+        width (int): Window length.
+        prior: The conjugate prior, scalar or with (n_windows, 1) arrays.
+
+    Returns:
+        np.ndarray: (n_windows, width) log marginal likelihood of each tau.
+    """
+    starts = np.asarray(starts, dtype=np.int64)[:, None]
+    split = starts + np.arange(1, width + 1)
+    stop = starts + width
+    n_1 = split - starts
+    s_1, q_1 = s[split] - s[starts], q[split] - q[starts]
+    s_2, q_2 = s[stop] - s[split], q[stop] - q[split]
+
+    kappa_1, _, ss_1 = segment_posterior(n_1, s_1, q_1, prior)
+    kappa_2, _, ss_2 = segment_posterior(width - n_1, s_2, q_2, prior)
+
+    alpha_n = prior.alpha0 + width / 2.0
+    beta_n = prior.beta0 + 0.5 * (ss_1 + ss_2)
+    return _log_marginal(width, kappa_1, kappa_2, alpha_n, beta_n, prior)
+
+
+def _log_marginal(n, kappa_1, kappa_2, alpha_n, beta_n, prior: NormalInverseGammaPrior):
+    return (
+        0.5 * (2 * np.log(prior.kappa0) - np.log(kappa_1) - np.log(kappa_2))
+        + prior.alpha0 * np.log(prior.beta0) - alpha_n * np.log(beta_n)
+        + gammaln(alpha_n) - gammaln(prior.alpha0)
+        - 0.5 * n * np.log(2 * np.pi)
+    )
+
+
+class ExactPosterior:
+    """
+    Exact posterior of the single change point model under a conjugate
+    Normal-Inverse-Gamma prior and a uniform prior on tau.
+    """
+    def __init__(self, values: np.ndarray, prior: Optional[NormalInverseGammaPrior] = None):
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            raise ValueError("Cannot compute a change point posterior for an empty series.")
+        self.n = len(values)
+        self.prior = prior or NormalInverseGammaPrior.from_data(values)
+
+        s, q = prefix_sums(values)
+        (log_marginal, self.kappa_1, self.m_1,
+         self.kappa_2, self.m_2, self.alpha_n, self.beta_n) = tau_log_marginal(s, q, self.prior)
+
+        log_norm = logsumexp(log_marginal)
+        self.tau_probs = np.exp(log_marginal - log_norm)
+        self.log_evidence = float(log_norm - np.log(self.n))
+
+    @property
+    def tau_map(self) -> int:
+        return int(np.argmax(self.tau_probs))
+
+    @property
+    def tau_median(self) -> int:
+        return int(np.searchsorted(np.cumsum(self.tau_probs), 0.5))
+
+    def _mixture_moments(self, cond_mean, cond_var):
+        mean = np.sum(self.tau_probs * cond_mean)
+        second = np.sum(self.tau_probs * (cond_var + cond_mean ** 2))
+        return float(mean), float(np.sqrt(max(second - mean ** 2, 0.0)))
+
+    def moments(self) -> dict:
+        """
+        Posterior mean and standard deviation of tau, mu_1, mu_2 and sigma,
+        marginalized over tau.
+        """
+        a, b = self.alpha_n, self.beta_n
+        sigma2_mean = b / (a - 1) if a > 1 else np.full_like(b, np.nan)
+        sigma_mean = np.sqrt(b) * np.exp(gammaln(a - 0.5) - gammaln(a))
+
+        idx = np.arange(self.n)
+        result = {"tau": self._mixture_moments(idx, np.zeros(self.n))}
+        result["mu_1"] = self._mixture_moments(self.m_1, sigma2_mean / self.kappa_1)
+        result["mu_2"] = self._mixture_moments(self.m_2, sigma2_mean / self.kappa_2)
+        result["sigma"] = self._mixture_moments(sigma_mean, sigma2_mean - sigma_mean ** 2)
+        return {name: {"mean": m, "sd": sd} for name, (m, sd) in result.items()}
+
+    def sample(self, draws: int = 1000, chains: int = 4, random_seed=None) -> dict:
+        """
+        Draws independent samples from the exact joint posterior.
+
+        Returns:
+            dict: Arrays of shape (chains, draws) for tau, mu_1, mu_2 and sigma.
+        """
+        rng = np.random.default_rng(random_seed)
+        shape = (chains, draws)
+        tau = rng.choice(self.n, size=shape, p=self.tau_probs)
+        sigma2 = self.beta_n[tau] / rng.gamma(self.alpha_n, size=shape)
+        mu_1 = rng.normal(self.m_1[tau], np.sqrt(sigma2 / self.kappa_1[tau]))
+        mu_2 = rng.normal(self.m_2[tau], np.sqrt(sigma2 / self.kappa_2[tau]))
+        return {"tau": tau, "mu_1": mu_1, "mu_2": mu_2, "sigma": np.sqrt(sigma2)}
+
+    def to_inference_data(self, draws: int = 1000, chains: int = 4, random_seed=None):
+        """
+        Packs exact posterior draws into an ArviZ InferenceData so the usual
+        `az.summary` / `az.plot_trace` tooling works unchanged. The exact tau
+        distribution is stored in the extra `exact_posterior` group.
+        """
+        import arviz as az
+        import xarray as xr
+
+        idata = az.from_dict(posterior=self.sample(draws, chains, random_seed))
+        moments = self.moments()
+        exact = xr.Dataset(
+            {"tau_probability": ("tau_index", self.tau_probs)},
+            coords={"tau_index": np.arange(self.n)},
+            attrs={
+                "log_evidence": self.log_evidence,
+                **{f"{name}_{stat}": value for name, stats in moments.items() for stat, value in stats.items()},
+            },
+        )
+        idata.add_groups({"exact_posterior": exact})
+        return idata
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.utils.logger import setup_logger
+from src.utils.metrics import span
+
+logger = setup_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("data", "processed", "inference_cache")
+
+class InferenceCache:
+    """
+    Content-addressed on-disk cache for inference results.
+
+    Entries are keyed on a SHA-256 of the input series plus the model and
+    sampler configuration, and stored as `<key>.nc` (InferenceData as NetCDF)
+    next to `<key>.summary.csv` (the `az.summary` table). Entries older than
+    `max_age_days` are evicted, then least recently used entries until the
+    cache fits in `max_bytes`.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 1 << 30,
+                 max_age_days: Optional[float] = 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(values, config: dict) -> str:
+        """
+        Hashes the series values and a JSON-serializable configuration.
+        """
+        digest = hashlib.sha256()
+        values = np.ascontiguousarray(np.asarray(values, dtype=float))
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".nc", base + ".summary.csv"
+
+    def get(self, key: str):
+        """
+        Returns (InferenceData, summary DataFrame) for a key, or None on a miss.
+        """
+        import arviz as az
+
+        trace_path, summary_path = self._paths(key)
+        if not (os.path.exists(trace_path) and os.path.exists(summary_path)):
+            return None
+        try:
+            trace = az.from_netcdf(trace_path)
+            trace.load()
+            summary = pd.read_csv(summary_path, index_col=0)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key[:12]}: {e}")
+            self._remove(key)
+            return None
+        now = time.time()
+        for path in (trace_path, summary_path):
+            os.utime(path, (now, now))  # Mark as recently used
+        logger.info(f"Inference cache hit ({key[:12]}).")
+        return trace, summary
+
+    def put(self, key: str, trace, summary: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Stores a result and evicts old entries. Computes the summary if not given.
+
+        Returns:
+            pd.DataFrame: The stored summary.
+        """
+        import arviz as az
+
+        if summary is None:
+            with span("model.summary"):
+                summary = az.summary(trace)
+        trace_path, summary_path = self._paths(key)
+        # Write to temporary files first so readers never see partial entries
+        trace.to_netcdf(trace_path + ".tmp")
+        summary.to_csv(summary_path + ".tmp")
+        os.replace(trace_path + ".tmp", trace_path)
+        os.replace(summary_path + ".tmp", summary_path)
+        logger.info(f"Stored inference result in cache ({key[:12]}).")
+        self.evict()
+        return summary
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".nc"):
+                continue
+            key = name[:-3]
+            paths = [p for p in self._paths(key) if os.path.exists(p)]
+            size = sum(os.path.getsize(p) for p in paths)
+            last_used = max(os.path.getmtime(p) for p in paths)
+            entries.append((last_used, size, key))
+        return sorted(entries)
+
+    def evict(self):
+        """
+        Applies the age limit, then removes least recently used entries until
+        the cache is within `max_bytes`.
+        """
+        entries = self._entries()
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            for last_used, _, key in entries:
+                if last_used < cutoff:
+                    self._remove(key)
+            entries = [e for e in entries if e[0] >= cutoff]
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self):
+        for _, _, key in self._entries():
+            self._remove(key)
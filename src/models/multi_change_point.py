@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+from src.models.exact_change_point import prefix_sums
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+COST_MODELS = ("mean", "var", "meanvar")
+
+class MultiChangePointDetector:
+    """
+    Detects an unknown number of change points with PELT (Killick et al., 2012).
+
+    Segment costs are Gaussian negative log-likelihoods (times two) evaluated
+    from cumulative sums of x and x^2, so each PELT step scores all surviving
+    candidate start positions in one vectorized expression.
+
+    Cost models:
+        - "mean": shifts in mean with a common variance (estimated robustly).
+        - "var": shifts in variance around the global mean (e.g. log returns).
+        - "meanvar": shifts in mean and/or variance.
+    """
+    def __init__(self, model: str = "meanvar", penalty: Union[str, float] = "bic", min_size: int = 20):
+        """
+        Args:
+            model (str): One of "mean", "var", "meanvar".
+            penalty (str or float): "bic", "aic" or an explicit penalty per change point.
+            min_size (int): Minimum number of observations per segment.
+
+        Raises:
+            ValueError: If the model, penalty or min_size is invalid.
+        """
+        if model not in COST_MODELS:
+            raise ValueError(f"Unknown cost model '{model}'. Expected one of {COST_MODELS}.")
+        if isinstance(penalty, str) and penalty not in ("bic", "aic"):
+            raise ValueError(f"Unknown penalty '{penalty}'. Use 'bic', 'aic' or a number.")
+        if not isinstance(penalty, str) and penalty < 0:
+            raise ValueError("Penalty must be non-negative.")
+        if min_size < 1:
+            raise ValueError("min_size must be at least 1.")
+        self.model = model
+        self.penalty = penalty
+        self.min_size = min_size
+        self.data: Optional[pd.Series] = None
+        self.change_points_: List[int] = []
+
+    def _penalty_value(self, n: int) -> float:
+        params = 2 if self.model == "meanvar" else 1
+        if self.penalty == "bic":
+            return (params + 1) * np.log(n)
+        if self.penalty == "aic":
+            return 2.0 * (params + 1)
+        return float(self.penalty)
+
+    def _make_cost(self, x: np.ndarray):
+        s, q = prefix_sums(x - x.mean())
+        # Floor for segment variances so constant stretches don't give log(0)
+        eps = max(np.var(x) * 1e-8, 1e-12)
+
+        if self.model == "mean":
+            diffs = np.diff(x)
+            sigma = 1.4826 * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2) if len(diffs) else 0.0
+            var = sigma ** 2 if sigma > 0 else (np.var(x) or 1.0)
+
+            def cost(start, end):
+                length = end - start
+                total = s[end] - s[start]
+                return (q[end] - q[start] - total ** 2 / length) / var
+        elif self.model == "var":
+            def cost(start, end):
+                length = end - start
+                return length * np.log(np.maximum((q[end] - q[start]) / length, eps))
+        else:
+            def cost(start, end):
+                length = end - start
+                total = s[end] - s[start]
+                sse = q[end] - q[start] - total ** 2 / length
+                return length * np.log(np.maximum(sse / length, eps))
+        return cost
+
+    def fit(self, data: pd.Series) -> "MultiChangePointDetector":
+        """
+        Runs PELT over the series.
+
+        Args:
+            data (pd.Series): Numeric series (prices or log returns). A DatetimeIndex
+                is used by `change_dates`.
+
+        Returns:
+            MultiChangePointDetector: self, with `change_points_` set to the positions
+            where each new regime starts.
+        """
+        if not isinstance(data, pd.Series):
+            raise ValueError("Input data must be a pandas Series.")
+        if data.empty:
+            raise ValueError("Input data series is empty.")
+        if not pd.api.types.is_numeric_dtype(data):
+            raise ValueError("Input data must be numeric.")
+        if data.isnull().any():
+            raise ValueError("Input data contains NaN values. Please clean the data before modeling.")
+
+        self.data = data
+        x = data.values.astype(float)
+        n = len(x)
+        m = self.min_size
+        if n < 2 * m:
+            self.change_points_ = []
+            return self
+
+        cost = self._make_cost(x)
+        pen = self._penalty_value(n)
+
+        best = np.full(n + 1, np.inf)
+        best[0] = -pen
+        last = np.zeros(n + 1, dtype=np.int64)
+        candidates = np.array([0], dtype=np.int64)
+
+        for t in range(m, n + 1):
+            scores = best[candidates] + cost(candidates, t)
+            i = np.argmin(scores)
+            best[t] = scores[i] + pen
+            last[t] = candidates[i]
+            # PELT pruning: a start that can't beat best[t] now never will
+            candidates = np.append(candidates[scores <= best[t]], t - m + 1)
+
+        change_points = []
+        t = last[n]
+        while t > 0:
+            change_points.append(int(t))
+            t = last[t]
+        self.change_points_ = sorted(change_points)
+        logger.info(f"PELT ({self.model}) found {len(self.change_points_)} change points in {n} observations.")
+        return self
+
+    def change_dates(self, dates=None) -> pd.DatetimeIndex:
+        """
+        Maps change points to dates (the first date of each new regime).
+
+        Args:
+            dates (array-like, optional): Dates aligned with the fitted series.
+                Defaults to the series' DatetimeIndex.
+        """
+        if self.data is None:
+            raise RuntimeError("Detector has not been fitted.")
+        if dates is None:
+            dates = self.data.index
+        return pd.DatetimeIndex(np.asarray(dates)[self.change_points_])
+
+    def segments(self, dates=None) -> pd.DataFrame:
+        """
+        Summarizes each detected regime: bounds, length, mean and std.
+        """
+        if self.data is None:
+            raise RuntimeError("Detector has not been fitted.")
+        x = self.data.values.astype(float)
+        bounds = [0] + self.change_points_ + [len(x)]
+        labels = np.arange(len(x)) if dates is None and not isinstance(self.data.index, pd.DatetimeIndex) \
+            else np.asarray(self.data.index if dates is None else dates)
+        rows = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            seg = x[start:end]
+            rows.append({
+                "start": labels[start],
+                "end": labels[end - 1],
+                "length": end - start,
+                "mean": seg.mean(),
+                "std": seg.std(ddof=1) if len(seg) > 1 else 0.0,
+            })
+        return pd.DataFrame(rows)
@@ -0,0 +1,212 @@
+import numpy as np
+from typing import Optional
+from scipy.special import gammaln, logsumexp
+from src.models.exact_change_point import NormalInverseGammaPrior
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class OnlineChangePointDetector:
+    """
+    Bayesian Online Changepoint Detection (Adams & MacKay, 2007).
+
+    Observations are Normal with unknown mean and variance under a conjugate
+    Normal-Inverse-Gamma prior, so the predictive for every run length is a
+    Student-t. The run length posterior is truncated at `max_run_length` and
+    entries below `prune_threshold` are dropped, so each update costs
+    O(max_run_length) time and memory regardless of how long the stream is.
+    """
+    def __init__(self, prior: NormalInverseGammaPrior, hazard_lambda: float = 250.0,
+                 max_run_length: int = 1000, prune_threshold: float = 1e-8,
+                 change_window: int = 5, series: str = "value"):
+        """
+        Args:
+            prior (NormalInverseGammaPrior): Prior for the parameters of each new regime.
+            hazard_lambda (float): Expected regime length (constant hazard 1 / lambda).
+            max_run_length (int): Run lengths beyond this are truncated.
+            prune_threshold (float): Run lengths with lower posterior mass are dropped.
+            change_window (int): `change_probability` is the posterior mass on run
+                lengths shorter than this, i.e. "a new regime started in the last
+                `change_window` observations".
+            series (str): "value" consumes observations as given, "log_return"
+                consumes prices and models their log returns.
+
+        Raises:
+            ValueError: If any setting is out of range.
+        """
+        if hazard_lambda <= 1:
+            raise ValueError("hazard_lambda must be greater than 1.")
+        if max_run_length < 1 or change_window < 1:
+            raise ValueError("max_run_length and change_window must be at least 1.")
+        if not 0 <= prune_threshold < 1:
+            raise ValueError("prune_threshold must be in [0, 1).")
+        if series not in ("value", "log_return"):
+            raise ValueError("series must be 'value' or 'log_return'.")
+        self.prior = prior
+        self.hazard_lambda = float(hazard_lambda)
+        self.max_run_length = int(max_run_length)
+        self.prune_threshold = float(prune_threshold)
+        self.change_window = int(change_window)
+        self.series = series
+        self.reset()
+
+    @classmethod
+    def from_warmup(cls, values, **kwargs) -> "OnlineChangePointDetector":
+        """
+        Builds a detector whose prior is scaled on a warm-up sample, then feeds it
+        that sample. With series="log_return" the values are prices.
+        """
+        values = np.asarray(values, dtype=float)
+        scale_values = np.diff(np.log(values)) if kwargs.get("series") == "log_return" else values
+        detector = cls(NormalInverseGammaPrior.from_data(scale_values), **kwargs)
+        for value in values:
+            detector.update(value)
+        return detector
+
+    def reset(self):
+        """
+        Forgets all observations.
+        """
+        p = self.prior
+        self.t = 0
+        self.last_price: Optional[float] = None
+        self.last_timestamp: Optional[str] = None
+        self.run_lengths = np.zeros(1, dtype=np.int64)
+        self.log_probs = np.zeros(1)
+        self.mu = np.array([p.mu0], dtype=float)
+        self.kappa = np.array([p.kappa0], dtype=float)
+        self.alpha = np.array([p.alpha0], dtype=float)
+        self.beta = np.array([p.beta0], dtype=float)
+
+    def _predictive_logpdf(self, x: float) -> np.ndarray:
+        df = 2 * self.alpha
+        scale2 = self.beta * (self.kappa + 1) / (self.alpha * self.kappa)
+        z2 = (x - self.mu) ** 2 / (df * scale2)
+        return (gammaln((df + 1) / 2) - gammaln(df / 2)
+                - 0.5 * np.log(np.pi * df * scale2) - (df + 1) / 2 * np.log1p(z2))
+
+    def update(self, value: float, timestamp: Optional[str] = None) -> Optional[dict]:
+        """
+        Consumes one observation.
+
+        Args:
+            value (float): The new observation (a price if series="log_return").
+            timestamp (str, optional): Stored with the state for checkpointing.
+
+        Returns:
+            dict: Status after the update (see `status`), or None when the first
+            price of a log-return stream has been recorded.
+
+        Raises:
+            ValueError: If the value is not finite (or not positive for prices).
+        """
+        value = float(value)
+        if not np.isfinite(value):
+            raise ValueError("Observations must be finite.")
+        if timestamp is not None:
+            self.last_timestamp = str(timestamp)
+        if self.series == "log_return":
+            if value <= 0:
+                raise ValueError("Prices must be positive to compute log returns.")
+            previous, self.last_price = self.last_price, value
+            if previous is None:
+                return None
+            value = np.log(value / previous)
+
+        log_hazard = -np.log(self.hazard_lambda)
+        log_survival = np.log1p(-1.0 / self.hazard_lambda)
+        log_joint = self.log_probs + self._predictive_logpdf(value)
+
+        log_probs = np.concatenate(([logsumexp(log_joint) + log_hazard], log_joint + log_survival))
+        log_probs -= logsumexp(log_probs)
+
+        # Conjugate update of every run length, plus a fresh regime at r = 0
+        p = self.prior
+        kappa = self.kappa + 1
+        mu = (self.kappa * self.mu + value) / kappa
+        alpha = self.alpha + 0.5
+        beta = self.beta + self.kappa * (value - self.mu) ** 2 / (2 * kappa)
+
+        self.run_lengths = np.concatenate(([0], self.run_lengths + 1))
+        self.mu = np.concatenate(([p.mu0], mu))
+        self.kappa = np.concatenate(([p.kappa0], kappa))
+        self.alpha = np.concatenate(([p.alpha0], alpha))
+        self.beta = np.concatenate(([p.beta0], beta))
+        self.log_probs = log_probs
+        self.t += 1
+        self._truncate()
+        return self.status()
+
+    def _truncate(self):
+        keep = self.run_lengths <= self.max_run_length
+        if self.prune_threshold > 0:
+            keep &= self.log_probs >= np.log(self.prune_threshold)
+            keep[0] = True
+        if not keep.all():
+            for name in ("run_lengths", "log_probs", "mu", "kappa", "alpha", "beta"):
+                setattr(self, name, getattr(self, name)[keep])
+            self.log_probs -= logsumexp(self.log_probs)
+
+    @property
+    def run_length_posterior(self) -> dict:
+        """
+        Posterior over the current run length as {"run_length": ..., "probability": ...}.
+        """
+        return {"run_length": self.run_lengths.copy(), "probability": np.exp(self.log_probs)}
+
+    @property
+    def change_probability(self) -> float:
+        """
+        Posterior probability that the current regime started less than
+        `change_window` observations ago.
+        """
+        recent = self.run_lengths < self.change_window
+        return float(np.exp(self.log_probs[recent]).sum()) if recent.any() else 0.0
+
+    def status(self) -> dict:
+        probs = np.exp(self.log_probs)
+        return {
+            "t": self.t,
+            "timestamp": self.last_timestamp,
+            "map_run_length": int(self.run_lengths[np.argmax(probs)]),
+            "expected_run_length": float(np.sum(probs * self.run_lengths)),
+            "change_probability": self.change_probability,
+        }
+
+    def save(self, path: str):
+        """
+        Checkpoints the detector state and configuration to an .npz file.
+        """
+        p = self.prior
+        np.savez(
+            path,
+            config=np.array([self.hazard_lambda, self.max_run_length, self.prune_threshold, self.change_window]),
+            prior=np.array([p.mu0, p.kappa0, p.alpha0, p.beta0]),
+            series=np.array(self.series),
+            t=np.array(self.t),
+            last_price=np.array(np.nan if self.last_price is None else self.last_price),
+            last_timestamp=np.array(self.last_timestamp or ""),
+            run_lengths=self.run_lengths, log_probs=self.log_probs,
+            mu=self.mu, kappa=self.kappa, alpha=self.alpha, beta=self.beta,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineChangePointDetector":
+        """
+        Restores a detector saved with `save`.
+        """
+        with np.load(path) as state:
+            hazard_lambda, max_run_length, prune_threshold, change_window = state["config"]
+            detector = cls(
+                NormalInverseGammaPrior(*state["prior"]),
+                hazard_lambda=hazard_lambda, max_run_length=int(max_run_length),
+                prune_threshold=prune_threshold, change_window=int(change_window),
+                series=str(state["series"]),
+            )
+            detector.t = int(state["t"])
+            last_price = float(state["last_price"])
+            detector.last_price = None if np.isnan(last_price) else last_price
+            detector.last_timestamp = str(state["last_timestamp"]) or None
+            for name in ("run_lengths", "log_probs", "mu", "kappa", "alpha", "beta"):
+                setattr(detector, name, state[name].copy())
+        return detector
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch in fixed memory.
+
+    Values enter a level-0 buffer; a full buffer is sorted and every other
+    value (from a random offset) moves up one level with double the weight.
+    With `capacity` values per level and L levels, quantiles are accurate to
+    roughly L / capacity in rank while memory stays O(capacity * L).
+    """
+    def __init__(self, capacity: int = 256, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.count = 0
+        self._levels: List[list] = [[]]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, value: float):
+        self.count += 1
+        self._levels[0].append(value)
+        if len(self._levels[0]) >= self.capacity:
+            self._compact()
+
+    def update_many(self, values):
+        for value in np.asarray(values, dtype=float).ravel():
+            self.update(value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        for level in range(len(self._levels)):
+            self._compact(level)
+        return self
+
+    def _compact(self, level: int = 0):
+        while level < len(self._levels) and len(self._levels[level]) >= self.capacity:
+            items = np.sort(np.asarray(self._levels[level], dtype=float))
+            self._levels[level] = []
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            self._levels[level + 1].extend(items[self._rng.integers(2)::2].tolist())
+            level += 1
+
+    def _weighted(self):
+        values = np.concatenate([np.asarray(items, dtype=float) for items in self._levels])
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values)
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s) of everything seen so far (NaN when empty).
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        values, cum = self._weighted()
+        idx = np.searchsorted(cum, q * cum[-1], side='left')
+        return values[np.clip(idx, 0, len(values) - 1)]
+
+    def hdi(self, prob: float = 0.94, grid: int = 200):
+        """
+        Shortest interval holding `prob` of the mass, searched over a quantile grid.
+        """
+        lower = np.linspace(0.0, 1.0 - prob, grid)
+        lo, hi = self.quantile(lower), self.quantile(lower + prob)
+        best = int(np.nanargmin(hi - lo)) if self.count else 0
+        return float(lo[best]), float(hi[best])
+
+class PosteriorAccumulator:
+    """
+    Compact running summary of MCMC draws, filled one draw at a time.
+
+    Per parameter it keeps Welford means and variances for each half of every
+    chain (for split-chain R-hat), batch means per chain (for ESS) and a
+    quantile sketch (for HDIs). The change point keeps a histogram over
+    indices, filled either with sampled indices or, for models that
+    marginalize tau, with its full conditional distribution per draw, which
+    has lower variance than sampling from it. Memory is independent of the
+    number of draws.
+
+    R-hat is the classic split-chain potential scale reduction and ESS the
+    batch-means estimate, not ArviZ's rank-normalized versions; they agree
+    closely for well-mixed continuous parameters.
+    """
+    def __init__(self, names: List[str], chains: int, draws: int, tau_size: Optional[int] = None,
+                 n_batches: int = 32, sketch_capacity: int = 256, seed: Optional[int] = None):
+        """
+        Args:
+            names (list): Parameter names, in the order of the values passed to `update`.
+            chains (int): Number of chains.
+            draws (int): Planned draws per chain (chains are split in half at draws // 2).
+            tau_size (int, optional): Number of change point positions to histogram.
+            n_batches (int): Batches per chain for the ESS estimate.
+            sketch_capacity (int): Values per level of each quantile sketch.
+            seed (int, optional): Seed for the sketches' compaction offsets.
+        """
+        self.names = list(names)
+        self.chains = chains
+        self.draws = draws
+        p = len(self.names)
+        self._half = max(draws // 2, 1)
+        self._batch_size = max(draws // n_batches, 1)
+        self._count = np.zeros((chains, 2), dtype=np.int64)
+        self._mean = np.zeros((chains, 2, p))
+        self._m2 = np.zeros((chains, 2, p))
+        self._drawn = np.zeros(chains, dtype=np.int64)
+        self._batch_sum = np.zeros((chains, p))
+        self._batch_means = [[] for _ in range(chains)]
+        self._sketches = [QuantileSketch(sketch_capacity, None if seed is None else seed + j) for j in range(p)]
+        self.tau_counts = np.zeros(tau_size) if tau_size else None
+
+    def update(self, chain: int, values):
+        """
+        Adds one post-tuning draw of every parameter for a chain.
+        """
+        values = np.asarray(values, dtype=float)
+        half = int(self._drawn[chain] >= self._half)
+        self._drawn[chain] += 1
+        self._count[chain, half] += 1
+        delta = values - self._mean[chain, half]
+        self._mean[chain, half] += delta / self._count[chain, half]
+        self._m2[chain, half] += delta * (values - self._mean[chain, half])
+
+        self._batch_sum[chain] += values
+        if self._drawn[chain] % self._batch_size == 0:
+            self._batch_means[chain].append(self._batch_sum[chain] / self._batch_size)
+            self._batch_sum[chain] = 0.0
+        for sketch, value in zip(self._sketches, values):
+            sketch.update(value)
+
+    def update_tau(self, index: Optional[int] = None, probs: Optional[np.ndarray] = None):
+        """
+        Adds one draw to the tau histogram: a sampled index, or the
+        probability of every index given the draw's other parameters.
+        """
+        if probs is not None:
+            self.tau_counts += probs
+        else:
+            self.tau_counts[index] += 1
+
+    def _pooled(self, count, mean, m2, axis):
+        # Combines Welford states along an axis (Chan et al.)
+        total = count.sum(axis=axis)
+        safe = np.maximum(total, 1)[..., None]
+        pooled_mean = (count[..., None] * mean).sum(axis=axis) / safe
+        pooled_m2 = (m2 + count[..., None] * (mean - np.expand_dims(pooled_mean, axis)) ** 2).sum(axis=axis)
+        return total, pooled_mean, pooled_m2
+
+    def _totals(self):
+        p = len(self.names)
+        return self._pooled(self._count.reshape(-1), self._mean.reshape(-1, p), self._m2.reshape(-1, p), axis=0)
+
+    @property
+    def n_draws(self) -> int:
+        return int(self._drawn.sum())
+
+    def mean(self, name: Optional[str] = None):
+        _, mean, _ = self._totals()
+        return mean if name is None else float(mean[self.names.index(name)])
+
+    def sd(self, name: Optional[str] = None):
+        total, _, m2 = self._totals()
+        sd = np.sqrt(m2 / max(total - 1, 1))
+        return sd if name is None else float(sd[self.names.index(name)])
+
+    def rhat(self) -> np.ndarray:
+        """
+        Split-chain R-hat per parameter (unsplit chains if the second halves
+        are too short, e.g. after early stopping).
+        """
+        count, mean, m2 = self._count, self._mean, self._m2
+        if count[:, 1].min() < 2:
+            count, mean, m2 = self._pooled(count, mean, m2, axis=1)
+            count, mean, m2 = count[:, None], mean[:, None], m2[:, None]
+        count, mean, m2 = count.reshape(-1), mean.reshape(-1, len(self.names)), m2.reshape(-1, len(self.names))
+        keep = count >= 2
+        if keep.sum() < 2:
+            return np.full(len(self.names), np.nan)
+        count, mean, m2 = count[keep], mean[keep], m2[keep]
+        n = count.min()
+        within = (m2 / (count[:, None] - 1)).mean(axis=0)
+        between = n * mean.var(axis=0, ddof=1)
+        var_hat = (n - 1) / n * within + between / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(var_hat / within)
+
+    def ess(self) -> np.ndarray:
+        """
+        Batch-means effective sample size per parameter, capped at the
+        number of draws.
+        """
+        total, _, m2 = self._totals()
+        variance = m2 / max(total - 1, 1)
+        asymptotic = [self._batch_size * np.var(np.asarray(b), axis=0, ddof=1)
+                      for b in self._batch_means if len(b) >= 2]
+        if not asymptotic:
+            return np.full(len(self.names), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.minimum(total * variance / np.mean(asymptotic, axis=0), total)
+
+    def quantile(self, name: str, q):
+        return self._sketches[self.names.index(name)].quantile(q)
+
+    def tau_probabilities(self) -> np.ndarray:
+        return self.tau_counts / max(self.tau_counts.sum(), 1e-300)
+
+    @property
+    def tau_map(self) -> int:
+        return int(np.argmax(self.tau_counts))
+
+    @property
+    def tau_median(self) -> int:
+        return int(np.searchsorted(np.cumsum(self.tau_probabilities()), 0.5))
+
+    def _tau_row(self, hdi_prob: float) -> dict:
+        probs = self.tau_probabilities()
+        idx = np.arange(len(probs))
+        mean = float(probs @ idx)
+        cdf = np.cumsum(probs)
+        lower = np.linspace(0.0, 1.0 - hdi_prob, 200)
+        lo = np.minimum(np.searchsorted(cdf, lower, side='left'), len(probs) - 1)
+        hi = np.minimum(np.searchsorted(cdf, lower + hdi_prob, side='left'), len(probs) - 1)
+        best = int(np.argmin(hi - lo))
+        return {"mean": mean, "sd": float(np.sqrt(probs @ (idx - mean) ** 2)),
+                "hdi_lo": float(lo[best]), "hdi_hi": float(hi[best])}
+
+    def summary(self, hdi_prob: float = 0.94) -> pd.DataFrame:
+        """
+        Table shaped like `az.summary` (mean, sd, HDI bounds, ess_bulk, r_hat).
+        """
+        lo_col, hi_col = f"hdi_{(1 - hdi_prob) / 2:.0%}", f"hdi_{1 - (1 - hdi_prob) / 2:.0%}"
+        rows = {}
+        means, sds, ess, rhat = self.mean(), self.sd(), self.ess(), self.rhat()
+        for j, name in enumerate(self.names):
+            lo, hi = self._sketches[j].hdi(hdi_prob)
+            rows[name] = {"mean": means[j], "sd": sds[j], lo_col: lo, hi_col: hi,
+                          "ess_bulk": ess[j], "r_hat": rhat[j]}
+        if self.tau_counts is not None:
+            tau = self._tau_row(hdi_prob)
+            previous = rows.get("tau", {"ess_bulk": np.nan, "r_hat": np.nan})
+            rows["tau"] = {"mean": tau["mean"], "sd": tau["sd"], lo_col: tau["hdi_lo"], hi_col: tau["hdi_hi"],
+                           "ess_bulk": previous["ess_bulk"], "r_hat": previous["r_hat"]}
+        return pd.DataFrame.from_dict(rows, orient="index")
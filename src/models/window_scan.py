@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
+from src.models.exact_change_point import NormalInverseGammaPrior, prefix_sums, window_log_marginals
+from src.utils.logger import setup_logger
+from src.utils.metrics import span
+
+logger = setup_logger(__name__)
+
+class ChangeProbabilityScan:
+    """
+    Sliding-window change point scan with the exact conjugate posterior.
+
+    Windows of `width` observations start every `stride` positions. Each
+    window gets the single change point model of ExactPosterior (prior
+    centred on the window, uniform prior on tau), and the probability that
+    its new regime starts at each position is averaged over every window
+    that could place a break there, giving one change-probability value per
+    date.
+
+    The prefix sums of x and x^2 are computed once for the whole series, so
+    a window's sufficient statistics, including its own prior, are
+    differences of shared cumulative sums; overlapping windows never rescan
+    their data. Windows are evaluated in vectorized chunks, which bounds
+    memory at `chunk_size * width` values.
+    """
+    def __init__(self, width: int = 250, stride: int = 1, chunk_size: int = 512):
+        """
+        Args:
+            width (int): Observations per window.
+            stride (int): Positions between the starts of consecutive windows.
+            chunk_size (int): Windows evaluated per vectorized block.
+
+        Raises:
+            ValueError: If width < 3 or stride / chunk_size < 1.
+        """
+        if width < 3:
+            raise ValueError("Window width must be at least 3.")
+        if stride < 1 or chunk_size < 1:
+            raise ValueError("stride and chunk_size must be positive.")
+        self.width = width
+        self.stride = stride
+        self.chunk_size = chunk_size
+
+    def window_starts(self, n: int) -> np.ndarray:
+        if n < self.width:
+            return np.array([], dtype=np.int64)
+        return np.arange(0, n - self.width + 1, self.stride, dtype=np.int64)
+
+    def _window_prior(self, s, q, starts) -> NormalInverseGammaPrior:
+        # Same data-centred prior as NormalInverseGammaPrior.from_data, per window
+        w = self.width
+        total = (s[starts + w] - s[starts])[:, None]
+        total_sq = (q[starts + w] - q[starts])[:, None]
+        mean = total / w
+        var = np.maximum(total_sq - total * mean, 0.0) / (w - 1)
+        var[(var == 0) | ~np.isfinite(var)] = 1.0
+        return NormalInverseGammaPrior(mu0=mean, kappa0=1.0, alpha0=1.0, beta0=var)
+
+    def window_probabilities(self, values, sums=None) -> np.ndarray:
+        """
+        Posterior tau distribution of every window.
+
+        Args:
+            values (array-like): The series.
+            sums (tuple, optional): Prefix sums (s, q) of the series minus any
+                constant (e.g. `PriceStore.prefix_sums`), reused instead of
+                recomputed.
+
+        Returns:
+            np.ndarray: (n_windows, width) array; row i is p(tau | window i),
+                with tau = width - 1 meaning no change inside the window.
+        """
+        values = np.asarray(values, dtype=float)
+        if np.isnan(values).any():
+            raise ValueError("Input data contains NaNs. Please clean the data first.")
+        if sums is not None:
+            s, q = sums[0], sums[1]
+        else:
+            # Centring keeps the differences of large cumulative sums well conditioned
+            s, q = prefix_sums(values - values.mean() if len(values) else values)
+        starts = self.window_starts(len(values))
+        probs = np.empty((len(starts), self.width))
+        for lo in range(0, len(starts), self.chunk_size):
+            chunk = starts[lo:lo + self.chunk_size]
+            log_marginal = window_log_marginals(s, q, chunk, self.width, self._window_prior(s, q, chunk))
+            probs[lo:lo + len(chunk)] = np.exp(log_marginal - logsumexp(log_marginal, axis=1, keepdims=True))
+        return probs
+
+    def run(self, values, dates=None, sums=None) -> pd.DataFrame:
+        """
+        Scans the series and aggregates the windows per position.
+
+        Args:
+            values (array-like): The series, in date order.
+            dates (array-like, optional): Date of each position, added as a Date column.
+            sums (tuple, optional): Precomputed prefix sums, as in `window_probabilities`.
+
+        Returns:
+            pd.DataFrame: One row per position with change_probability (mean
+                probability that a new regime starts there over the covering
+                windows), max_probability and windows (how many windows
+                could place a break there; 0 gives NaN probabilities).
+        """
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        with span("model.window_scan", n=n, width=self.width, stride=self.stride) as attrs:
+            probs = self.window_probabilities(values, sums)
+            starts = self.window_starts(n)
+            attrs["windows"] = len(starts)
+
+            # tau is the last index of the first regime, so the break is at start + tau + 1;
+            # the final column (no change in the window) doesn't place a break anywhere
+            breaks = probs[:, :-1]
+            position = (starts[:, None] + np.arange(1, self.width)).ravel()
+            total = np.bincount(position, weights=breaks.ravel(), minlength=n)[:n]
+            peak = np.zeros(n)
+            np.maximum.at(peak, position, breaks.ravel())
+            coverage = np.zeros(n + 1, dtype=np.int64)
+            np.add.at(coverage, starts + 1, 1)
+            np.add.at(coverage, np.minimum(starts + self.width, n), -1)
+            coverage = np.cumsum(coverage)[:n]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(coverage > 0, total / coverage, np.nan)
+        result = pd.DataFrame({
+            "change_probability": mean,
+            "max_probability": np.where(coverage > 0, peak, np.nan),
+            "windows": coverage,
+        })
+        if dates is not None:
+            result.insert(0, "Date", pd.to_datetime(np.asarray(dates)))
+        logger.info(f"Scanned {len(starts)} windows of {self.width} observations (stride {self.stride}).")
+        return result
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Histogram upper bounds in milliseconds (the last bucket catches everything else)
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000)
+
+class MetricsRegistry:
+    """
+    Lightweight, thread-safe timing spans, latency histograms and gauges.
+
+    Every finished span is added to the histogram of its name, logged at DEBUG
+    level and, if a JSON-lines path is configured, appended as one structured
+    record (timestamp, span name, duration and attributes).
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS, jsonl_path: Optional[str] = None):
+        self.buckets = tuple(buckets)
+        self.jsonl_path = jsonl_path
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def configure_jsonl(self, path: Optional[str]):
+        """
+        Sets (or clears, with None) the file that span records are appended to.
+        """
+        self.jsonl_path = path
+
+    def observe(self, name: str, duration_ms: float):
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = {"count": 0, "sum_ms": 0.0, "min_ms": float("inf"), "max_ms": 0.0,
+                        "buckets": [0] * (len(self.buckets) + 1)}
+                self._histograms[name] = hist
+            hist["count"] += 1
+            hist["sum_ms"] += duration_ms
+            hist["min_ms"] = min(hist["min_ms"], duration_ms)
+            hist["max_ms"] = max(hist["max_ms"], duration_ms)
+            hist["buckets"][bisect.bisect_left(self.buckets, duration_ms)] += 1
+
+    def set_gauge(self, name: str, value: float, **attrs):
+        """
+        Records the latest value of a measurement (e.g. draws per second).
+        """
+        with self._lock:
+            self._gauges[name] = {"value": value, "time": time.time(), **attrs}
+        self._emit({"gauge": name, "value": value, **attrs})
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Times the enclosed block. Yields the attribute dict so the block can add
+        details (row counts, cache hits) that are exported with the record.
+        """
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield attrs
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.observe(name, duration_ms)
+            if failed:
+                attrs["error"] = True
+            logger.debug(f"{name} took {duration_ms:.1f} ms {attrs if attrs else ''}")
+            self._emit({"span": name, "duration_ms": round(duration_ms, 3), **attrs})
+
+    def _emit(self, record: dict):
+        if not self.jsonl_path:
+            return
+        record = {"ts": time.time(), "pid": os.getpid(), **record}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.jsonl_path, "a") as f:
+                f.write(line + "\n")
+
+    def snapshot(self) -> dict:
+        """
+        Current histograms (with bucket bounds and mean) and gauges, JSON-ready.
+        """
+        with self._lock:
+            histograms = {}
+            for name, hist in self._histograms.items():
+                bounds = [str(b) for b in self.buckets] + ["+Inf"]
+                histograms[name] = {
+                    "count": hist["count"],
+                    "sum_ms": round(hist["sum_ms"], 3),
+                    "mean_ms": round(hist["sum_ms"] / hist["count"], 3),
+                    "min_ms": round(hist["min_ms"], 3),
+                    "max_ms": round(hist["max_ms"], 3),
+                    "buckets_ms": dict(zip(bounds, hist["buckets"])),
+                }
+            return {"histograms": histograms, "gauges": {k: dict(v) for k, v in self._gauges.items()}}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._gauges.clear()
+
+metrics = MetricsRegistry(jsonl_path=os.environ.get("BRENT_METRICS_JSONL"))
+
+def span(name: str, **attrs):
+    """
+    Times a block with the process-wide registry.
+    """
+    return metrics.span(name, **attrs)
+
+def timed(name: str):
+    """
+    Decorator that wraps every call of a function in a span.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
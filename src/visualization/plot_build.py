@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import inspect
+import hashlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from src.analysis.downsample import lttb_indices
+from src.utils.logger import setup_logger
+from src.utils.metrics import metrics, span
+
+logger = setup_logger(__name__)
+
+DEFAULT_MANIFEST = os.path.join("data", "processed", "plot_manifest.json")
+
+@dataclass
+class FigureSpec:
+    """
+    One output figure: a module-level render function (so worker processes
+    can import it) and the inputs it draws. The render function receives the
+    inputs plus `figsize` and `max_points` (the output width in pixels) as
+    keyword arguments and returns the matplotlib Figure.
+    """
+    name: str
+    output: str
+    render: Callable
+    inputs: Dict = field(default_factory=dict)
+    figsize: Tuple[float, float] = (12, 6)
+    dpi: int = 300
+
+    @property
+    def max_points(self) -> int:
+        return int(self.figsize[0] * self.dpi)
+
+def decimate(x, y, max_points: int):
+    """
+    Reduces a line series to about `max_points` points with LTTB, which
+    keeps the peaks and troughs a full-resolution plot would show.
+
+    Leading and trailing NaNs (e.g. the warm-up of a rolling window) are
+    dropped. Interior gaps are kept as one NaN point each, so the line still
+    breaks there; the runs between them share the budget by length.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    present = np.flatnonzero(~np.isnan(y))
+    if len(present) == 0:
+        return x[:0], y[:0]
+    x, y = x[present[0]:present[-1] + 1], y[present[0]:present[-1] + 1]
+    if len(y) <= max_points:
+        return x, y
+    x_num = x.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+
+    # Boundaries between runs of values and runs of NaNs; runs alternate, starting with values
+    valid = ~np.isnan(y)
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(valid)) + 1, [len(y)]))
+    gaps = bounds[1:-1:2]
+    budget = max_points - len(gaps)
+    pieces = [gaps]
+    for start, stop in zip(bounds[:-1:2], bounds[1::2]):
+        run_points = max(2, budget * (stop - start) // int(valid.sum()))
+        pieces.append(start + lttb_indices(x_num[start:stop], y[start:stop], run_points))
+    idx = np.sort(np.concatenate(pieces))
+    return x[idx], y[idx]
+
+def fingerprint(spec: FigureSpec) -> str:
+    """
+    Hash of everything that determines a figure: render function (its name,
+    its source and the source of its module, which holds the helpers it
+    calls), inputs, size and resolution, and the matplotlib version.
+    """
+    import matplotlib
+
+    digest = hashlib.sha256()
+    digest.update(f"{spec.render.__module__}.{spec.render.__qualname__}".encode())
+    digest.update(_source(spec.render))
+    digest.update(_source(inspect.getmodule(spec.render)))
+    digest.update(json.dumps([spec.figsize, spec.dpi, matplotlib.__version__]).encode())
+    for key in sorted(spec.inputs):
+        digest.update(key.encode())
+        _update_digest(digest, spec.inputs[key])
+    return digest.hexdigest()
+
+def _source(obj) -> bytes:
+    # Falls back to the bytecode for functions without source (e.g. defined in a REPL)
+    try:
+        return inspect.getsource(obj).encode()
+    except (OSError, TypeError):
+        code = getattr(obj, "__code__", None)
+        return code.co_code if code is not None else b""
+
+def _update_digest(digest, value):
+    if isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode())
+            _update_digest(digest, value[key])
+    elif isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        array = np.ascontiguousarray(np.asarray(value))
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.tobytes() if array.dtype != object else json.dumps(array.tolist(), default=str).encode())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+def _use_agg():
+    # Pool initializer: workers render on the non-interactive backend. The
+    # in-process path leaves the caller's backend alone (figures are closed
+    # without being shown either way).
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _render(spec: FigureSpec) -> float:
+    import matplotlib.pyplot as plt
+
+    started = time.perf_counter()
+    fig = spec.render(**spec.inputs, figsize=spec.figsize, max_points=spec.max_points)
+    try:
+        os.makedirs(os.path.dirname(spec.output) or ".", exist_ok=True)
+        fig.savefig(spec.output + ".tmp.png", dpi=spec.dpi, bbox_inches='tight')
+        os.replace(spec.output + ".tmp.png", spec.output)
+    finally:
+        plt.close(fig)
+    return (time.perf_counter() - started) * 1000
+
+class PlotBuilder:
+    """
+    Incremental figure build stage.
+
+    Each figure's inputs are fingerprinted and compared with the manifest of
+    the previous build, so unchanged figures whose output file still exists
+    are skipped. The remaining figures render in a process pool on the Agg
+    backend (or in-process on the current backend), each figure closed as
+    soon as it is saved.
+    """
+    def __init__(self, manifest_path: str = DEFAULT_MANIFEST, max_workers: Optional[int] = None):
+        """
+        Args:
+            manifest_path (str): JSON file mapping outputs to fingerprints.
+            max_workers (int, optional): Pool size, defaults to the CPU count.
+                With one worker (or one stale figure) rendering runs in-process.
+        """
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def _read_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable plot manifest: {e}")
+            return {}
+
+    def _write_manifest(self, manifest: dict):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        with open(self.manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+    def build(self, specs: List[FigureSpec], force: bool = False) -> Dict[str, str]:
+        """
+        Renders the figures whose inputs changed.
+
+        Returns:
+            dict: Figure name -> "rendered" or "cached".
+        """
+        with span("plot.build", figures=len(specs)) as attrs:
+            manifest = self._read_manifest()
+            fingerprints = {spec.name: fingerprint(spec) for spec in specs}
+            stale = [spec for spec in specs
+                     if force or not os.path.exists(spec.output)
+                     or manifest.get(os.path.abspath(spec.output)) != fingerprints[spec.name]]
+
+            if len(stale) > 1 and self.max_workers > 1:
+                workers = min(self.max_workers, len(stale))
+                with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+                    durations = list(pool.map(_render, stale))
+            else:
+                durations = [_render(spec) for spec in stale]
+
+            for spec, duration_ms in zip(stale, durations):
+                metrics.observe("plot.render", duration_ms)
+                manifest[os.path.abspath(spec.output)] = fingerprints[spec.name]
+            if stale:
+                self._write_manifest(manifest)
+
+            rendered = {spec.name for spec in stale}
+            attrs.update(rendered=len(rendered), cached=len(specs) - len(rendered))
+            logger.info(f"Plot build: {len(rendered)} rendered, {len(specs) - len(rendered)} unchanged.")
+            return {spec.name: "rendered" if spec.name in rendered else "cached" for spec in specs}
@@ -1,9 +1,12 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
-import arviz as az
+from src.analysis.rolling import get_rolling_engine
+from src.utils.metrics import timed
 
+@timed("plot.price_series")
 def plot_price_series(df: pd.DataFrame, title: str = "Brent Oil Prices"):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(12, 6))
     sns.lineplot(data=df, x='Date', y='Price')
     plt.title(title)
@@ -12,10 +15,14 @@ def plot_price_series(df: pd.DataFrame, title: str = "Brent Oil Prices"):
     plt.grid(True)
     plt.show()
 
+@timed("plot.trend")
 def plot_trend(df: pd.DataFrame, window: int = 252):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     plt.plot(df['Date'], df['Price'], label='Raw Price', alpha=0.5)
-    plt.plot(df['Date'], df['Price'].rolling(window=window).mean(), label=f'{window}-day Moving Average', color='red')
+    trend = get_rolling_engine(df['Price'].values).rolling_mean(window)
+    plt.plot(df['Date'], trend, label=f'{window}-day Moving Average', color='red')
     plt.title("Brent Oil Price Trend Analysis")
     plt.xlabel("Date")
     plt.ylabel("Price (USD/Barrel)")
@@ -23,7 +30,10 @@ def plot_trend(df: pd.DataFrame, window: int = 252):
     plt.grid(True)
     plt.show()
 
+@timed("plot.returns")
 def plot_returns(df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
     plt.plot(df['Date'], df['Price'].pct_change(), label='Daily Returns', color='green')
     plt.title("Brent Oil Daily Returns (Check for Stationarity)")
@@ -32,9 +42,11 @@ def plot_returns(df: pd.DataFrame):
     plt.grid(True)
     plt.show()
 
+@timed("plot.volatility")
 def plot_volatility(df: pd.DataFrame, window: int = 21):
-    returns = df['Price'].pct_change()
-    volatility = returns.rolling(window=window).std() * (252**0.5)
+    import matplotlib.pyplot as plt
+
+    volatility = get_rolling_engine(df['Price'].values).volatility(window)
     plt.figure(figsize=(12, 6))
     plt.plot(df['Date'], volatility, label='Annualized Volatility', color='orange')
     plt.title(f"Brent Oil price Volatility ({window}-day rolling)")
@@ -43,11 +55,15 @@ def plot_volatility(df: pd.DataFrame, window: int = 21):
     plt.grid(True)
     plt.show()
 
+@timed("plot.changepoint_results")
 def plot_changepoint_results(trace, data: pd.Series):
     """
     Plots the posterior distribution of the change point 'tau'
     and the means mu_1, mu_2.
     """
+    import arviz as az
+    import matplotlib.pyplot as plt
+
     # Plotting tau
     az.plot_posterior(trace, var_names=["tau"])
     plt.title("Posterior Distribution of Change Point (Index)")
@@ -56,3 +72,25 @@ def plot_changepoint_results(trace, data: pd.Series):
     # Plotting means
     az.plot_posterior(trace, var_names=["mu_1", "mu_2"])
     plt.show()
+
+@timed("plot.change_probability")
+def plot_change_probability(df: pd.DataFrame, scan: pd.DataFrame, title: str = "Sliding-Window Change Probability"):
+    """
+    Plots prices above the per-date change probability of a
+    ChangeProbabilityScan (with a Date column).
+    """
+    import matplotlib.pyplot as plt
+
+    fig, (ax_price, ax_prob) = plt.subplots(2, 1, figsize=(12, 7), sharex=True,
+                                            gridspec_kw={"height_ratios": [2, 1]})
+    ax_price.plot(df['Date'], df['Price'], color='black', alpha=0.6, linewidth=0.8)
+    ax_price.set_ylabel("Price (USD/Barrel)")
+    ax_price.set_title(title)
+
+    probability = scan['change_probability'].fillna(0.0).values
+    ax_prob.fill_between(scan['Date'], 0, probability, color='#c0392b', alpha=0.7, linewidth=0)
+    ax_prob.set_ylim(0, 1)
+    ax_prob.set_ylabel("P(break at date)")
+    ax_prob.set_xlabel("Date")
+    plt.tight_layout()
+    plt.show()
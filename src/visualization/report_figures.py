@@ -0,0 +1,70 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from src.visualization.plot_build import decimate
+
+# Render functions for PlotBuilder. Each draws one figure from plain arrays,
+# decimating line data to `max_points` (the output width in pixels), and
+# returns the figure; the builder saves and closes it.
+
+def _new_figure(figsize, style="whitegrid"):
+    # Styles are global rcParams, so every figure sets its own (None = matplotlib defaults)
+    if style is None:
+        plt.rcdefaults()
+    else:
+        import seaborn as sns
+        sns.set_theme(style=style)
+    return plt.figure(figsize=figsize)
+
+def trend_figure(dates, prices, trend, figsize=(12, 6), max_points=3600):
+    fig = _new_figure(figsize)
+    plt.plot(*decimate(dates, prices, max_points), color='#2c3e50', alpha=0.5, label='Daily Price')
+    plt.plot(*decimate(dates, trend, max_points), color='#e74c3c', linewidth=2, label='1-Year Rolling Mean (Trend)')
+    plt.title("Brent Oil Price Trend Analysis (1987-2022)", fontsize=14, fontweight='bold')
+    plt.xlabel("Year")
+    plt.ylabel("Price (USD/Barrel)")
+    plt.legend()
+    return fig
+
+def returns_figure(dates, returns, figsize=(12, 6), max_points=3600):
+    fig = _new_figure(figsize)
+    plt.plot(*decimate(dates, returns, max_points), color='#27ae60', linewidth=0.5, alpha=0.7)
+    plt.title("Brent Oil Daily Percentage Returns", fontsize=14, fontweight='bold')
+    plt.xlabel("Year")
+    plt.ylabel("Return")
+    return fig
+
+def volatility_figure(dates, volatility, window=21, figsize=(12, 6), max_points=3600):
+    fig = _new_figure(figsize)
+    x, y = decimate(dates, volatility, max_points)
+    plt.fill_between(x, 0, y, color='#f39c12', alpha=0.6)
+    plt.plot(x, y, color='#d35400', linewidth=1)
+    plt.title(f"Brent Oil Annualized Volatility ({window}-Day Rolling)", fontsize=14, fontweight='bold')
+    plt.xlabel("Year")
+    plt.ylabel("Annualized Volatility")
+    return fig
+
+def log_returns_figure(dates, log_returns, figsize=(12, 5), max_points=3600):
+    fig = _new_figure(figsize, style=None)
+    plt.plot(*decimate(dates, log_returns, max_points), color='skyblue', alpha=0.6)
+    plt.title("Brent Oil Daily Log Returns (1987-2022)")
+    plt.ylabel("Log Change")
+    return fig
+
+def trace_figure(posterior, figsize=(12, 8), max_points=3600):
+    """
+    Trace plot of posterior draws given as {name: (chain, draw) array}.
+    """
+    import arviz as az
+
+    plt.rcdefaults()
+    axes = az.plot_trace(az.from_dict(posterior={k: np.asarray(v) for k, v in posterior.items()}),
+                         figsize=figsize)
+    return np.ravel(axes)[0].figure
+
+def change_point_figure(dates, prices, change_date, label, figsize=(10, 6), max_points=3000):
+    fig = _new_figure(figsize, style=None)
+    plt.plot(*decimate(dates, prices, max_points), label='Oil Price', color='black', alpha=0.3)
+    plt.axvline(x=np.datetime64(change_date), color='red', linestyle='--', label=label)
+    plt.title("Detected Regime Shift Over Price Data")
+    plt.legend()
+    return fig
@@ -0,0 +1,99 @@
+import os
+import sys
+import gzip
+import json
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    import app as backend
+
+    tmp = tmp_path_factory.mktemp("api")
+    dates = pd.date_range("2020-01-01", periods=400, freq="D")
+    pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Price": [50.0 + (i % 37) / 4 for i in range(400)]}).to_csv(
+        tmp / "prices.csv", index=False)
+    backend.price_store = backend.PriceStore(str(tmp / "prices.csv"), snapshot_dir=str(tmp / "snapshots"))
+    backend.INFERENCE_CACHE_DIR = str(tmp / "inference_cache")
+    return backend.app.test_client()
+
+def test_prices_formats_agree(client):
+    records = client.get("/api/prices?start_date=2020-02-01&end_date=2020-02-10").get_json()
+    columns = client.get("/api/prices?start_date=2020-02-01&end_date=2020-02-10&format=columns").get_json()
+    assert len(records) == 10
+    assert records == [{"Date": d, "Price": p} for d, p in zip(columns["dates"], columns["prices"])]
+
+    lines = client.get("/api/prices?start_date=2020-02-01&end_date=2020-02-10&format=ndjson").get_data().splitlines()
+    assert [json.loads(line) for line in lines] == records
+    assert client.get("/api/prices?format=xml").status_code == 400
+
+def test_prices_gzip(client):
+    response = client.get("/api/prices?format=columns", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(response.data))["dates"]) == 400
+
+    stream = client.get("/api/prices?format=ndjson", headers={"Accept-Encoding": "gzip"})
+    assert len(gzip.decompress(stream.data).splitlines()) == 400
+
+    # Small bodies are sent as they are
+    small = client.get("/api/prices?start_date=2020-01-01&end_date=2020-01-02", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+def test_prices_etag(client):
+    first = client.get("/api/prices?format=columns&max_points=50")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+
+    cached = client.get("/api/prices?format=columns&max_points=50", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.data == b""
+    # A different query (or data version) has a different tag
+    other = client.get("/api/prices?format=columns&max_points=60", headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["ETag"] != etag
+
+def test_change_probability_downsampling_and_etag(client):
+    records = client.get("/api/change_probability?width=30&stride=5").get_json()
+    assert len(records) == 400
+    columns = client.get("/api/change_probability?width=30&stride=5&format=columns").get_json()
+    assert records == [{"Date": d, "Probability": p, "Windows": w}
+                       for d, p, w in zip(columns["dates"], columns["probabilities"], columns["windows"])]
+
+    small = client.get("/api/change_probability?width=30&stride=5&format=columns&max_points=500&chart_width=80")
+    reduced = small.get_json()
+    assert len(reduced["dates"]) <= 80 and set(reduced["dates"]) <= set(columns["dates"])
+    peak = max(p for p in columns["probabilities"] if p is not None)
+    assert peak in reduced["probabilities"]
+
+    cached = client.get("/api/change_probability?width=30&stride=5&format=columns&max_points=500&chart_width=80",
+                        headers={"If-None-Match": small.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get("/api/change_probability?format=ndjson").status_code == 400
+
+def test_shared_store_serves_the_same_data(client, tmp_path, monkeypatch):
+    import app as backend
+
+    plain = {route: client.get(route).get_json() for route in
+             ("/api/stats", "/api/prices?format=columns&max_points=50", "/api/change_probability?max_points=50",
+              "/api/change_probability?width=30&stride=5")}
+    monkeypatch.setattr(backend, "price_store", backend.SharedPriceStore(
+        backend.price_store.file_path, shared_dir=str(tmp_path / "shared"), snapshot_dir=None))
+    # Same file version, so clear the per-version caches filled from the plain store
+    for cached in (backend.detected_change_points, backend.downsampled_range, backend.prices_payload,
+                   backend.change_probability_scan, backend.change_probability_payload):
+        cached.cache_clear()
+    for route, expected in plain.items():
+        assert client.get(route).get_json() == expected
+    # The default scan and the change points kept by downsampling were published next to the
+    # arrays; other scan parameters stay in the worker
+    published = os.listdir(backend.price_store._path)
+    assert "change_probability_250_1.npy" in published and "change_points.npy" in published
+    assert "change_probability_30_5.npy" not in published
+
+def test_analysis_window(client):
+    result = client.get("/api/analysis?start_date=2020-02-01&end_date=2020-03-31").get_json()
+    assert result["change_point_date"] == str((pd.Timestamp("2020-02-01") + pd.Timedelta(days=result["tau"])).date())
+    assert {"mu_1", "mu_2", "sigma"} <= {row["parameter"] for row in result["summary"]}
+
+    bad = client.get("/api/analysis?start_date=01/02/2020")
+    assert bad.status_code == 400 and "YYYY-MM-DD" in bad.get_json()["error"]
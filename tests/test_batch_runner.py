@@ -0,0 +1,30 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.analysis.batch_runner import BatchRunner, yearly_windows, rolling_windows, event_windows
+
+def _synthetic_prices():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2000-01-03", periods=780)
+    prices = np.concatenate([rng.normal(50, 1, 390), rng.normal(60, 1, 390)])
+    return pd.DataFrame({"Date": dates, "Price": prices})
+
+def test_window_generators():
+    df = _synthetic_prices()
+    assert [w["window"] for w in yearly_windows(df["Date"])] == ["2000", "2001", "2002"]
+    assert len(rolling_windows(df["Date"], width_days=365, step_days=365)) == 2
+    events = pd.DataFrame({"Date": ["2001-06-01"], "Event": ["Shock"]})
+    assert event_windows(events, 30, 30)[0]["start"] == "2001-05-02"
+
+def test_batch_runner_exact_engine():
+    df = _synthetic_prices()
+    runner = BatchRunner(df, engine="exact", max_workers=1, draws=200)
+    results = runner.run(yearly_windows(df["Date"]))
+
+    assert list(results["window"]) == ["2000", "2001", "2002"]
+    assert results["error"].isna().all()
+    assert results.loc[1, "pct_change"] > 15
+
+def test_batch_runner_invalid_engine():
+    with pytest.raises(ValueError, match="Unknown engine"):
+        BatchRunner(_synthetic_prices(), engine="gibbs")
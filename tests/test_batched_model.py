@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.models.batched_change_point import BatchedChangePointModel
+from src.models.change_point_model import MarginalizedChangePointModel
+
+def test_batched_model_pads_and_validates():
+    padded = np.array([[1.0, 2.0, 3.0, np.nan], [4.0, 5.0, 6.0, 7.0]])
+    model = BatchedChangePointModel(padded, names=["a", "b"])
+    np.testing.assert_array_equal(model.lengths, [3, 4])
+    assert model.mask.sum() == 7
+
+    with pytest.raises(ValueError, match="contains NaN"):
+        BatchedChangePointModel([np.array([1.0, np.nan, 2.0])])
+    with pytest.raises(ValueError, match="names"):
+        BatchedChangePointModel([[1.0, 2.0], [3.0, 4.0]], names=["a", "a"])
+    with pytest.raises(ValueError, match="Unknown pooling"):
+        BatchedChangePointModel([[1.0, 2.0]], pooling="full")
+
+def test_batched_tau_draws_match_the_marginalized_model():
+    rng = np.random.default_rng(6)
+    x = np.concatenate([rng.normal(0, 1, 40), rng.normal(2, 1, 30)])
+    mu_1, mu_2, sigma = rng.normal(0, 0.1, (2, 300)), rng.normal(2, 0.1, (2, 300)), np.ones((2, 300))
+    single = MarginalizedChangePointModel(pd.Series(x))._draw_tau(mu_1, mu_2, sigma, random_seed=1)
+    batched = BatchedChangePointModel([x])
+    assert batched.engine == "mcmc" and batched.model is None and batched.posterior_summary is None
+    tau = batched._draw_tau(mu_1[..., None], mu_2[..., None], sigma[..., None], random_seed=1)
+    np.testing.assert_array_equal(tau[..., 0], single)
+
+@pytest.mark.parametrize("pooling", ["none", "partial"])
+def test_batched_model_recovers_each_change_point(pooling):
+    rng = np.random.default_rng(5)
+    lengths, changes = [80, 120, 100], [30, 90, 49]
+    series = [pd.Series(np.concatenate([rng.normal(10 * i, 1, c + 1), rng.normal(10 * i + 4, 1, n - c - 1)]))
+              for i, (n, c) in enumerate(zip(lengths, changes))]
+    model = BatchedChangePointModel(series, names=["wti", "brent", "dubai"], pooling=pooling)
+    model.run_inference(draws=300, tune=300, chains=2, cores=1, random_seed=0)
+
+    fits = model.per_series()
+    assert list(fits["series"]) == ["wti", "brent", "dubai"]
+    assert np.all(np.abs(fits["tau"].values - changes) <= 2)
+    assert np.all(np.abs(fits["mu_2"] - fits["mu_1"] - 4) < 1)
+    assert model.trace.posterior["tau"].dims == ("chain", "draw", "series")
@@ -0,0 +1,20 @@
+import numpy as np
+from src.analysis.downsample import lttb_indices, nearest_indices
+
+def test_lttb_keeps_extremes_and_required_points():
+    rng = np.random.default_rng(0)
+    x = np.arange(5000, dtype=float)
+    y = np.cumsum(rng.normal(size=5000))
+    idx = lttb_indices(x, y, 300, keep=np.array([123, 4321]))
+
+    assert len(idx) == 300
+    assert np.all(np.diff(idx) > 0)
+    assert {0, 4999, 123, 4321}.issubset(idx)
+    assert np.argmax(y) in idx and np.argmin(y) in idx
+
+def test_lttb_returns_everything_when_small():
+    np.testing.assert_array_equal(lttb_indices(np.arange(10), np.arange(10), 50), np.arange(10))
+
+def test_nearest_indices():
+    values = np.array([0, 10, 20])
+    np.testing.assert_array_equal(nearest_indices(values, np.array([-5, 4, 6, 19, 99])), [0, 0, 1, 2, 2])
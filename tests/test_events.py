@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from src.analysis.events import EventIndex, load_event_index, tau_probabilities
+
+def make_index():
+    # Deliberately unsorted to check the index sorts its arrays
+    return EventIndex(["2008-09-15", "2001-09-11", "2008-07-11", "2020-03-09"],
+                      ["Lehman", "9/11", "Peak", "Price war"])
+
+def brute_force_match(index, change_dates, before, after):
+    rows = []
+    for d in pd.to_datetime(change_dates):
+        for e, label in zip(pd.to_datetime(index.dates), index.labels):
+            if d - pd.Timedelta(days=before) <= e <= d + pd.Timedelta(days=after):
+                rows.append((d, e, label))
+    return rows
+
+def test_match_agrees_with_scan_for_asymmetric_windows():
+    index = make_index()
+    rng = np.random.default_rng(0)
+    change_dates = pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 8000, 300), unit="D")
+    matches = index.match(change_dates, days_before=60, days_after=10)
+
+    got = list(zip(matches["Change_Date"], matches["Event_Date"], matches["Event"]))
+    assert got == brute_force_match(index, change_dates, 60, 10)
+    assert (matches["Offset_Days"] == (matches["Event_Date"] - matches["Change_Date"]).dt.days).all()
+    expected_counts = [len(brute_force_match(index, [d], 60, 10)) for d in change_dates]
+    np.testing.assert_array_equal(index.counts(change_dates, 60, 10), expected_counts)
+
+def test_nearest_event_and_distance():
+    index = make_index()
+    nearest = index.nearest(["2008-08-01", "1990-01-01", "2021-01-01"])
+    assert nearest["Event"].tolist() == ["Peak", "9/11", "Price war"]
+    assert nearest["Offset_Days"].tolist() == [-21, 4271, -298]
+
+    empty = EventIndex([], []).nearest(["2008-08-01"])
+    assert empty["Event_Date"].isna().all()
+
+def test_event_probabilities_use_full_tau_distribution():
+    index = make_index()
+    dates = pd.date_range("2008-06-01", periods=150, freq="D")
+    tau = np.concatenate([np.full(300, 40), np.full(700, 110)])  # 2008-07-11 and 2008-09-19
+    probs = tau_probabilities(tau, len(dates))
+    assert np.isclose(probs.sum(), 1.0)
+
+    result = index.event_probabilities(dates, probs, days_before=5, days_after=5).set_index("Event")
+    assert np.isclose(result.loc["Lehman", "Probability"], 0.7)
+    assert np.isclose(result.loc["Peak", "Probability"], 0.3)
+    assert result.loc["9/11", "Probability"] == 0.0
+
+def test_load_event_index_reloads_when_file_changes(tmp_path):
+    path = tmp_path / "events.csv"
+    assert load_event_index(str(path)) is None
+    pd.DataFrame({"Date": ["2008-09-15"], "Event": ["Lehman"]}).to_csv(path, index=False)
+    first = load_event_index(str(path))
+    assert load_event_index(str(path)) is first
+
+    pd.DataFrame({"Date": ["2008-09-15", "2020-03-09"], "Event": ["Lehman", "Price war"]}).to_csv(path, index=False)
+    assert len(load_event_index(str(path))) == 2
@@ -0,0 +1,41 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Imported only when inference or plotting actually runs
+HEAVY_MODULES = ("pymc", "pytensor", "arviz", "matplotlib", "seaborn", "statsmodels", "numba")
+
+LIGHT_MODULES = [
+    "src.data.loader",
+    "src.data.price_store",
+    "src.models.change_point_model",
+    "src.models.batched_change_point",
+    "src.models.exact_change_point",
+    "src.models.online_detector",
+    "src.models.multi_change_point",
+    "src.models.inference_cache",
+    "src.analysis.batch_runner",
+    "src.analysis.jobs",
+    "src.analysis.events",
+    "src.analysis.rolling",
+    "src.visualization.plot_utils",
+    "src.visualization.plot_build",
+]
+
+def imported_heavy_modules(statement: str, cwd: str = ROOT_DIR):
+    code = (f"import sys; {statement}; import json; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR}
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_lightweight_modules_do_not_import_heavy_dependencies(module):
+    assert imported_heavy_modules(f"import {module}") == []
+
+def test_backend_starts_without_heavy_dependencies():
+    assert imported_heavy_modules("import app", cwd=os.path.join(ROOT_DIR, "backend")) == []
@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+import numpy as np
+from src.models.change_point_model import ChangePointModel
+from src.models.inference_cache import InferenceCache
+
+def _data():
+    rng = np.random.default_rng(0)
+    return pd.Series(np.concatenate([rng.normal(10, 1, 60), rng.normal(14, 1, 40)]))
+
+def test_cache_hit_skips_inference(tmp_path):
+    cache = InferenceCache(str(tmp_path))
+    first = ChangePointModel(_data(), engine="exact")
+    trace = first.run_inference(draws=100, random_seed=0, cache=cache)
+    assert first.summary is not None
+
+    second = ChangePointModel(_data(), engine="exact")
+    cached = second.run_inference(draws=100, random_seed=0, cache=cache)
+    assert second.exact_posterior is None  # Loaded, not recomputed
+    np.testing.assert_array_equal(cached.posterior["tau"].values, trace.posterior["tau"].values)
+    pd.testing.assert_frame_equal(second.summary, first.summary, check_exact=False)
+
+def test_cache_key_depends_on_data_and_config():
+    values = _data().values
+    key = InferenceCache.make_key(values, {"draws": 100})
+    assert key == InferenceCache.make_key(values.copy(), {"draws": 100})
+    assert key != InferenceCache.make_key(values, {"draws": 200})
+    assert key != InferenceCache.make_key(values[:-1], {"draws": 100})
+
+def test_cache_evicts_to_size_limit(tmp_path):
+    cache = InferenceCache(str(tmp_path), max_bytes=0)
+    ChangePointModel(_data(), engine="exact").run_inference(draws=50, cache=cache)
+    assert list(tmp_path.iterdir()) == []
+
+def test_unseeded_mcmc_bypasses_cache(tmp_path, monkeypatch):
+    import arviz as az
+
+    cache = InferenceCache(str(tmp_path))
+    runs = []
+
+    def fake_sample(self, draws, tune, random_seed, **kwargs):
+        runs.append(random_seed)
+        return az.from_dict(posterior={"mu_1": np.random.default_rng().normal(size=(1, draws))})
+    monkeypatch.setattr(ChangePointModel, "_sample", fake_sample)
+
+    for _ in range(2):
+        ChangePointModel(_data()).run_inference(draws=10, tune=10, random_seed=None, cache=cache)
+    assert runs == [None, None] and os.listdir(tmp_path) == []
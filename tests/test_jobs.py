@@ -0,0 +1,40 @@
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from src.analysis.jobs import JobManager, JobQueueFull
+
+def _task():
+    rng = np.random.default_rng(0)
+    return {
+        "window": "test", "start": None, "end": None,
+        "dates": pd.bdate_range("2000-01-03", periods=100).values,
+        "values": np.concatenate([rng.normal(10, 1, 50), rng.normal(15, 1, 50)]),
+        "engine": "exact", "sample_kwargs": {"draws": 100},
+    }
+
+def _wait(manager, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.1)
+    raise TimeoutError(job_id)
+
+def test_job_manager_runs_and_deduplicates():
+    manager = JobManager(max_workers=1, max_pending=1)
+    try:
+        first = manager.submit({"window": "test"}, _task())
+        second = manager.submit({"window": "test"}, _task())
+        assert second["deduplicated"] and second["job_id"] == first["job_id"]
+        if manager.status(first["job_id"])["status"] != "done":
+            with pytest.raises(JobQueueFull):
+                manager.submit({"window": "other"}, _task())
+
+        status = _wait(manager, first["job_id"])
+        assert status["status"] == "done"
+        assert abs(status["result"]["tau"] - 49) <= 2
+        assert manager.status("missing") is None
+    finally:
+        manager.shutdown()
@@ -1,7 +1,8 @@
 import pytest
+import numpy as np
 import pandas as pd
 import os
-from src.data.loader import DataLoader
+from src.data.loader import DataLoader, parse_dates
 
 def test_loader_file_not_found():
     loader = DataLoader("non_existent_file.csv")
@@ -34,3 +35,101 @@ def test_loader_valid_data(tmp_path):
     assert len(data) == 2
     assert pd.api.types.is_datetime64_any_dtype(data['Date'])
     assert pd.api.types.is_numeric_dtype(data['Price'])
+
+def test_loader_snapshots_are_opt_in(tmp_path, monkeypatch):
+    p = tmp_path / "prices.csv"
+    pd.DataFrame({"Date": ["20-May-87"], "Price": [18.63]}).to_csv(p, index=False)
+    monkeypatch.setattr(DataLoader, "_write_snapshot", lambda self, source_hash: pytest.fail("snapshot written"))
+    assert len(DataLoader(str(p)).load_data()) == 1
+
+def test_loader_snapshot_roundtrip(tmp_path):
+    p = tmp_path / "prices.csv"
+    pd.DataFrame({"Date": ["21-May-87", "20-May-87", "Nov 14, 2022"], "Price": [18.45, 18.63, 93.59]}).to_csv(p, index=False)
+    snapshots = tmp_path / "snapshots"
+
+    first = DataLoader(str(p), snapshot_dir=str(snapshots)).load_data()
+    assert len(list(snapshots.iterdir())) == 1
+    second = DataLoader(str(p), snapshot_dir=str(snapshots)).load_data()
+    pd.testing.assert_frame_equal(first, second)
+
+    # A changed source file is re-parsed and replaces the stale snapshot
+    pd.DataFrame({"Date": ["20-May-87"], "Price": [18.63]}).to_csv(p, index=False)
+    third = DataLoader(str(p), snapshot_dir=str(snapshots)).load_data()
+    assert len(third) == 1
+    assert len(list(snapshots.iterdir())) == 1
+
+def _append_lines(path, lines):
+    with open(path, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+def test_loader_parses_only_appended_rows(tmp_path):
+    p = tmp_path / "prices.csv"
+    pd.DataFrame({"Date": ["20-May-87", "21-May-87", "22-May-87"], "Price": [18.63, 18.45, 18.55]}).to_csv(p, index=False)
+    snapshots = str(tmp_path / "snapshots")
+    DataLoader(str(p), snapshot_dir=snapshots).load_data()
+
+    _append_lines(p, ["26-May-87,18.60", "bad,1.0", "27-May-87,18.63"])
+    loader = DataLoader(str(p), snapshot_dir=snapshots)
+    df = loader.load_data()
+    assert len(loader.appended) == 2 and loader.changed_from == 3
+    full = DataLoader(str(p), snapshot_dir=None).load_data()
+    pd.testing.assert_frame_equal(df, full)
+
+    # The merged data is the new snapshot
+    again = DataLoader(str(p), snapshot_dir=snapshots)
+    pd.testing.assert_frame_equal(again.load_data(), full)
+    assert again.appended is None
+
+def test_loader_merges_out_of_order_rows(tmp_path):
+    p = tmp_path / "prices.csv"
+    pd.DataFrame({"Date": ["2020-01-01", "2020-01-03", "2020-01-06"], "Price": [1.0, 3.0, 6.0]}).to_csv(p, index=False)
+    snapshots = str(tmp_path / "snapshots")
+    DataLoader(str(p), snapshot_dir=snapshots).load_data()
+
+    _append_lines(p, ["2020-01-07,7.0", "2020-01-02,2.0"])
+    loader = DataLoader(str(p), snapshot_dir=snapshots)
+    df = loader.load_data()
+    assert loader.changed_from == 1
+    assert df["Price"].tolist() == [1.0, 2.0, 3.0, 6.0, 7.0]
+    pd.testing.assert_frame_equal(df, DataLoader(str(p), snapshot_dir=None).load_data())
+
+def test_loader_append_rows_and_rewrites(tmp_path):
+    p = tmp_path / "prices.csv"
+    p.write_text("Date,Price\n2020-01-01,1.0")  # No trailing newline
+    snapshots = str(tmp_path / "snapshots")
+    loader = DataLoader(str(p), snapshot_dir=snapshots)
+    loader.load_data()
+
+    df = loader.append_rows(pd.DataFrame({"Date": ["2020-01-02", "nope"], "Price": [2.0, 5.0]}))
+    assert df["Price"].tolist() == [1.0, 2.0]
+    assert p.read_text().splitlines() == ["Date,Price", "2020-01-01,1.0", "2020-01-02,2.0"]
+
+    # An edit that is not an append falls back to a full parse
+    p.write_text("Date,Price\n2020-01-01,9.0\n2020-01-02,2.0\n2020-01-03,3.0\n")
+    loader = DataLoader(str(p), snapshot_dir=snapshots)
+    assert loader.load_data()["Price"].tolist() == [9.0, 2.0, 3.0]
+    assert loader.appended is None
+
+def test_parse_dates_matches_inference():
+    raw = np.array(["20-May-87", "1-Jun-87", "31-Dec-19", "Apr 22, 2020", "Nov 14, 2022", " Jan 2, 2000",
+                    "2022-11-15", "2022/11/16", "31-Feb-99", "bad", None], dtype=object)
+    expected = pd.to_datetime(pd.Series(raw), errors="coerce", format="mixed").values.astype("datetime64[s]")
+    parsed = parse_dates(raw)
+    assert parsed.dtype == np.dtype("datetime64[s]")
+    np.testing.assert_array_equal(parsed, expected)
+
+def test_loader_reports_rejected_rows(tmp_path):
+    p = tmp_path / "prices.csv"
+    p.write_text("Date,Price\n20-May-87,18.63\nbad,1.0\n22-May-87,abc\n,\nNov 14, 2022,93.59\n".replace(
+        "Nov 14, 2022", '"Nov 14, 2022"'))
+    snapshots = str(tmp_path / "snapshots")
+    loader = DataLoader(str(p), snapshot_dir=snapshots, price_dtype="float32")
+    df = loader.load_data()
+    assert df["Price"].dtype == np.float32 and len(df) == 2
+    assert loader.rejected["Row"].tolist() == [2, 3, 4]
+    assert loader.rejected["Reason"].tolist() == ["unparseable date", "invalid price", "missing date; missing price"]
+
+    # The report survives a snapshot hit
+    cached = DataLoader(str(p), snapshot_dir=snapshots)
+    assert cached.load_data()["Price"].dtype == np.float64
+    assert cached.rejected["Reason"].tolist() == loader.rejected["Reason"].tolist()
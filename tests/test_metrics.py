@@ -0,0 +1,65 @@
+import json
+import pytest
+from src.utils.metrics import MetricsRegistry
+
+def test_span_records_histogram_and_jsonl(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    registry = MetricsRegistry(buckets=(10, 100), jsonl_path=str(path))
+    with registry.span("data.load", path="x.csv") as attrs:
+        attrs["rows"] = 3
+    with pytest.raises(ValueError):
+        with registry.span("data.load"):
+            raise ValueError("boom")
+    registry.set_gauge("sampling.draws_per_sec", 123.0)
+
+    snap = registry.snapshot()
+    hist = snap["histograms"]["data.load"]
+    assert hist["count"] == 2
+    assert sum(hist["buckets_ms"].values()) == 2
+    assert snap["gauges"]["sampling.draws_per_sec"]["value"] == 123.0
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert records[0]["span"] == "data.load" and records[0]["rows"] == 3
+    assert records[1]["error"] is True
+    assert records[2]["gauge"] == "sampling.draws_per_sec"
+
+def test_sampling_timer_splits_sequential_chains(monkeypatch):
+    import itertools
+    from types import SimpleNamespace
+    import arviz as az
+    import numpy as np
+    from src.models import change_point_model
+
+    registry = MetricsRegistry()
+    # Patches time.perf_counter for everything, so the clock stays at 10 s once the draws are done
+    clock = itertools.chain([0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 5.5, 6.5, 7.5, 8.5, 9.5], itertools.repeat(10.0))
+    monkeypatch.setattr(change_point_model, "metrics", registry)
+    monkeypatch.setattr(change_point_model.time, "perf_counter", lambda: next(clock))
+
+    # cores=1: chain 0 tunes and samples, then chain 1 does (3 tuning + 2 kept draws each)
+    timer = change_point_model._SamplingTimer()
+    for chain in (0, 1):
+        for tuning in (True, True, True, False, False):
+            timer(None, SimpleNamespace(chain=chain, tuning=tuning))
+    trace = az.from_dict(posterior={"mu_1": np.random.default_rng(0).normal(size=(2, 50))})
+    timer.record(trace, chains_draws=4)
+
+    hist = registry.snapshot()["histograms"]
+    assert hist["model.compile"]["sum_ms"] == 1000.0
+    assert hist["model.tune"]["sum_ms"] == 4000.0      # 2 s per chain
+    assert hist["model.sampling"]["sum_ms"] == 4000.0  # 2 s per chain
+    assert registry.snapshot()["gauges"]["sampling.draws_per_sec"]["value"] == 1.0
+
+def test_sampling_timer_without_draws_records_nothing(monkeypatch):
+    import arviz as az
+    import numpy as np
+    from src.models import change_point_model
+
+    registry = MetricsRegistry()
+    monkeypatch.setattr(change_point_model, "metrics", registry)
+    # e.g. nutpie, which makes no callbacks
+    timer = change_point_model._SamplingTimer()
+    timer.record(az.from_dict(posterior={"mu_1": np.zeros((2, 50))}), chains_draws=100)
+    snap = registry.snapshot()
+    assert not {"model.compile", "model.tune", "model.sampling"} & set(snap["histograms"])
+    assert "sampling.draws_per_sec" not in snap["gauges"] and "sampling.ess_per_sec" not in snap["gauges"]
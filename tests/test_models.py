@@ -1,7 +1,9 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.models.change_point_model import ChangePointModel
+from src.models.change_point_model import ChangePointModel, MarginalizedChangePointModel
+from src.models.multi_change_point import MultiChangePointDetector
+from src.models.online_detector import OnlineChangePointDetector
 
 def test_model_invalid_input():
     # Empty series
@@ -30,3 +32,127 @@ def test_model_inference_failure_mode():
     model.build_model()
     # Not running full inference here as it takes time, but verifying construction
     assert model.model is not None
+
+def test_model_invalid_engine():
+    with pytest.raises(ValueError, match="Unknown engine"):
+        ChangePointModel(pd.Series([1.0, 2.0]), engine="gibbs")
+
+def test_exact_engine_recovers_change_point():
+    rng = np.random.default_rng(0)
+    data = pd.Series(np.concatenate([rng.normal(50, 1, 120), rng.normal(55, 1, 80)]))
+    model = ChangePointModel(data, engine="exact")
+    trace = model.run_inference(draws=200, random_seed=1)
+
+    post = model.exact_posterior
+    assert np.isclose(post.tau_probs.sum(), 1.0)
+    assert abs(post.tau_map - 119) <= 2
+    moments = post.moments()
+    assert abs(moments["mu_1"]["mean"] - 50) < 0.5
+    assert abs(moments["mu_2"]["mean"] - 55) < 0.5
+    assert trace.posterior["tau"].shape == (4, 200)
+    assert "exact_posterior" in trace.groups()
+
+def test_marginalized_model_reuses_graph_with_set_data():
+    model = MarginalizedChangePointModel(pd.Series(np.random.normal(0, 1, 50)))
+    model.build_model()
+    graph = model.model
+
+    new_window = pd.Series(np.random.normal(5, 2, 50))
+    model.set_data(new_window)
+    assert model.model is graph
+    np.testing.assert_allclose(model.model["obs_data"].get_value(), new_window.values)
+
+def test_marginalized_model_reuses_nuts_step_across_windows(monkeypatch):
+    import pymc as pm
+
+    built = []
+
+    class CountingNUTS(pm.NUTS):
+        def __init__(self, *args, **kwargs):
+            built.append(1)
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(pm, "NUTS", CountingNUTS)
+
+    rng = np.random.default_rng(5)
+    model = MarginalizedChangePointModel(pd.Series(np.concatenate([rng.normal(0, 1, 60), rng.normal(3, 1, 40)])))
+    model.run_inference(draws=200, tune=200, chains=1, random_seed=0)
+    model.set_data(pd.Series(np.concatenate([rng.normal(10, 1, 30), rng.normal(14, 1, 50)])))
+    trace = model.run_inference(draws=200, tune=200, chains=1, random_seed=0)
+    assert len(built) == 1
+    # The reused step reads the new window
+    assert abs(float(trace.posterior["mu_2"].mean()) - 14) < 0.5
+    assert trace.posterior["tau"].shape == (1, 200)
+
+def test_marginalized_model_tau_conditional():
+    data = pd.Series(np.concatenate([np.full(30, 1.0), np.full(20, 3.0)]) + np.random.normal(0, 0.1, 50))
+    model = MarginalizedChangePointModel(data)
+    ones = np.ones((2, 100))
+    tau = model._draw_tau(1.0 * ones, 3.0 * ones, 0.1 * ones, random_seed=0)
+    assert tau.shape == (2, 100)
+    assert np.all(tau == 29)
+
+def test_run_inference_rejects_unknown_backend():
+    model = MarginalizedChangePointModel(pd.Series(np.random.normal(0, 1, 50)))
+    with pytest.raises(ValueError, match="Unknown backend"):
+        model.run_inference(backend="stan")
+    with pytest.raises(ValueError, match="chains"):
+        model.run_inference(chains=0)
+
+def test_summarize_rejects_nutpie_backend():
+    model = MarginalizedChangePointModel(pd.Series(np.random.normal(0, 1, 50)))
+    with pytest.raises(ValueError, match="nutpie"):
+        model.run_inference(backend="nutpie", summarize=True, random_seed=0)
+
+def test_parallel_chains_stop_early_when_converged():
+    rng = np.random.default_rng(3)
+    data = pd.Series(np.concatenate([rng.normal(0, 1, 60), rng.normal(3, 1, 40)]))
+    model = MarginalizedChangePointModel(data)
+    trace = model.run_inference(draws=2000, tune=200, chains=2, cores=2, target_rhat=1.1,
+                                target_ess=50, check_every=50, random_seed=0)
+    assert trace.posterior.sizes["chain"] == 2
+    assert trace.posterior.sizes["draw"] < 2000
+    assert abs(float(trace.posterior["mu_2"].mean()) - 3) < 0.5
+
+def test_summarized_inference_keeps_no_trace(tmp_path):
+    rng = np.random.default_rng(4)
+    data = pd.Series(np.concatenate([rng.normal(0, 1, 60), rng.normal(3, 1, 40)]))
+    model = MarginalizedChangePointModel(data)
+    result = model.run_inference(draws=300, tune=200, chains=2, cores=1, random_seed=0, summarize=True,
+                                 trace_path=str(tmp_path / "trace.nc"))
+    assert model.trace is None
+    assert abs(result.tau_median - 59) <= 2
+    assert abs(model.summary.loc["mu_2", "mean"] - 3) < 0.5
+    assert model.summary.loc["mu_1", "r_hat"] < 1.05
+    assert (tmp_path / "trace.nc").exists()
+
+def test_pelt_finds_multiple_change_points():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(m, s, 300) for m, s in [(20, 1), (40, 3), (30, 1)]])
+    data = pd.Series(values, index=pd.bdate_range("2000-01-03", periods=len(values)))
+    detector = MultiChangePointDetector(model="meanvar", min_size=20).fit(data)
+
+    assert len(detector.change_points_) == 2
+    assert all(abs(cp - true) <= 3 for cp, true in zip(detector.change_points_, [300, 600]))
+    assert detector.change_dates()[0] == data.index[detector.change_points_[0]]
+    assert detector.segments()["length"].sum() == len(values)
+
+def test_pelt_invalid_configuration():
+    with pytest.raises(ValueError, match="Unknown cost model"):
+        MultiChangePointDetector(model="poisson")
+    with pytest.raises(ValueError, match="min_size"):
+        MultiChangePointDetector(min_size=0)
+
+def test_online_detector_flags_shift_and_restores(tmp_path):
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.normal(0, 1, 200), rng.normal(6, 1, 50)])
+    detector = OnlineChangePointDetector.from_warmup(values[:100], max_run_length=300)
+    probs = [detector.update(v)["change_probability"] for v in values[100:]]
+
+    assert max(probs[:95]) < 0.5
+    assert max(probs[100:105]) > 0.5
+    assert len(detector.run_lengths) <= 301
+
+    path = tmp_path / "state.npz"
+    detector.save(str(path))
+    restored = OnlineChangePointDetector.load(str(path))
+    assert restored.update(6.0) == detector.update(6.0)
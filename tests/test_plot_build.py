@@ -0,0 +1,76 @@
+import os
+import numpy as np
+import pandas as pd
+from src.visualization.plot_build import FigureSpec, PlotBuilder, decimate
+from src.visualization.report_figures import returns_figure, trend_figure
+
+def make_specs(tmp_path, prices):
+    dates = pd.date_range("2000-01-01", periods=len(prices), freq="D").values
+    returns = np.concatenate(([np.nan], prices[1:] / prices[:-1] - 1))
+    return [
+        FigureSpec("trend", str(tmp_path / "trend.png"), trend_figure,
+                   {"dates": dates, "prices": prices, "trend": prices}, figsize=(4, 3), dpi=50),
+        FigureSpec("returns", str(tmp_path / "returns.png"), returns_figure,
+                   {"dates": dates, "returns": returns}, figsize=(4, 3), dpi=50),
+    ]
+
+def test_decimate_keeps_extremes_and_gaps():
+    x = np.arange(10000)
+    y = np.sin(x / 50.0)
+    y[:10] = np.nan
+    y[5000:5200] = np.nan
+    dx, dy = decimate(x, y, 400)
+    assert len(dx) <= 400
+    assert dx[0] == 10 and dx[-1] == 9999  # Leading NaNs dropped
+    # The interior gap survives as a single NaN at its first position, so the line breaks there
+    assert dx[np.isnan(dy)].tolist() == [5000]
+    assert np.isclose(np.nanmax(dy), np.nanmax(y), atol=1e-3) and np.isclose(np.nanmin(dy), np.nanmin(y), atol=1e-3)
+
+def render_v1(values, figsize, max_points):
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=figsize)
+    plt.plot(values)
+    return fig
+
+def render_v2(values, figsize, max_points):
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=figsize)
+    plt.plot(values, color="red")
+    return fig
+
+def test_editing_a_render_function_rebuilds(tmp_path):
+    builder = PlotBuilder(manifest_path=str(tmp_path / "manifest.json"), max_workers=1)
+    spec = FigureSpec("line", str(tmp_path / "line.png"), render_v1, {"values": np.arange(5.0)}, figsize=(2, 2), dpi=30)
+    assert builder.build([spec]) == {"line": "rendered"}
+    assert builder.build([spec]) == {"line": "cached"}
+
+    # Same module and name, different body (as after editing the function)
+    render_v2.__name__, render_v2.__qualname__ = render_v1.__name__, render_v1.__qualname__
+    spec.render = render_v2
+    assert builder.build([spec]) == {"line": "rendered"}
+
+def test_in_process_build_keeps_backend(tmp_path):
+    import matplotlib
+    previous = matplotlib.get_backend()
+    matplotlib.use("pdf")  # Stands in for a caller's interactive backend
+    try:
+        builder = PlotBuilder(manifest_path=str(tmp_path / "manifest.json"), max_workers=1)
+        builder.build([FigureSpec("line", str(tmp_path / "line.png"), render_v1, {"values": np.arange(5.0)},
+                                  figsize=(2, 2), dpi=30)])
+        assert matplotlib.get_backend() == "pdf"
+        assert os.path.getsize(tmp_path / "line.png") > 0
+    finally:
+        matplotlib.use(previous)
+
+def test_build_skips_unchanged_figures(tmp_path):
+    prices = 50 + np.cumsum(np.random.default_rng(0).normal(size=3000))
+    builder = PlotBuilder(manifest_path=str(tmp_path / "manifest.json"), max_workers=2)
+
+    assert builder.build(make_specs(tmp_path, prices)) == {"trend": "rendered", "returns": "rendered"}
+    assert os.path.getsize(tmp_path / "trend.png") > 0
+    assert builder.build(make_specs(tmp_path, prices)) == {"trend": "cached", "returns": "cached"}
+
+    prices[-1] += 1.0
+    assert set(builder.build(make_specs(tmp_path, prices)).values()) == {"rendered"}
+    os.remove(tmp_path / "returns.png")
+    assert builder.build(make_specs(tmp_path, prices)) == {"trend": "cached", "returns": "rendered"}
@@ -0,0 +1,51 @@
+import numpy as np
+import arviz as az
+from src.models.posterior_summary import PosteriorAccumulator, QuantileSketch
+
+def test_quantile_sketch_is_accurate_in_bounded_memory():
+    values = np.random.default_rng(0).standard_normal(100_000)
+    sketch = QuantileSketch(capacity=256, seed=0)
+    sketch.update_many(values)
+
+    stored = sum(len(level) for level in sketch._levels)
+    assert stored < 256 * len(sketch._levels)
+    q = np.array([0.03, 0.25, 0.5, 0.75, 0.97])
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(q)) / len(values)
+    assert np.max(np.abs(ranks - q)) < 0.02
+
+    other = QuantileSketch(capacity=256, seed=1)
+    other.update_many(values + 10)
+    merged = sketch.merge(other)
+    assert merged.count == 200_000
+    assert abs(merged.quantile(0.5) - 5) < 5
+
+def test_accumulator_matches_batch_statistics():
+    rng = np.random.default_rng(1)
+    chains, draws = 4, 1000
+    # AR(1) chains so ESS is well below the number of draws
+    samples = np.empty((chains, draws, 2))
+    samples[:, 0] = rng.standard_normal((chains, 2))
+    for t in range(1, draws):
+        samples[:, t] = 0.8 * samples[:, t - 1] + 0.6 * rng.standard_normal((chains, 2))
+    samples[..., 1] = samples[..., 1] * 3 + 5
+
+    acc = PosteriorAccumulator(["a", "b"], chains, draws, tau_size=10, seed=0)
+    for t in range(draws):
+        for c in range(chains):
+            acc.update(c, samples[c, t])
+            acc.update_tau(index=t % 3)
+
+    np.testing.assert_allclose(acc.mean(), samples.reshape(-1, 2).mean(axis=0))
+    np.testing.assert_allclose(acc.sd(), samples.reshape(-1, 2).std(axis=0, ddof=1))
+    reference = az.summary(az.from_dict(posterior={"a": samples[..., 0], "b": samples[..., 1]}))
+    np.testing.assert_allclose(acc.rhat(), reference["r_hat"].values, atol=0.01)
+    np.testing.assert_allclose(acc.ess(), reference["ess_bulk"].values, rtol=0.35)
+
+    summary = acc.summary()
+    assert list(summary.columns) == ["mean", "sd", "hdi_3%", "hdi_97%", "ess_bulk", "r_hat"]
+    # HDI endpoints are ill-conditioned, so check the mass they cover instead
+    for j, name in enumerate(["a", "b"]):
+        inside = (samples[..., j] >= summary.loc[name, "hdi_3%"]) & (samples[..., j] <= summary.loc[name, "hdi_97%"])
+        assert abs(inside.mean() - 0.94) < 0.02
+    np.testing.assert_allclose(acc.tau_probabilities()[:3], 1 / 3, atol=1e-3)
+    assert acc.tau_median == 1 and abs(summary.loc["tau", "mean"] - 1) < 1e-2
@@ -0,0 +1,53 @@
+import os
+import pandas as pd
+import numpy as np
+from src.data.price_store import PriceStore
+
+def _write_prices(path, rows):
+    pd.DataFrame(rows, columns=["Date", "Price"]).to_csv(path, index=False)
+
+def test_price_store_range_queries(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, [("22-May-87", 18.55), ("20-May-87", 18.63), ("Nov 14, 2022", 93.59), ("bad", 1.0)])
+    store = PriceStore(str(p), snapshot_dir=str(tmp_path / "snapshots"))
+
+    assert [r["Date"] for r in store.records()] == ["1987-05-20", "1987-05-22", "2022-11-14"]
+    assert store.records("1987-05-21", "2022-11-14") == [
+        {"Date": "1987-05-22", "Price": 18.55}, {"Date": "2022-11-14", "Price": 93.59}]
+    assert store.records("2023-01-01") == []
+    assert store.stats()["total_days"] == 3
+
+def test_price_store_reloads_on_change(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, [("20-May-87", 18.63)])
+    store = PriceStore(str(p), snapshot_dir=str(tmp_path / "snapshots")).refresh()
+    first_dates = store.dates
+    assert store.refresh().dates is first_dates  # No reload without changes
+
+    _write_prices(p, [("20-May-87", 18.63), ("21-May-87", 18.45)])
+    st = os.stat(p)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert len(store.refresh().prices) == 2
+    assert store.stats()["min_price"] == 18.45
+
+def test_price_store_updates_incrementally_on_append(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, [(f"2020-01-{d:02d}", float(d)) for d in range(1, 11)])
+    store = PriceStore(str(p), snapshot_dir=str(tmp_path / "snapshots")).refresh()
+    store.stats()
+    s, q, shift = store.prefix_sums()
+    first_version = store.version
+
+    with open(p, "a") as f:
+        f.write("2020-01-11,50.0\n2020-01-12,0.5\n")
+    st = os.stat(p)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    store.refresh()
+
+    assert store.previous_version == first_version and store.changed_from == 10
+    expected = np.r_[np.arange(1.0, 11.0), 50.0, 0.5]
+    np.testing.assert_array_equal(store.prices, expected)
+    assert store.stats() == {"avg_price": round(expected.mean(), 2), "max_price": 50.0, "min_price": 0.5, "total_days": 12}
+    s, q, shift = store.prefix_sums()
+    np.testing.assert_allclose(s, np.r_[0.0, np.cumsum(expected - shift)], atol=1e-9)
+    np.testing.assert_allclose(q, np.r_[0.0, np.cumsum((expected - shift) ** 2)], atol=1e-9)
@@ -0,0 +1,60 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.analysis.rolling import RollingStatsEngine, get_rolling_engine
+
+def _prices():
+    rng = np.random.default_rng(0)
+    return 1000 + 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 2000)))
+
+def test_rolling_matches_pandas():
+    prices = _prices()
+    engine = RollingStatsEngine(prices)
+    series = pd.Series(prices)
+    returns = series.pct_change()
+
+    for window in (5, 21, 252):
+        np.testing.assert_allclose(engine.rolling_mean(window), series.rolling(window).mean(), rtol=1e-10)
+        exact_std = np.lib.stride_tricks.sliding_window_view(prices, window).std(axis=1, ddof=1)
+        np.testing.assert_allclose(engine.rolling_std(window, "price")[window - 1:], exact_std, rtol=1e-7)
+        np.testing.assert_allclose(engine.volatility(window), returns.rolling(window).std() * np.sqrt(252), rtol=1e-7)
+
+def test_rolling_compute_and_engine_cache():
+    engine = get_rolling_engine(_prices(), version="v1")
+    assert get_rolling_engine(_prices(), version="v1") is engine
+    table = engine.compute([5, 10], metrics=("mean", "volatility"))
+    assert list(table.columns) == ["mean_5", "volatility_5", "mean_10", "volatility_10"]
+    with pytest.raises(ValueError, match="Unknown series"):
+        engine.rolling_mean(5, series="volume")
+
+def test_rolling_results_are_bounded():
+    engine = RollingStatsEngine(_prices())
+    first = engine.rolling_mean(2)
+    for window in range(3, 3 + RollingStatsEngine.MAX_RESULTS):
+        engine.rolling_mean(window)
+    assert len(engine._results) == RollingStatsEngine.MAX_RESULTS
+    assert ("price", 2) not in engine._results
+    np.testing.assert_array_equal(engine.rolling_mean(2), first)
+
+def test_extend_matches_fresh_engine():
+    prices = _prices()
+    base = RollingStatsEngine(prices[:-30])
+    base.rolling_mean(21)
+    base.volatility(21)
+    for changed_from in (len(prices) - 30, len(prices) - 45):
+        new_prices = prices.copy()
+        new_prices[changed_from:] *= 1.01
+        extended = base.extend(new_prices, changed_from=changed_from)
+        fresh = RollingStatsEngine(new_prices)
+        np.testing.assert_allclose(extended.rolling_mean(21), fresh.rolling_mean(21), equal_nan=True)
+        np.testing.assert_allclose(extended.volatility(21), fresh.volatility(21), equal_nan=True)
+        np.testing.assert_allclose(extended.rolling_std(5, "log_returns"), fresh.rolling_std(5, "log_returns"),
+                                   equal_nan=True)
+
+def test_get_rolling_engine_extends_base_version():
+    prices = _prices()
+    base = get_rolling_engine(prices[:-10], version="base")
+    base.rolling_mean(10)
+    engine = get_rolling_engine(prices, version="appended", base_version="base", changed_from=len(prices) - 10)
+    assert engine is not base and len(engine.prices) == len(prices)
+    np.testing.assert_allclose(engine.rolling_mean(10), RollingStatsEngine(prices).rolling_mean(10), equal_nan=True)
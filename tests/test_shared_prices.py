@@ -0,0 +1,162 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.loader import DataLoader
+from src.data.price_store import PriceStore
+from src.data.shared_prices import KEEP_VERSIONS, SharedPriceStore
+
+def _write_prices(path, n):
+    pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=n, freq="D").strftime("%Y-%m-%d"),
+                  "Price": 50.0 + np.arange(n) % 7}).to_csv(path, index=False)
+
+def _append(path, rows):
+    with open(path, "a") as f:
+        f.writelines(f"{d},{p}\n" for d, p in rows)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+def test_workers_attach_without_parsing(tmp_path, monkeypatch):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    kwargs = {"shared_dir": str(tmp_path / "shared"), "snapshot_dir": str(tmp_path / "snapshots")}
+    publisher = SharedPriceStore(str(p), **kwargs).refresh()
+    plain = PriceStore(str(p), snapshot_dir=None).refresh()
+
+    def no_parsing(self):
+        raise AssertionError("attaching workers must not parse the CSV")
+    monkeypatch.setattr(DataLoader, "load_data", no_parsing)
+    worker = SharedPriceStore(str(p), **kwargs).refresh()
+
+    assert isinstance(worker.prices, np.memmap) and isinstance(worker.dates, np.memmap)
+    assert worker.version == publisher.version == plain.version
+    np.testing.assert_array_equal(worker.dates, plain.dates)
+    np.testing.assert_array_equal(worker.prices, plain.prices)
+    assert worker.records("2020-01-05", "2020-01-06") == plain.records("2020-01-05", "2020-01-06")
+    assert worker.stats() == plain.stats()
+    for a, b in zip(worker.prefix_sums(), plain.prefix_sums()):
+        np.testing.assert_allclose(a, b)
+
+def test_append_is_published_incrementally(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    kwargs = {"shared_dir": str(tmp_path / "shared"), "snapshot_dir": str(tmp_path / "snapshots")}
+    publisher = SharedPriceStore(str(p), **kwargs).refresh()
+    worker = SharedPriceStore(str(p), **kwargs).refresh()
+    first_version = worker.version
+
+    _append(p, [("2020-02-10", 80.0), ("2020-02-11", 20.0)])
+    publisher.refresh()
+    worker.refresh()
+    assert worker.previous_version == first_version and worker.changed_from == 40
+    assert worker.stats()["total_days"] == 42 and worker.stats()["max_price"] == 80.0
+    expected = PriceStore(str(p), snapshot_dir=None).refresh().prices
+    np.testing.assert_array_equal(worker.prices, expected)
+    s, q, shift = worker.prefix_sums()
+    np.testing.assert_allclose(s, np.r_[0.0, np.cumsum(expected - shift)], atol=1e-9)
+    np.testing.assert_allclose(q, np.r_[0.0, np.cumsum((expected - shift) ** 2)], atol=1e-9)
+
+    # A worker that skipped a version cannot extend its derived state
+    _append(p, [("2020-02-12", 55.0)])
+    publisher.refresh()
+    _append(p, [("2020-02-13", 56.0)])
+    publisher.refresh()
+    worker.refresh()
+    assert worker.previous_version is None and worker.changed_from is None
+    assert len(worker.prices) == 44
+
+    # Only the newest KEEP_VERSIONS versions stay on disk (4 were published)
+    versions = [name for name in os.listdir(tmp_path / "shared") if os.path.isdir(tmp_path / "shared" / name)]
+    assert len(versions) == KEEP_VERSIONS
+    assert os.path.basename(worker._path) in versions
+
+def test_stale_versions_take_their_derived_locks(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    store = SharedPriceStore(str(p), shared_dir=str(tmp_path / "shared"), snapshot_dir=None)
+    for i in range(KEEP_VERSIONS + 2):
+        store.derived("cumulative", lambda: np.cumsum(store.prices))
+        _append(p, [(f"2020-03-{i + 1:02d}", 60.0)])
+    store.refresh()
+    entries = os.listdir(tmp_path / "shared")
+    versions = {name for name in entries if os.path.isdir(tmp_path / "shared" / name)}
+    locks = [name for name in entries if name.endswith(".cumulative.lock")]
+    assert len(versions) == KEEP_VERSIONS
+    assert locks and all(name.split(".")[0] in versions for name in locks)
+
+def test_attach_retries_when_version_is_removed(tmp_path, monkeypatch):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    kwargs = {"shared_dir": str(tmp_path / "shared"), "snapshot_dir": None}
+    SharedPriceStore(str(p), **kwargs).refresh()
+    worker = SharedPriceStore(str(p), **kwargs)
+
+    # Another process removes the version after this worker read the pointer but before it mapped it
+    attach = SharedPriceStore._attach
+    removed = []
+
+    def racing_attach(self, meta, held):
+        if not removed:
+            removed.append(meta["name"])
+            shutil.rmtree(tmp_path / "shared" / meta["name"])
+        return attach(self, meta, held)
+    monkeypatch.setattr(SharedPriceStore, "_attach", racing_attach)
+    assert len(worker.refresh().prices) == 40 and removed
+
+def test_derived_arrays_are_computed_once(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    kwargs = {"shared_dir": str(tmp_path / "shared"), "snapshot_dir": None}
+    stores = [SharedPriceStore(str(p), **kwargs) for _ in range(3)]
+    calls = []
+
+    def cumulative(store):
+        def compute():
+            calls.append(1)
+            return np.cumsum(store.prices)
+        return store.derived("cumulative", compute)
+    results = [cumulative(store) for store in stores]
+    assert len(calls) == 1
+    for result in results:
+        np.testing.assert_array_equal(result, np.cumsum(stores[0].prices))
+
+    _append(p, [("2020-02-10", 80.0)])
+    assert len(cumulative(stores[1])) == 41 and len(calls) == 2
+    assert len(cumulative(stores[2])) == 41 and len(calls) == 2
+
+def test_plain_store_computes_derived(tmp_path):
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 5)
+    assert PriceStore(str(p), snapshot_dir=None).derived("x", lambda: np.arange(3)).tolist() == [0, 1, 2]
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SharedPriceStore(str(tmp_path / "missing.csv"), shared_dir=str(tmp_path / "shared")).refresh()
+
+def test_derived_locks_are_per_name(tmp_path):
+    import threading
+
+    p = tmp_path / "prices.csv"
+    _write_prices(p, 40)
+    kwargs = {"shared_dir": str(tmp_path / "shared"), "snapshot_dir": None}
+    slow_store, fast_store = SharedPriceStore(str(p), **kwargs).refresh(), SharedPriceStore(str(p), **kwargs)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        assert release.wait(10)
+        return np.zeros(3)
+    thread = threading.Thread(target=slow_store.derived, args=("slow", slow))
+    thread.start()
+    try:
+        assert started.wait(10)
+        # Not blocked by the slow computation holding its own lock
+        fast = []
+        other = threading.Thread(target=lambda: fast.append(fast_store.derived("fast", lambda: np.ones(2))))
+        other.start()
+        other.join(5)
+        assert not other.is_alive() and fast[0].tolist() == [1.0, 1.0]
+    finally:
+        release.set()
+        thread.join(10)
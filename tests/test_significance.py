@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from src.analysis.significance import BreakSignificanceTest, block_indices, break_statistics
+
+def _shifted(n=300, at=180, shift=1.0, seed=0):
+    x = np.random.default_rng(seed).normal(0.0, 1.0, n)
+    x[at:] += shift
+    return x
+
+def test_break_statistics_match_brute_force():
+    x = _shifted(60, 25)
+    n = len(x)
+    rss = [((x[:k] - x[:k].mean()) ** 2).sum() + ((x[k:] - x[k:].mean()) ** 2).sum() for k in range(1, n)]
+    k_best = int(np.argmin(rss)) + 1
+    stat, k_hat, shift = break_statistics(np.vstack([x, x[::-1]]), "lr")
+    assert k_hat[0] == k_best and k_hat[1] == n - k_best
+    np.testing.assert_allclose(stat[0], n * np.log(((x - x.mean()) ** 2).sum() / min(rss)))
+    np.testing.assert_allclose(shift[0], x[k_best:].mean() - x[:k_best].mean())
+
+    cusum = [abs(x[:k].sum() - k / n * x.sum()) for k in range(1, n)]
+    stat, k_hat, _ = break_statistics(x[None, :], "cusum")
+    assert k_hat[0] == int(np.argmax(cusum)) + 1
+    np.testing.assert_allclose(stat[0], max(cusum) / (x.std(ddof=1) * np.sqrt(n)))
+
+def test_block_indices_are_contiguous_blocks():
+    idx = block_indices(np.random.default_rng(0), rows=5, n=23, block_size=4)
+    assert idx.shape == (5, 23) and idx.min() >= 0 and idx.max() < 23
+    assert (np.diff(idx[:, :4], axis=1) == 1).all()
+
+@pytest.mark.parametrize("statistic", ["lr", "cusum"])
+@pytest.mark.parametrize("method", ["permutation", "block_bootstrap"])
+def test_detects_break_with_interval(statistic, method):
+    result = BreakSignificanceTest(statistic, method, n_resamples=400, seed=0, max_workers=1).run(_shifted())
+    assert result.p_value < 0.01
+    assert result.tau_ci[0] <= 179 <= result.tau_ci[1]
+    assert result.shift_ci[0] < 1.0 < result.shift_ci[1]
+
+def test_no_break_is_not_significant_and_model_tau_is_used():
+    x = np.random.default_rng(3).normal(size=300)
+    result = BreakSignificanceTest("lr", "permutation", n_resamples=400, seed=0, max_workers=1).run(x, tau=149)
+    assert result.p_value > 0.05
+    assert result.tau == 149 and result.n_resamples == 400
+
+def test_results_independent_of_worker_count():
+    x = _shifted()
+    serial = BreakSignificanceTest(n_resamples=300, chunk_size=100, seed=1, max_workers=1).run(x)
+    pooled = BreakSignificanceTest(n_resamples=300, chunk_size=100, seed=1, max_workers=2).run(x)
+    assert serial == pooled
+
+def test_validation():
+    with pytest.raises(ValueError):
+        BreakSignificanceTest(statistic="t")
+    with pytest.raises(ValueError):
+        BreakSignificanceTest(method="jackknife")
+    with pytest.raises(ValueError, match="tau"):
+        BreakSignificanceTest(max_workers=1).run(_shifted(), tau=299)
+    with pytest.raises(ValueError, match="block_size"):
+        BreakSignificanceTest(block_size=10, max_workers=1).run(np.arange(10.0))
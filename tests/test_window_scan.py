@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from src.models.exact_change_point import ExactPosterior
+from src.models.window_scan import ChangeProbabilityScan
+
+def _series(n=400, shift_at=230, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(50.0, 1.0, n)
+    x[shift_at:] += 5.0
+    return x
+
+def test_windows_match_exact_posterior():
+    x = _series()
+    scan = ChangeProbabilityScan(width=60, stride=7)
+    probs = scan.window_probabilities(x)
+    starts = scan.window_starts(len(x))
+    assert probs.shape == (len(starts), 60)
+    for i in (0, len(starts) // 2, len(starts) - 1):
+        window = x[starts[i]:starts[i] + 60]
+        np.testing.assert_allclose(probs[i], ExactPosterior(window).tau_probs, atol=1e-10)
+
+def test_chunking_does_not_change_result():
+    x = _series()
+    full = ChangeProbabilityScan(width=50, stride=3, chunk_size=1000).run(x)
+    chunked = ChangeProbabilityScan(width=50, stride=3, chunk_size=7).run(x)
+    np.testing.assert_allclose(full["change_probability"], chunked["change_probability"])
+
+def test_run_locates_break_and_counts_windows():
+    x = _series()
+    width, stride = 80, 4
+    result = ChangeProbabilityScan(width=width, stride=stride).run(x)
+    assert int(result["change_probability"].idxmax()) == 230
+
+    # Brute force: a window starting at s can place a break at s + 1 .. s + width - 1
+    starts = np.arange(0, len(x) - width + 1, stride)
+    expected = np.array([((starts < d) & (d < starts + width)).sum() for d in range(len(x))])
+    np.testing.assert_array_equal(result["windows"], expected)
+    assert np.isnan(result["change_probability"].iloc[0])
+    assert (result["change_probability"].dropna() <= result["max_probability"].dropna() + 1e-12).all()
+
+def test_short_series_and_validation():
+    result = ChangeProbabilityScan(width=50).run(np.arange(10.0))
+    assert (result["windows"] == 0).all()
+    with pytest.raises(ValueError):
+        ChangeProbabilityScan(width=2)
+    with pytest.raises(ValueError):
+        ChangeProbabilityScan(stride=0)
+    with pytest.raises(ValueError, match="NaN"):
+        ChangeProbabilityScan(width=5).run([1.0, np.nan, 2.0, 3.0, 4.0, 5.0])